@@ -0,0 +1,32 @@
+"""Compare BacktestEngine default (iloc per bar) vs fast (array-backed) run modes.
+
+Usage
+-----
+python -m examples.run_engine_benchmark
+"""
+from __future__ import annotations
+import time
+import pandas as pd
+
+from qbt.bench import CloseAboveOpen, synthetic_bars
+from qbt.core.engine import BacktestEngine
+from qbt.core.broker import Broker
+
+def time_run(data: pd.DataFrame, fast: bool):
+    engine = BacktestEngine(data, "MOCK", CloseAboveOpen("MOCK"), broker=Broker(0.0005, 0.01), fast=fast)
+    t0 = time.perf_counter()
+    nav = engine.run()
+    return time.perf_counter() - t0, nav
+
+def main(n: int = 100_000):
+    data = synthetic_bars(n)
+    t_slow, nav_slow = time_run(data, fast=False)
+    t_fast, nav_fast = time_run(data, fast=True)
+    assert nav_slow.equals(nav_fast)
+    print(f"bars: {n:,}")
+    print(f"default: {t_slow:.2f}s ({n / t_slow:,.0f} bars/s)")
+    print(f"fast:    {t_fast:.2f}s ({n / t_fast:,.0f} bars/s)")
+    print(f"speedup: {t_slow / t_fast:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Time per event and peak memory of EventDrivenEngine on many symbols.
+
+Usage
+-----
+python -m examples.run_event_benchmark [symbols] [bars_per_symbol]
+"""
+from __future__ import annotations
+import resource
+import sys
+import time
+
+from qbt.bench import FlipOnBar, synthetic_universe
+from qbt.core.event_engine import EventDrivenEngine, BrokerED
+
+def main(symbols: int = 10, bars: int = 50_000):
+    data = synthetic_universe(symbols, bars)
+    engine = EventDrivenEngine(data, {s: FlipOnBar(s) for s in data}, broker=BrokerED(0.0005, 0.01))
+    rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    nav = engine.run()
+    fills = engine.portfolio.fills_dataframe()
+    elapsed = time.perf_counter() - t0
+    rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    events = symbols * bars
+    print(f"market events: {events:,}  fills: {len(fills):,}  nav points: {len(nav):,}")
+    print(f"time: {elapsed:.2f}s ({1e6 * elapsed / events:.2f} us/event)")
+    print(f"peak RSS: {rss1 / 1024:,.1f} MiB (+{(rss1 - rss0) / 1024:,.1f} MiB during the run)")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -1,8 +1,7 @@
 from __future__ import annotations
-import numpy as np
-import pandas as pd
 from pathlib import Path
 
+from qbt.bench import synthetic_bars, write_csv
 from qbt.data.loader import load_csv
 from qbt.core.broker import Broker
 from qbt.core.engine_multi import BacktestEngineMulti
@@ -10,27 +9,6 @@ from qbt.core.metrics import performance_from_nav
 from qbt.strategies.topn_momentum import TopNMomentum
 from qbt.report.report import generate_report
 
-def make_mock(csv_path: str, seed: int, drift: float = 0.0003, n: int = 600):
-    rng = np.random.default_rng(seed)
-    rets = rng.normal(loc=drift, scale=0.01, size=n)
-    prices = 50 * np.exp(np.cumsum(rets))
-    close = prices
-    open_ = np.append([prices[0]], prices[:-1])
-    high = np.maximum(open_, close) * (1 + rng.uniform(0.0, 0.003, size=n))
-    low = np.minimum(open_, close) * (1 - rng.uniform(0.0, 0.003, size=n))
-    volume = rng.integers(500, 5000, size=n)
-    dates = pd.bdate_range(start=pd.Timestamp("2018-01-01"), periods=n)
-    df = pd.DataFrame({
-        "datetime": dates,
-        "open": open_,
-        "high": high,
-        "low": low,
-        "close": close,
-        "volume": volume
-    })
-    Path(csv_path).parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(csv_path, index=False)
-
 def main():
     BASE = Path(__file__).resolve().parent
     ddir = BASE / "data_sample"
@@ -38,9 +16,9 @@ def main():
     out.mkdir(parents=True, exist_ok=True)
 
     files = {"AAA": ddir / "AAA.csv", "BBB": ddir / "BBB.csv", "CCC": ddir / "CCC.csv"}
-    make_mock(str(files["AAA"]), seed=1, drift=0.0004)
-    make_mock(str(files["BBB"]), seed=2, drift=0.0002)
-    make_mock(str(files["CCC"]), seed=3, drift=0.0001)
+    for (sym, path), seed, drift in zip(files.items(), (1, 2, 3), (0.0004, 0.0002, 0.0001)):
+        write_csv(synthetic_bars(600, seed=seed, freq="B", start="2018-01-01", drift=drift, vol=0.01, price=50.0,
+                                 spread=(0.0, 0.003), volume=(500, 5_000)), path)
 
     data_map = {sym: load_csv(str(path), symbol=sym) for sym, path in files.items()}
     strat = TopNMomentum(data_map, params={"lookback": 60, "top_n": 2})
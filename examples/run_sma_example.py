@@ -11,11 +11,9 @@ This script:
 - Saves an equity curve to examples/output/equity.png
 """
 from __future__ import annotations
-import os
-import pandas as pd
-import numpy as np
 from pathlib import Path
 
+from qbt.bench import synthetic_bars, write_csv
 from qbt.data.loader import load_csv
 from qbt.core.engine import BacktestEngine
 from qbt.core.broker import Broker
@@ -23,31 +21,6 @@ from qbt.core.metrics import performance_from_nav
 from qbt.core.visualize import plot_equity
 from qbt.strategies.sma_cross import SmaCross
 
-def make_mock_csv(csv_path: str, seed: int = 7, n: int = 600):
-    rng = np.random.default_rng(seed)
-    # lognormal-ish random walk
-    rets = rng.normal(loc=0.0003, scale=0.01, size=n)
-    prices = 100 * np.exp(np.cumsum(rets))
-    # create OHLC from close with small ranges
-    close = prices
-    open_ = np.append([prices[0]], prices[:-1])
-    high = np.maximum(open_, close) * (1 + rng.uniform(0.0, 0.003, size=n))
-    low = np.minimum(open_, close) * (1 - rng.uniform(0.0, 0.003, size=n))
-    volume = rng.integers(1_000, 10_000, size=n)
-
-    start = pd.Timestamp("2018-01-01")
-    dates = pd.bdate_range(start=start, periods=n)  # business days
-    df = pd.DataFrame({
-        "datetime": dates,
-        "open": open_,
-        "high": high,
-        "low": low,
-        "close": close,
-        "volume": volume
-    })
-    Path(os.path.dirname(csv_path)).mkdir(parents=True, exist_ok=True)
-    df.to_csv(csv_path, index=False)
-
 def main():
     BASE = Path(__file__).resolve().parent
     data_csv = BASE / "data_sample" / "MOCK_STOCK.csv"
@@ -55,7 +28,9 @@ def main():
     out_dir.mkdir(parents=True, exist_ok=True)
 
     # Generate mock data
-    make_mock_csv(str(data_csv))
+    # lognormal-ish random walk on business days, with small high/low ranges
+    write_csv(synthetic_bars(600, seed=7, freq="B", start="2018-01-01", drift=0.0003, vol=0.01,
+                             spread=(0.0, 0.003), volume=(1_000, 10_000)), data_csv)
 
     # Load data
     data = load_csv(str(data_csv), symbol="MOCK")
@@ -2,7 +2,17 @@ from __future__ import annotations
 import pandas as pd
 from typing import Dict
 
-def trade_stats_from_fills(fills: pd.DataFrame) -> Dict[str, float]:
+from .trades import round_trips
+
+def trade_stats_from_fills(fills: pd.DataFrame, method: str = "fifo") -> Dict[str, float]:
+    """Win rate, profit factor and win/loss sizes of closed trades.
+
+    ``fills`` is either a trade table with ``pnl`` (optionally ``trade_id`` to sum
+    several rows per trade) or a raw fill log (``side``/``qty``/``price``), which is
+    turned into trades with :func:`qbt.analytics.trades.round_trips` using ``method``.
+    """
+    if fills is not None and len(fills) and 'pnl' not in fills.columns:
+        fills = round_trips(fills, method=method)
     if fills is None or len(fills) == 0:
         return {k: float('nan') for k in ['num_trades','win_rate','profit_factor','avg_win','avg_loss','max_win','max_loss']}
     if 'trade_id' in fills.columns:
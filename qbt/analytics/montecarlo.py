@@ -0,0 +1,156 @@
+"""Monte Carlo robustness checks for equity curves and trade sequences.
+
+:func:`bootstrap_nav` resamples a NAV's periodic returns in blocks (keeping short-range
+autocorrelation and volatility clusters) and :func:`shuffle_trades` reorders, or
+resamples, a strategy's trade PnLs. Every simulated path gets the full
+:func:`~qbt.core.metrics.performance_from_nav` metric set plus the longest time under
+water, giving distributions to hold the realized values against.
+
+Paths are built as (simulations x periods) arrays and scored with
+:func:`~qbt.core.metrics.performance_from_navs`, ``chunk_size`` simulations at a time to
+cap memory. The random draws are consumed in simulation order, so for a given ``seed``
+the results do not depend on ``chunk_size``.
+
+Example
+-------
+>>> mc = bootstrap_nav(nav, n_sims=10_000, block=20, seed=42)
+>>> mc.summary()                                  # quantiles of every metric
+>>> (mc.metrics["max_drawdown"] < mc.actual["max_drawdown"]).mean()
+>>> shuffle_trades(round_trips(engine.fills()), n_sims=5_000, seed=1).summary()
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+from qbt.core.metrics import performance_from_navs
+
+@dataclass
+class MonteCarloResult:
+    """Metric distributions of simulated paths.
+
+    Attributes
+    ----------
+    metrics : pd.DataFrame
+        One row per simulation: the ``performance_from_nav`` keys and
+        ``max_drawdown_duration`` (longest run of periods below a previous peak).
+    actual : dict
+        The same metrics for the original, unresampled path.
+    paths : np.ndarray, optional
+        (simulations x periods + 1) normalized NAV paths, kept only with ``keep_paths=True``.
+    """
+    metrics: pd.DataFrame
+    actual: Dict[str, float] = field(default_factory=dict)
+    paths: Optional[np.ndarray] = None
+
+    def summary(self, quantiles: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95)) -> pd.DataFrame:
+        """Quantiles of each metric (rows) next to the ``actual`` value."""
+        out = self.metrics.quantile(list(quantiles)).T
+        out.columns = [f"q{q:g}" for q in quantiles]
+        out.insert(0, "actual", pd.Series(self.actual))
+        return out
+
+    def rank(self) -> pd.Series:
+        """Share of simulations with a lower value than the actual one, per metric."""
+        return pd.Series({k: float((self.metrics[k] < v).mean()) for k, v in self.actual.items()})
+
+def _chunks(n_sims: int, chunk_size: Optional[int]) -> Iterator[Tuple[int, int]]:
+    step = n_sims if not chunk_size else max(1, int(chunk_size))
+    for a in range(0, n_sims, step):
+        yield a, min(a + step, n_sims)
+
+def _rng(seed) -> np.random.Generator:
+    return seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+def block_bootstrap(returns, n_sims: int, block: int = 1, seed=None, circular: bool = True) -> np.ndarray:
+    """(n_sims x n) returns built from randomly placed blocks of ``block`` consecutive periods.
+
+    ``block=1`` is the plain i.i.d. bootstrap. With ``circular=True`` blocks wrap around
+    the end of the series so every period is drawn equally often; otherwise block starts
+    are limited to ``n - block``.
+    """
+    r = np.asarray(returns, dtype=float)
+    n = len(r)
+    block = max(1, min(int(block), n))
+    n_blocks = -(-n // block)
+    high = n if circular else n - block + 1
+    starts = _rng(seed).integers(0, high, size=(n_sims, n_blocks), dtype=np.int64)
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_sims, -1)[:, :n]
+    return r[idx % n]
+
+def shuffle_pnl(pnl, n_sims: int, seed=None, replace: bool = False) -> np.ndarray:
+    """(n_sims x k) trade PnL sequences: permutations of ``pnl`` or, with ``replace=True``, resamples."""
+    x = np.asarray(pnl, dtype=float)
+    rng = _rng(seed)
+    if replace:
+        return x[rng.integers(0, len(x), size=(n_sims, len(x)), dtype=np.int64)]
+    return x[rng.random((n_sims, len(x))).argsort(axis=1)]
+
+def drawdown_duration(paths: np.ndarray) -> np.ndarray:
+    """Longest run of periods below the running peak, per row of a (paths x periods) array."""
+    paths = np.atleast_2d(paths)
+    pos = np.arange(paths.shape[1])
+    at_peak = paths >= np.maximum.accumulate(paths, axis=1)
+    last_peak = np.maximum.accumulate(np.where(at_peak, pos, 0), axis=1)
+    return (pos - last_peak).max(axis=1)
+
+def _score(navs: np.ndarray, risk_free: float, periods_per_year: int) -> pd.DataFrame:
+    perf = performance_from_navs(navs.T, risk_free=risk_free, periods_per_year=periods_per_year)
+    perf["max_drawdown_duration"] = drawdown_duration(navs)
+    return perf.reset_index(drop=True)
+
+def _run(draw, n_sims: int, chunk_size: Optional[int], to_nav, actual_nav: np.ndarray, risk_free: float,
+         periods_per_year: int, keep_paths: bool) -> MonteCarloResult:
+    frames, kept = [], []
+    for a, b in _chunks(n_sims, chunk_size):
+        navs = to_nav(draw(b - a))
+        frames.append(_score(navs, risk_free, periods_per_year))
+        if keep_paths:
+            kept.append(navs)
+    metrics = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    actual = _score(actual_nav[None, :], risk_free, periods_per_year).iloc[0].to_dict()
+    return MonteCarloResult(metrics, actual, np.vstack(kept) if keep_paths and kept else None)
+
+def bootstrap_nav(nav: Union[pd.Series, np.ndarray], n_sims: int = 1000, block: int = 20, seed=None,
+                  circular: bool = True, chunk_size: Optional[int] = 1000, risk_free: float = 0.0,
+                  periods_per_year: int = 252, keep_paths: bool = False) -> MonteCarloResult:
+    """Block-bootstrap the periodic returns of ``nav`` and score every resampled curve.
+
+    Parameters
+    ----------
+    nav : pd.Series or np.ndarray
+        Equity curve (any scale); missing values are dropped.
+    n_sims : int
+        Number of simulated paths.
+    block : int
+        Block length in periods (see :func:`block_bootstrap`).
+    seed : int, np.random.Generator or None
+        Makes the draw reproducible.
+    chunk_size : int, optional
+        Simulations held in memory at once (``None``: all of them).
+    """
+    values = pd.Series(nav).dropna().to_numpy(dtype=float)
+    rets = values[1:] / values[:-1] - 1
+    rng = _rng(seed)
+    ones = lambda m: np.ones((m, 1))
+    return _run(lambda m: block_bootstrap(rets, m, block, rng, circular), n_sims, chunk_size,
+                lambda r: np.hstack([ones(len(r)), np.cumprod(1 + r, axis=1)]),
+                values / values[0], risk_free, periods_per_year, keep_paths)
+
+def shuffle_trades(trades: Union[pd.DataFrame, pd.Series, np.ndarray], n_sims: int = 1000, seed=None,
+                   replace: bool = False, starting_cash: float = 100_000.0, chunk_size: Optional[int] = 1000,
+                   risk_free: float = 0.0, periods_per_year: int = 252, keep_paths: bool = False) -> MonteCarloResult:
+    """Reorder (or resample) trade PnLs and score the resulting trade-by-trade equity curves.
+
+    ``trades`` is a trade table with a ``pnl`` column (e.g. from
+    :func:`qbt.analytics.trades.round_trips`) or the PnLs themselves. Each path starts
+    at ``starting_cash`` and adds one trade per period, so ``periods_per_year`` should
+    be the strategy's trades per year for the annualized metrics to be meaningful.
+    Permutations keep the total PnL and only change the path (drawdowns, streaks);
+    ``replace=True`` also varies the outcome.
+    """
+    pnl = (trades["pnl"] if isinstance(trades, pd.DataFrame) else pd.Series(trades)).to_numpy(dtype=float)
+    rng = _rng(seed)
+    to_nav = lambda x: np.hstack([np.ones((len(x), 1)), 1 + np.cumsum(x, axis=1) / starting_cash])
+    return _run(lambda m: shuffle_pnl(pnl, m, rng, replace), n_sims, chunk_size, to_nav,
+                to_nav(pnl[None, :])[0], risk_free, periods_per_year, keep_paths)
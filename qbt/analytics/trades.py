@@ -0,0 +1,219 @@
+"""Round-trip trades from fill logs.
+
+:func:`round_trips` turns the fills of any engine (``BacktestEngine.fills()``,
+``BacktestEngineMulti.fills()``, ``PortfolioED.fills_dataframe()``: columns ``timestamp``,
+``symbol``, ``side``, ``qty``, ``price``, ``fee``) into one row per closing fill with its
+entry, exit, PnL and holding period, matching lots FIFO or at average cost per symbol.
+Long and short positions are both supported; a fill that flips the position is split
+into a closing and an opening part. With bars for the traded symbols it also reports the
+maximum adverse/favourable excursion of each trade.
+
+Everything is array work over the whole log (cumulative quantities, interval matching,
+segmented recurrences), so millions of fills take seconds rather than a Python loop.
+
+Example
+-------
+>>> trades = round_trips(engine.portfolio.fills_dataframe(), method="fifo", bars=data_map)
+>>> trade_stats_from_fills(trades)
+"""
+from __future__ import annotations
+from typing import Dict, Optional, Union
+import numpy as np
+import pandas as pd
+
+TRADE_COLUMNS = ['trade_id', 'symbol', 'side', 'qty', 'entry_time', 'exit_time', 'entry_price', 'exit_price',
+                 'fees', 'pnl', 'return', 'holding_period']
+
+def _legs(fills: pd.DataFrame):
+    # Split every fill into a closing leg (reduces the open position) and an opening leg
+    # (adds to it or starts the opposite side). Returns the legs in fill order, closing
+    # leg first, with their fill row, signed direction of the *position* they belong to,
+    # whether they close, quantity and pro-rata fee.
+    codes, symbols = pd.factorize(fills['symbol'], sort=False)
+    qty = fills['qty'].to_numpy(dtype=float)
+    sign = np.where(fills['side'].astype(str).str.lower().to_numpy() == 'buy', 1.0, -1.0)
+    signed = sign * qty
+    after = pd.Series(signed).groupby(codes).cumsum().to_numpy()
+    before = after - signed
+    close_q = np.where(np.sign(before) == -sign, np.minimum(qty, np.abs(before)), 0.0)
+    open_q = qty - close_q
+    fee = fills['fee'].to_numpy(dtype=float) if 'fee' in fills.columns else np.zeros(len(fills))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fee_per = np.where(qty > 0, fee / qty, 0.0)
+    rows = np.arange(len(fills))
+    legs = pd.DataFrame({'row': np.concatenate([rows, rows]),
+                         'closing': np.repeat([True, False], len(fills)),
+                         'qty': np.concatenate([close_q, open_q]),
+                         'dir': np.concatenate([-sign, sign]),        # +1 long position, -1 short
+                         'sym': np.concatenate([codes, codes])})
+    legs['fee'] = legs['qty'].to_numpy() * np.concatenate([fee_per, fee_per])
+    legs = legs[legs['qty'].to_numpy() > 0].sort_values(['row', 'closing'], ascending=[True, False], kind='stable')
+    return legs.reset_index(drop=True), np.asarray(symbols)
+
+def _fifo(opens: pd.DataFrame, closes: pd.DataFrame):
+    # Each (symbol, direction) group's opening legs cover consecutive intervals of its
+    # cumulative opened quantity, its closing legs consecutive intervals of its closed
+    # quantity; FIFO pairs them where the intervals overlap. Groups get disjoint offsets
+    # so the whole log is matched with one sort and two searchsorted calls.
+    o_group = opens['sym'].to_numpy() * 2 + (opens['dir'].to_numpy() > 0)
+    c_group = closes['sym'].to_numpy() * 2 + (closes['dir'].to_numpy() > 0)
+    o_order = np.lexsort((opens['row'].to_numpy(), o_group))
+    c_order = np.lexsort((closes['row'].to_numpy(), c_group))
+    o_qty, c_qty = opens['qty'].to_numpy()[o_order], closes['qty'].to_numpy()[c_order]
+    o_grp, c_grp = o_group[o_order], c_group[c_order]
+    o_end = np.cumsum(o_qty)
+    o_start = o_end - o_qty
+    # closed quantity of a group is counted from that group's first opened unit
+    groups, first = np.unique(o_grp, return_index=True)
+    base = o_start[first][np.searchsorted(groups, c_grp)]
+    c_cum = pd.Series(c_qty).groupby(c_grp).cumsum().to_numpy()
+    c_end = base + c_cum
+    c_start = c_end - c_qty
+    pts = np.unique(np.concatenate([o_start, o_end, c_start, c_end]))
+    lo, hi = pts[:-1], pts[1:]
+    ci = np.searchsorted(c_end, lo, side='right')
+    keep = ci < len(c_end)
+    keep[keep] &= c_start[ci[keep]] <= lo[keep]
+    lo, hi, ci = lo[keep], hi[keep], ci[keep]
+    oi = np.searchsorted(o_end, lo, side='right')
+    return o_order[oi], c_order[ci], hi - lo   # opening leg, closing leg, matched qty
+
+def _average_cost(legs: pd.DataFrame):
+    # Average entry price and fee per unit of the open position when each closing leg
+    # executes. Opens add price*qty (and fee) to the position cost; closes scale it by
+    # the remaining fraction, i.e. C_t = a_t * C_{t-1} + b_t per (symbol, direction)
+    # episode, solved with segmented cumulative products/sums. (The product only
+    # underflows after ~1000 halvings of one position without it going flat.)
+    grp = legs['sym'].to_numpy() * 2 + (legs['dir'].to_numpy() > 0)
+    order = np.lexsort((np.arange(len(legs)), grp))
+    g = grp[order]
+    qty = legs['qty'].to_numpy()[order]
+    closing = legs['closing'].to_numpy()[order]
+    pos = pd.Series(np.where(closing, -qty, qty)).groupby(g).cumsum().to_numpy()
+    pos_before = pos - np.where(closing, -qty, qty)
+    flat_before = np.concatenate([[True], (pos[:-1] == 0) | (g[1:] != g[:-1])])
+    episode = np.cumsum(flat_before)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        a = np.where(closing & (pos > 0), pos / pos_before, 1.0)
+    P = pd.Series(a).groupby(episode).cumprod().to_numpy()
+    price = legs['price'].to_numpy()[order]
+    fee = legs['fee'].to_numpy()[order]
+    b = np.column_stack([price * qty, fee])
+    b[closing] = 0.0
+    C = P[:, None] * pd.DataFrame(b / P[:, None]).groupby(episode).cumsum().to_numpy()
+    C_before = np.vstack([np.zeros((1, 2)), C[:-1]])
+    C_before[flat_before] = 0.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        per_unit = C_before / pos_before[:, None]
+    first_open = pd.Series(np.where(flat_before, np.arange(len(g)), -1)).groupby(episode).transform('max').to_numpy()
+    out = np.empty((len(legs), 3))
+    out[order, :2] = per_unit
+    out[order, 2] = order[first_open]     # leg that opened the episode
+    return out
+
+def _excursions(trades: pd.DataFrame, bars: Union[Dict[str, pd.DataFrame], pd.DataFrame]):
+    # Lowest low / highest high between entry and exit (both bars included) per trade,
+    # from one np.minimum/np.maximum.reduceat over all symbols' bars laid end to end.
+    syms = trades['symbol'].unique()
+    frames = {s: (bars if isinstance(bars, pd.DataFrame) else bars.get(s)) for s in syms}
+    lows, highs = [], []
+    starts, ends = np.zeros(len(trades), dtype=np.int64), np.zeros(len(trades), dtype=np.int64)
+    sym_col = trades['symbol'].to_numpy()
+    n = 0
+    for s, df in frames.items():
+        mask = sym_col == s
+        if df is None or not len(df):
+            starts[mask] = ends[mask] = n
+            continue
+        df = df.sort_index()
+        low = df['low'] if 'low' in df.columns else df['close']
+        high = df['high'] if 'high' in df.columns else df['close']
+        lows.append(low.to_numpy(dtype=float)); highs.append(high.to_numpy(dtype=float))
+        starts[mask] = n + df.index.searchsorted(trades['entry_time'].to_numpy()[mask], side='left')
+        ends[mask] = n + df.index.searchsorted(trades['exit_time'].to_numpy()[mask], side='right')
+        n += len(df)
+    lo_min = np.full(len(trades), np.nan)
+    hi_max = np.full(len(trades), np.nan)
+    ok = ends > starts
+    if n and ok.any():
+        low = np.append(np.concatenate(lows), np.nan)        # sentinel so ``ends`` may equal n
+        high = np.append(np.concatenate(highs), np.nan)
+        bounds = np.column_stack([starts[ok], ends[ok]]).ravel()
+        lo_min[ok] = np.minimum.reduceat(low, bounds)[::2]
+        hi_max[ok] = np.maximum.reduceat(high, bounds)[::2]
+    return lo_min, hi_max
+
+def round_trips(fills: pd.DataFrame, method: str = "fifo",
+                bars: Optional[Union[Dict[str, pd.DataFrame], pd.DataFrame]] = None) -> pd.DataFrame:
+    """Closed trades reconstructed from a fill log, one row per closing fill.
+
+    Parameters
+    ----------
+    fills : pd.DataFrame
+        Columns ``timestamp``, ``symbol``, ``side`` ('buy'/'sell'), ``qty``, ``price``
+        and optionally ``fee``, in execution order.
+    method : {"fifo", "average"}
+        ``"fifo"`` closes the oldest open lots first; the entry price is the
+        quantity-weighted price of the lots it closes and the entry time that of the
+        oldest one. ``"average"`` closes at the position's average cost (as
+        ``Portfolio`` tracks it); the entry time is when the position was opened.
+    bars : dict or pd.DataFrame, optional
+        Symbol -> OHLC frame (or one frame for a single-symbol log). Adds ``mae`` and
+        ``mfe``: the worst and best unrealized PnL of the trade's quantity between
+        entry and exit, from bar lows/highs (``close`` if those are missing).
+
+    Returns
+    -------
+    pd.DataFrame
+        ``TRADE_COLUMNS`` (plus ``mae``/``mfe``): ``side`` is 'long'/'short', ``fees``
+        is the exit fee plus the pro-rata entry fees, ``pnl`` is net of them and
+        ``return`` is ``pnl`` over the entry notional. Positions still open at the end
+        of the log are not included. Feeds :func:`trade_stats_from_fills` directly.
+    """
+    if method not in ("fifo", "average"):
+        raise ValueError("method must be 'fifo' or 'average'")
+    if fills is None or not len(fills):
+        return pd.DataFrame(columns=TRADE_COLUMNS + (['mae', 'mfe'] if bars is not None else []))
+    fills = fills.reset_index(drop=True)
+    legs, symbols = _legs(fills)
+    legs['price'] = fills['price'].to_numpy(dtype=float)[legs['row'].to_numpy()]
+    times = fills['timestamp'].to_numpy()
+    closes = legs[legs['closing'].to_numpy()]
+    c_pos = np.flatnonzero(legs['closing'].to_numpy())
+    if method == "fifo":
+        opens = legs[~legs['closing'].to_numpy()]
+        o_leg, c_leg, q = _fifo(opens, closes)
+        op = opens.iloc[o_leg]
+        unit_fee = op['fee'].to_numpy() / op['qty'].to_numpy()
+        agg = pd.DataFrame({'c': c_leg, 'notional': q * op['price'].to_numpy(), 'entry_fee': q * unit_fee,
+                            'first': op['row'].to_numpy()}).groupby('c', sort=True)
+        sums = agg[['notional', 'entry_fee']].sum()
+        entry_price = sums['notional'].to_numpy() / closes['qty'].to_numpy()[sums.index]
+        entry_fee = sums['entry_fee'].to_numpy()
+        entry_row = agg['first'].min().to_numpy()
+        closes = closes.iloc[sums.index.to_numpy()]
+    else:
+        avg = _average_cost(legs)[c_pos]
+        entry_price = avg[:, 0]
+        entry_fee = avg[:, 1] * closes['qty'].to_numpy()
+        entry_row = legs['row'].to_numpy()[avg[:, 2].astype(np.int64)]
+    qty = closes['qty'].to_numpy()
+    direction = closes['dir'].to_numpy()
+    exit_price = closes['price'].to_numpy()
+    fees = entry_fee + closes['fee'].to_numpy()
+    pnl = direction * (exit_price - entry_price) * qty - fees
+    entry_time = times[entry_row]
+    exit_time = times[closes['row'].to_numpy()]
+    trades = pd.DataFrame({'trade_id': np.arange(1, len(closes) + 1), 'symbol': symbols[closes['sym'].to_numpy()],
+                           'side': np.where(direction > 0, 'long', 'short'), 'qty': qty,
+                           'entry_time': entry_time, 'exit_time': exit_time, 'entry_price': entry_price,
+                           'exit_price': exit_price, 'fees': fees, 'pnl': pnl,
+                           'return': pnl / (entry_price * qty)})
+    trades['holding_period'] = trades['exit_time'] - trades['entry_time']
+    if bars is not None:
+        lo, hi = _excursions(trades, bars)
+        worst = np.where(direction > 0, lo - entry_price, entry_price - hi) * qty
+        best = np.where(direction > 0, hi - entry_price, entry_price - lo) * qty
+        trades['mae'] = np.minimum(worst, 0.0)
+        trades['mfe'] = np.maximum(best, 0.0)
+    return trades
@@ -0,0 +1,254 @@
+"""Benchmark suite: synthetic universes, per-stage timings and regression checks.
+
+:func:`synthetic_bars` / :func:`synthetic_universe` generate reproducible OHLCV data of
+any size (bars x symbols); :class:`CloseAboveOpen` and :class:`FlipOnBar` are the toy
+strategies every engine timing uses (here and in ``examples/run_*_benchmark.py``).
+:func:`run_benchmarks` times the pipeline stages on such a universe (CSV loading, the
+bar-loop, multi-asset and event-driven engines, metrics and report rendering); results
+can be appended to a JSON history file and compared with a saved baseline, flagging
+stages that got slower than a threshold. ``cli_startup`` and ``cli_run`` time fresh
+``qbt-lite`` processes (``--help``, and a ``--no_report`` run on mock data), and
+``--budget STAGE=SECONDS`` turns them into hard limits.
+
+Command line::
+
+    qbt-lite bench --bars 20000 --symbols 50 --history reports/bench_history.json
+    qbt-lite bench --save_baseline bench_baseline.json
+    qbt-lite bench --baseline bench_baseline.json --threshold 0.15   # exit code 1 on slowdowns
+    qbt-lite bench --stages cli_startup --budget cli_startup=0.5    # exit code 1 over budget
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+import numpy as np
+import pandas as pd
+
+STAGES = ("loader", "engine", "engine_multi", "event_engine", "metrics", "report", "cli_startup", "cli_run")
+
+def synthetic_bars(n: int, seed: int = 7, freq: str = "min", start: str = "2010-01-01 09:30",
+                   drift: float = 0.0, vol: float = 0.001, price: float = 100.0,
+                   spread: Union[float, Tuple[float, float]] = 0.0,
+                   volume: Tuple[int, int] = (50, 500)) -> pd.DataFrame:
+    """Geometric random-walk OHLCV bars with a DatetimeIndex; open is the previous close.
+
+    ``spread`` widens high/low beyond open/close by that fraction, or by a uniform draw
+    per bar when given as ``(low, high)``; ``volume`` is the integer range of volumes.
+    """
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(drift, vol, size=n)))
+    open_ = np.append([close[0]], close[:-1])
+    if isinstance(spread, tuple):
+        up, down = rng.uniform(*spread, size=n), rng.uniform(*spread, size=n)
+    else:
+        up = down = spread
+    idx = pd.date_range(start, periods=n, freq=freq)
+    return pd.DataFrame({"open": open_, "high": np.maximum(open_, close) * (1 + up),
+                         "low": np.minimum(open_, close) * (1 - down), "close": close,
+                         "volume": rng.integers(*volume, size=n)}, index=idx)
+
+def write_csv(bars: pd.DataFrame, path: Union[str, Path]) -> Path:
+    """Write ``bars`` in the ``datetime,open,...`` layout :func:`qbt.data.loader.load_csv` reads."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    bars.rename_axis("datetime").reset_index().to_csv(path, index=False)
+    return path
+
+def synthetic_universe(symbols: int, bars: int, seed: int = 0, **kwargs) -> Dict[str, pd.DataFrame]:
+    """``{"S0000": frame, ...}`` of :func:`synthetic_bars` on a shared index, one seed per symbol."""
+    return {f"S{k:04d}": synthetic_bars(bars, seed=seed + k, **kwargs) for k in range(symbols)}
+
+class CloseAboveOpen:
+    """Toy bar-loop strategy that only reads ctx.data, so timings isolate engine overhead."""
+    def __init__(self, symbol: str, unit: int = 10):
+        self.symbol = symbol; self.unit = unit
+    def on_bar(self, ctx):
+        pos = ctx.portfolio.position.qty
+        if ctx.data["close"] > ctx.data["open"] and pos <= 0:
+            ctx.submit_order(self.symbol, qty=self.unit, side="buy")
+        elif ctx.data["close"] < ctx.data["open"] and pos > 0:
+            ctx.submit_order(self.symbol, qty=pos, side="sell")
+
+class FlipOnBar:
+    """Event-driven counterpart of :class:`CloseAboveOpen`; trades on most bars, so orders and fills get exercised."""
+    def __init__(self, symbol: str, unit: int = 10):
+        self.symbol = symbol; self.unit = unit
+    def on_bar(self, ctx):
+        from qbt.core.event_engine import OrderEvent
+        pos = ctx.portfolio.positions.get(self.symbol, 0)
+        if ctx.data["close"] > ctx.data["open"] and pos <= 0:
+            ctx.submit_order(OrderEvent(ctx.now, self.symbol, "buy", self.unit))
+        elif ctx.data["close"] < ctx.data["open"] and pos > 0:
+            ctx.submit_order(OrderEvent(ctx.now, self.symbol, "sell", pos))
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def _cli(args: List[str], cwd: str):
+    # A fresh interpreter, so the timing includes every import the command triggers.
+    root = str(Path(__file__).resolve().parent.parent)
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")]))}
+    subprocess.run([sys.executable, "-m", "qbt.cli", *args], cwd=cwd, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def run_benchmarks(bars: int = 20_000, symbols: int = 20, stages: Iterable[str] = STAGES,
+                   repeat: int = 3, seed: int = 0) -> dict:
+    """Time each stage on a synthetic ``symbols`` x ``bars`` universe.
+
+    Returns a JSON-serializable record: ``meta`` (sizes, versions, UTC time) and
+    ``stages`` mapping each stage to ``seconds`` (best of ``repeat``), ``items``
+    (bars or events processed) and ``us_per_item``.
+    """
+    from qbt.core.broker import Broker
+    stages = list(stages)
+    unknown = sorted(set(stages) - set(STAGES))
+    if unknown:
+        raise ValueError(f"Unknown stages: {unknown}; choose from {list(STAGES)}")
+    universe = synthetic_universe(symbols, bars, seed=seed)
+    first = next(iter(universe))
+    data = universe[first]
+    broker = Broker(commission_bps=0.0005, slippage=0.01)
+    out: Dict[str, dict] = {}
+
+    def record(stage: str, seconds: float, items: int):
+        out[stage] = {"seconds": seconds, "items": items, "us_per_item": 1e6 * seconds / max(items, 1)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for stage in stages:
+            if stage == "loader":
+                from qbt.data.loader import load_csv
+                path = write_csv(data, Path(tmp) / f"{first}.csv")
+                record(stage, _best_of(lambda: load_csv(str(path), symbol=first), repeat), bars)
+            elif stage == "engine":
+                from qbt.core.engine import BacktestEngine
+                run = lambda: BacktestEngine(data, first, CloseAboveOpen(first), broker=broker, fast=True).run()
+                record(stage, _best_of(run, repeat), bars)
+            elif stage == "engine_multi":
+                from qbt.core.engine_multi import BacktestEngineMulti
+                from qbt.strategies.topn_momentum import TopNMomentum
+                top_n = max(1, symbols // 5)
+                run = lambda: BacktestEngineMulti(universe, TopNMomentum(universe, {"lookback": 20, "top_n": top_n}),
+                                                  broker=broker).run()
+                record(stage, _best_of(run, repeat), bars * symbols)
+            elif stage == "event_engine":
+                from qbt.core.event_engine import BrokerED, EventDrivenEngine
+                run = lambda: EventDrivenEngine(universe, {s: FlipOnBar(s) for s in universe},
+                                                broker=BrokerED(0.0005, 0.01)).run()
+                record(stage, _best_of(run, repeat), bars * symbols)
+            elif stage == "metrics":
+                from qbt.core.metrics import compute_drawdown, performance_from_nav
+                nav = data["close"] / data["close"].iloc[0]
+                run = lambda: (performance_from_nav(nav), compute_drawdown(nav))
+                record(stage, _best_of(run, repeat), bars)
+            elif stage == "report":
+                from qbt.report.report import generate_report
+                nav = data["close"]
+                def run():
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        generate_report(nav, "bench", out_dir=tmp)
+                record(stage, _best_of(run, repeat), bars)
+            elif stage == "cli_startup":
+                record(stage, _best_of(lambda: _cli(["--help"], tmp), repeat), 1)
+            elif stage == "cli_run":
+                record(stage, _best_of(lambda: _cli(["--no_report"], tmp), repeat), 1)
+    import qbt
+    meta = {"time": datetime.now(timezone.utc).isoformat(timespec="seconds"), "bars": bars, "symbols": symbols,
+            "repeat": repeat, "seed": seed, "qbt": qbt.__version__, "python": platform.python_version(),
+            "numpy": np.__version__, "pandas": pd.__version__, "machine": platform.machine()}
+    return {"meta": meta, "stages": out}
+
+def append_history(record: dict, path) -> List[dict]:
+    """Append ``record`` to the JSON list in ``path`` (created if missing); returns the history."""
+    path = Path(path)
+    history = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+    history.append(record)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(history, indent=2), encoding="utf-8")
+    return history
+
+def compare(current: dict, baseline: dict, threshold: float = 0.10) -> List[dict]:
+    """Stages present in both records, with their slowdown ratio and a ``regressed`` flag.
+
+    Stages are compared on ``us_per_item`` so runs of different sizes stay comparable;
+    a stage regresses when it is more than ``threshold`` (0.10 = 10%) slower.
+    """
+    rows = []
+    for stage, cur in current["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if base is None:
+            continue
+        ratio = cur["us_per_item"] / base["us_per_item"] if base["us_per_item"] > 0 else float("inf")
+        rows.append({"stage": stage, "baseline_us": base["us_per_item"], "current_us": cur["us_per_item"],
+                     "ratio": ratio, "regressed": ratio > 1 + threshold})
+    return rows
+
+def check_budgets(record: dict, budgets: Dict[str, float]) -> List[dict]:
+    """Stages of ``record`` with a time budget (seconds), flagged ``over`` when it is exceeded."""
+    return [{"stage": stage, "seconds": record["stages"][stage]["seconds"], "budget": limit,
+             "over": record["stages"][stage]["seconds"] > limit}
+            for stage, limit in budgets.items() if stage in record["stages"]]
+
+def parse_bench_args(argv=None):
+    p = argparse.ArgumentParser(prog="qbt-lite bench", description="Time pipeline stages on synthetic data")
+    p.add_argument("--bars", type=int, default=20_000)
+    p.add_argument("--symbols", type=int, default=20)
+    p.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of: " + ", ".join(STAGES))
+    p.add_argument("--repeat", type=int, default=3, help="timed repetitions per stage (best is kept)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--history", default="reports/bench_history.json", help="JSON file the run is appended to ('' to skip)")
+    p.add_argument("--baseline", default=None, help="baseline record to compare against")
+    p.add_argument("--save_baseline", default=None, help="write this run as the new baseline")
+    p.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before a stage is flagged")
+    p.add_argument("--budget", action="append", default=[], metavar="STAGE=SECONDS",
+                   help="fail if a stage takes longer than this, e.g. cli_startup=0.5 (repeatable)")
+    return p.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_bench_args(argv)
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    record = run_benchmarks(args.bars, args.symbols, stages, repeat=args.repeat, seed=args.seed)
+    print(f"Benchmark: {args.bars:,} bars x {args.symbols} symbols (best of {args.repeat})")
+    for stage, r in record["stages"].items():
+        print(f"- {stage:<13} {r['seconds']:8.3f}s  {r['us_per_item']:9.3f} us/item")
+    if args.history:
+        append_history(record, args.history)
+        print(f"Appended to {args.history}")
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(record, indent=2), encoding="utf-8")
+        print(f"Baseline saved to {args.save_baseline}")
+    budgets = {}
+    for item in args.budget:
+        stage, _, limit = item.partition("=")
+        if not limit:
+            raise SystemExit(f"--budget expects STAGE=SECONDS, got: {item}")
+        budgets[stage.strip()] = float(limit)
+    status = 0
+    for r in check_budgets(record, budgets):
+        print(f"- {r['stage']:<13} {r['seconds']:8.3f}s  budget {r['budget']:.3f}s  {'OVER' if r['over'] else 'ok'}")
+        if r["over"]:
+            status = 1
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        rows = compare(record, baseline, args.threshold)
+        for r in rows:
+            flag = "SLOWER" if r["regressed"] else "ok"
+            print(f"- {r['stage']:<13} {r['baseline_us']:9.3f} -> {r['current_us']:9.3f} us/item  x{r['ratio']:.2f}  {flag}")
+        if any(r["regressed"] for r in rows):
+            print(f"Regression: stages slower than baseline by more than {args.threshold:.0%}")
+            status = 1
+    return status
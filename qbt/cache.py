@@ -0,0 +1,242 @@
+"""Content-addressed cache for indicator columns and other derived arrays.
+
+Entries are keyed by a fingerprint of the input data (values, index and name), an
+indicator name and its parameters, so the same rolling mean or RSI of the same prices
+is computed once per process no matter which strategy, engine or sweep asks for it.
+An in-memory LRU tier is capped by bytes and entry count; an optional on-disk tier
+(one pickle per key, capped by bytes, oldest files removed first) lets later processes
+reuse results.
+
+Cached values are shared between callers and must be treated as read-only.
+
+Example
+-------
+>>> from qbt.cache import cached
+>>> sma = cached("sma", close, lambda: close.rolling(20).mean(), window=20)
+>>> get_cache().stats()
+CacheStats(hits=0, disk_hits=0, misses=1, evictions=0, entries=1, bytes=...)
+"""
+from __future__ import annotations
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+import numpy as np
+import pandas as pd
+
+_MISSING = object()
+
+def fingerprint(data) -> str:
+    """Hex digest of an array, Series or DataFrame: dtype, shape, values, index and labels."""
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(data, (pd.Series, pd.DataFrame)):
+        h.update(repr(data.name if isinstance(data, pd.Series) else list(data.columns)).encode())
+        _hash_array(h, data.index.to_numpy())
+        if isinstance(data, pd.DataFrame):
+            for _, col in data.items():
+                _hash_array(h, col.to_numpy())
+            return h.hexdigest()
+        data = data.to_numpy()
+    _hash_array(h, np.asarray(data))
+    return h.hexdigest()
+
+def _hash_array(h, a: np.ndarray):
+    h.update(f"{a.dtype.str}{a.shape}".encode())
+    if a.dtype == object:
+        h.update(pd.util.hash_array(a.ravel()).tobytes())
+    else:
+        h.update(np.ascontiguousarray(a).view(np.uint8).data if a.size else b"")
+
+def _nbytes(value) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        return int(np.sum(value.memory_usage(index=True)))
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 64
+
+@dataclass
+class CacheStats:
+    hits: int = 0          # served from memory
+    disk_hits: int = 0     # loaded from the disk tier
+    misses: int = 0        # computed
+    evictions: int = 0     # dropped from memory by the LRU caps
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / total if total else 0.0
+
+class IndicatorCache:
+    """LRU cache of computed values with an optional disk tier.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Memory budget for cached values; least recently used entries are evicted first.
+        Values larger than the budget are not kept in memory.
+    max_entries : int, optional
+        Cap on the number of in-memory entries.
+    disk_dir : str or Path, optional
+        Directory of the persistent tier; nothing is written to disk when None.
+    disk_max_bytes : int, optional
+        Size cap of ``disk_dir``; the oldest files are removed when it is exceeded.
+    """
+    def __init__(self, max_bytes: int = 256 * 2**20, max_entries: Optional[int] = None,
+                 disk_dir: Union[str, Path, None] = None, disk_max_bytes: Optional[int] = None):
+        self.max_bytes = int(max_bytes)
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self.disk_max_bytes = disk_max_bytes
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()   # key -> (value, nbytes)
+        self._bytes = 0
+        self._stats = CacheStats()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(name: str, data, params: Optional[dict] = None) -> str:
+        """Cache key of indicator ``name`` with ``params`` computed on ``data``."""
+        fp = data if isinstance(data, str) else fingerprint(data)
+        items = sorted((k, v.item() if isinstance(v, np.generic) else v) for k, v in (params or {}).items())
+        spec = repr((name, items))
+        return hashlib.blake2b(f"{spec}|{fp}".encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                self._mem.move_to_end(key)
+                self._stats.hits += 1
+                return entry[0]
+        value = self._load(key)
+        if value is _MISSING:
+            return default
+        with self._lock:
+            self._stats.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value):
+        with self._lock:
+            self._remember(key, value)
+        self._dump(key, value)
+
+    def get_or_compute(self, name: str, data, compute: Callable[[], Any], params: Optional[dict] = None):
+        """Return the cached result of ``compute()`` for (``data``, ``name``, ``params``).
+
+        ``data`` is the input the result depends on (or a precomputed :func:`fingerprint`).
+        """
+        key = self.key(name, data, params)
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        with self._lock:
+            self._stats.misses += 1
+        self.put(key, value)
+        return value
+
+    def _remember(self, key: str, value):
+        size = _nbytes(value)
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        if size > self.max_bytes:
+            return
+        self._mem[key] = (value, size)
+        self._bytes += size
+        while self._mem and (self._bytes > self.max_bytes or
+                             (self.max_entries is not None and len(self._mem) > self.max_entries)):
+            _, (_, dropped) = self._mem.popitem(last=False)
+            self._bytes -= dropped
+            self._stats.evictions += 1
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.pkl"
+
+    def _load(self, key: str):
+        if self.disk_dir is None:
+            return _MISSING
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                value = pickle.load(fh)
+            os.utime(path)   # disk eviction goes by mtime, so reads count as use
+            return value
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return _MISSING
+
+    def _dump(self, key: str, value):
+        if self.disk_dir is None:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+        if self.disk_max_bytes is not None:
+            self._trim_disk()
+
+    def _trim_disk(self):
+        # Other processes or threads may remove files while we scan: skip the ones gone.
+        files = []
+        for p in self.disk_dir.glob("*.pkl"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+        files.sort(key=lambda f: f[0])
+        total = sum(size for _, size, _ in files)
+        for _, size, p in files:
+            if total <= self.disk_max_bytes:
+                break
+            total -= size
+            p.unlink(missing_ok=True)
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the hit/miss counters and current memory use."""
+        with self._lock:
+            s = self._stats
+            return CacheStats(s.hits, s.disk_hits, s.misses, s.evictions, len(self._mem), self._bytes)
+
+    def clear(self, disk: bool = False):
+        """Drop the in-memory entries (and the disk tier with ``disk=True``); keeps the stats."""
+        with self._lock:
+            self._mem.clear()
+            self._bytes = 0
+        if disk and self.disk_dir is not None:
+            for p in self.disk_dir.glob("*.pkl"):
+                p.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._mem)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._mem
+
+_cache: Optional[IndicatorCache] = IndicatorCache()
+
+def get_cache() -> Optional[IndicatorCache]:
+    """The process-wide cache used by strategies and sweeps (None when disabled)."""
+    return _cache
+
+def set_cache(cache: Optional[IndicatorCache]) -> Optional[IndicatorCache]:
+    """Replace the process-wide cache (None disables caching); returns the previous one."""
+    global _cache
+    previous, _cache = _cache, cache
+    return previous
+
+def cached(name: str, data, compute: Callable[[], Any], **params):
+    """``compute()`` through the process-wide cache, keyed by ``data``, ``name`` and ``params``."""
+    cache = _cache
+    return compute() if cache is None else cache.get_or_compute(name, data, compute, params)
@@ -1,24 +1,32 @@
+"""``qbt-lite`` command line.
+
+Startup is kept short because the CLI is often invoked many times in a row: this
+module only imports the standard library at load time. pandas, the engines, the
+chosen strategy (via :mod:`qbt.strategies.registry`) and matplotlib are imported
+by the code paths that need them, so ``--help``, a ``--results_dir`` hit or a
+``--no_report`` run never load the plotting stack.
+"""
 from __future__ import annotations
 import argparse
+import sys
 from pathlib import Path
-import pandas as pd
-from qbt.config import load_config
-from qbt.data.loader import load_csv
-from qbt.core.engine import BacktestEngine
-from qbt.core.engine_multi import BacktestEngineMulti
-from qbt.core.broker import Broker
-from qbt.core.metrics import performance_from_nav
-from qbt.report.report import generate_report
-from qbt.strategies.sma_cross import SmaCross
-from qbt.strategies.momentum import Momentum
-from qbt.strategies.ta_bbands import BollingerBands
-from qbt.strategies.ta_rsi import RSIStrategy
-from qbt.strategies.ta_macd import MACDStrategy
-from qbt.strategies.topn_momentum import TopNMomentum
+from typing import TYPE_CHECKING
+from qbt.strategies.registry import STRATEGIES, load_strategy
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+def _file_stamps(paths):
+    # (path, size, mtime_ns) of each file, or None when one is missing; identifies a
+    # report's current content so a file rewritten by another run is noticed.
+    try:
+        return [[p, Path(p).stat().st_size, Path(p).stat().st_mtime_ns] for p in paths]
+    except FileNotFoundError:
+        return None
 
 def parse_args(argv=None):
     p = argparse.ArgumentParser(description="QBT-Lite CLI")
-    p.add_argument("--strategy", default="sma", choices=["sma","momentum","topn_momentum","bbands","rsi","macd"])
+    p.add_argument("--strategy", default="sma", choices=list(STRATEGIES))
     p.add_argument("--config", default=None)
     p.add_argument("--symbol", default="MOCK")
     p.add_argument("--data_csv", default=None)
@@ -30,73 +38,196 @@ def parse_args(argv=None):
     p.add_argument("--slippage", type=float, default=0.01)
     p.add_argument("--unit", type=int, default=1000)
     p.add_argument("--report_name", default="cli_run")
+    p.add_argument("--store", default=None, help="DataStore directory used instead of re-parsing CSVs")
+    p.add_argument("--cache_dir", default=None, help="directory that keeps computed indicators across runs")
+    p.add_argument("--results_dir", default=None, help="ResultStore directory; repeated runs reuse the stored NAV and report")
+    p.add_argument("--no_report", "--no-report", action="store_true",
+                   help="print the metrics only; skip the CSV/Markdown/PNG report (and the matplotlib import)")
+    return p.parse_args(argv)
+
+def parse_sweep_args(argv=None):
+    from qbt.core.sweep import SWEEPS
+    p = argparse.ArgumentParser(prog="qbt-lite sweep", description="QBT-Lite batched parameter sweep")
+    p.add_argument("--strategy", default="sma", choices=sorted(SWEEPS))
+    p.add_argument("--param", action="append", default=[], metavar="NAME=VALUES",
+                   help="grid axis, e.g. short_window=5,10,20 or long_window=20:200:10 (repeatable)")
+    p.add_argument("--symbol", default="MOCK")
+    p.add_argument("--data_csv", default=None)
+    p.add_argument("--commission_bps", type=float, default=0.0005)
+    p.add_argument("--slippage", type=float, default=0.01)
+    p.add_argument("--unit", type=int, default=1000)
+    p.add_argument("--rank_by", default="sharpe")
+    p.add_argument("--top", type=int, default=20)
+    p.add_argument("--report_name", default="sweep")
+    p.add_argument("--store", default=None, help="DataStore directory used instead of re-parsing CSVs")
+    p.add_argument("--cache_dir", default=None, help="directory that keeps computed indicators across runs")
     return p.parse_args(argv)
 
-def make_mock_df(n: int = 600, seed: int = 7, start: str = "2018-01-01") -> pd.DataFrame:
-    import numpy as np
-    rng = np.random.default_rng(seed)
-    rets = rng.normal(loc=0.0003, scale=0.01, size=n)
-    prices = 100 * np.exp(np.cumsum(rets))
-    close = prices
-    open_ = pd.Series(close).shift(1).fillna(close[0]).to_numpy()
-    high = (pd.Series([max(o,c) for o,c in zip(open_, close)]) * (1 + rng.uniform(0.0, 0.003, size=n))).to_numpy()
-    low = (pd.Series([min(o,c) for o,c in zip(open_, close)]) * (1 - rng.uniform(0.0, 0.003, size=n))).to_numpy()
-    volume = rng.integers(1_000, 10_000, size=n)
-    idx = pd.bdate_range(start=start, periods=n)
-    return pd.DataFrame({"datetime": idx, "open": open_, "high": high, "low": low, "close": close, "volume": volume})
-
-def main():
-    args = parse_args()
-    cfg = load_config(args.config) if args.config else {}
+def parse_ingest_args(argv=None):
+    p = argparse.ArgumentParser(prog="qbt-lite ingest", description="Convert OHLCV CSVs into a DataStore")
+    p.add_argument("csv", nargs="+", help="CSV files; the symbol is the file stem unless --symbol is given")
+    p.add_argument("--store", required=True)
+    p.add_argument("--symbol", default=None, help="symbol key (only with a single CSV)")
+    p.add_argument("--tz", default=None)
+    p.add_argument("--force", action="store_true", help="re-parse even if the CSV is unchanged")
+    return p.parse_args(argv)
+
+def parse_grid_values(text: str) -> list:
+    """Parse '5,10,20' (list) or '20:200:10' (start:stop:step, stop exclusive)."""
+    def num(x: str):
+        return int(x) if x.strip().lstrip("-").isdigit() else float(x)
+    if ":" in text:
+        start, stop, step = (num(x) for x in text.split(":"))
+        if all(isinstance(v, int) for v in (start, stop, step)):
+            return list(range(start, stop, step))
+        import numpy as np
+        return [round(v, 10) for v in np.arange(start, stop, step).tolist()]
+    return [num(x) for x in text.split(",") if x]
+
+def mock_bars(seed: int = 7, start: str = "2018-01-01", n: int = 600) -> pd.DataFrame:
+    """Daily random-walk OHLCV bars used when no data is given."""
+    from qbt.bench import synthetic_bars
+    return synthetic_bars(n, seed=seed, freq="B", start=start, drift=0.0003, vol=0.01,
+                          spread=(0.0, 0.003), volume=(1_000, 10_000))
+
+def load_single_symbol(symbol: str, data_csv: str | None = None, store: str | None = None) -> pd.DataFrame:
+    from qbt.data.loader import load_csv
+    if store:
+        from qbt.data.store import DataStore
+        ds = DataStore(store)
+        if data_csv:
+            ds.ingest_csv(data_csv, symbol=symbol)
+        elif symbol not in ds:
+            ds.write(symbol, mock_bars())
+        return ds.load(symbol, with_symbol=True)
+    if data_csv:
+        return load_csv(data_csv, symbol=symbol)
+    from qbt.bench import write_csv
+    path = write_csv(mock_bars(), f"examples/data_sample/{symbol}.csv")
+    return load_csv(str(path), symbol=symbol)
+
+def use_cache_dir(cache_dir: str | None):
+    if cache_dir:
+        from qbt.cache import IndicatorCache, set_cache
+        set_cache(IndicatorCache(disk_dir=cache_dir))
+
+def sweep_main(argv=None):
+    from qbt.core.broker import Broker
+    from qbt.core.sweep import sweep
+    args = parse_sweep_args(argv)
+    use_cache_dir(args.cache_dir)
+    grid = {}
+    for item in args.param:
+        name, _, values = item.partition("=")
+        if not values:
+            raise SystemExit(f"--param expects NAME=VALUES, got: {item}")
+        grid[name.strip()] = parse_grid_values(values)
+    data = load_single_symbol(args.symbol, args.data_csv, args.store)
+    broker = Broker(commission_bps=args.commission_bps, slippage=args.slippage)
+    table = sweep(data, args.strategy, grid, unit=args.unit, broker=broker, rank_by=args.rank_by)
+    Path("reports").mkdir(parents=True, exist_ok=True)
+    out = Path("reports") / f"{args.report_name}_sweep.csv"
+    table.to_csv(out, index=False)
+    print(f"Sweep ({args.strategy}): {len(table)} parameter sets, ranked by {args.rank_by}")
+    print(table.head(args.top).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print(f"Full table saved to {out}")
+    return table
+
+def ingest_main(argv=None):
+    from qbt.data.store import DataStore
+    args = parse_ingest_args(argv)
+    if args.symbol and len(args.csv) > 1:
+        raise SystemExit("--symbol can only be used with a single CSV")
+    ds = DataStore(args.store)
+    for path in args.csv:
+        sym = ds.ingest_csv(path, symbol=args.symbol, tz=args.tz, force=args.force)
+        print(f"{sym}: {ds.meta(sym)['rows']} rows")
+    print(f"Store: {args.store} ({len(ds.symbols())} symbols)")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == "sweep":
+        sweep_main(argv[1:])
+        return 0
+    if argv and argv[0] == "ingest":
+        ingest_main(argv[1:])
+        return 0
+    if argv and argv[0] == "bench":
+        from qbt.bench import main as bench_main
+        return bench_main(argv[1:])
+    args = parse_args(argv)
+    from qbt.core.broker import Broker
+    from qbt.results import ResultStore, result_key, summarize
+    use_cache_dir(args.cache_dir)
+    cfg = {}
+    if args.config:
+        from qbt.config import load_config
+        cfg = load_config(args.config)
     strategy_name = cfg.get("strategy", args.strategy)
     commission_bps = cfg.get("params", {}).get("commission_bps", args.commission_bps)
     slippage = cfg.get("params", {}).get("slippage", args.slippage)
     broker = Broker(commission_bps=commission_bps, slippage=slippage)
 
+    cls = load_strategy(strategy_name)
     if strategy_name == "topn_momentum":
+        from qbt.bench import write_csv
+        from qbt.data.loader import load_csv
+        from qbt.data.store import DataStore
         data_map = {}
         symbols = cfg.get("data", {}).get("symbols", ["AAA","BBB","CCC"])
         start = cfg.get("data", {}).get("start", "2018-01-01")
+        ds = DataStore(args.store) if args.store else None
         for i, sym in enumerate(symbols, start=1):
-            df = make_mock_df(seed=7+i, start=start)
-            path = f"examples/data_sample/{sym}.csv"
-            Path(path).parent.mkdir(parents=True, exist_ok=True)
-            df.to_csv(path, index=False)
-            data_map[sym] = load_csv(path, symbol=sym)
+            if ds is not None:
+                if sym not in ds:
+                    ds.write(sym, mock_bars(seed=7+i, start=start))
+                data_map[sym] = ds.load(sym, with_symbol=True)
+                continue
+            path = write_csv(mock_bars(seed=7+i, start=start), f"examples/data_sample/{sym}.csv")
+            data_map[sym] = load_csv(str(path), symbol=sym)
         lookback = cfg.get("params", {}).get("lookback", args.lookback)
         top_n = cfg.get("params", {}).get("top_n", args.top_n)
-        strat = TopNMomentum(data_map, params={"lookback": lookback, "top_n": top_n})
-        engine = BacktestEngineMulti(data_map=data_map, strategy=strat, starting_cash=100_000.0, broker=broker)
-        nav = engine.run()
+        data, params = data_map, {"lookback": lookback, "top_n": top_n}
     else:
-        if args.data_csv:
-            data = load_csv(args.data_csv, symbol=args.symbol)
+        data = load_single_symbol(args.symbol, args.data_csv, args.store)
+        params = {
+            "sma": {"short_window": args.short, "long_window": args.long},
+            "momentum": {"lookback": args.lookback, "threshold": 0.0},
+            "bbands": {"lookback": args.lookback, "num_std": 2.0},
+            "rsi": {"lookback": args.lookback, "lower": 30, "upper": 70},
+            "macd": {"fast":12, "slow":26, "signal":9},
+        }.get(strategy_name, {})
+        params = {**params, "symbol": args.symbol, "unit": args.unit}
+
+    results = ResultStore(args.results_dir) if args.results_dir else None
+    key = result_key(data, cls, params, broker, 100_000.0) if results is not None else ""
+    res = results.get(key) if results is not None else None
+    if res is None:
+        if strategy_name == "topn_momentum":
+            from qbt.core.engine_multi import BacktestEngineMulti
+            engine = BacktestEngineMulti(data_map=data, strategy=cls(data, params=params), starting_cash=100_000.0, broker=broker)
         else:
-            df = make_mock_df()
-            path = f"examples/data_sample/{args.symbol}.csv"
-            Path(path).parent.mkdir(parents=True, exist_ok=True)
-            df.to_csv(path, index=False)
-            data = load_csv(path, symbol=args.symbol)
-        if strategy_name == "sma":
-            strat = SmaCross(data, params={"short_window": args.short, "long_window": args.long, "symbol": args.symbol, "unit": args.unit})
-        elif strategy_name == "momentum":
-            strat = Momentum(data, params={"lookback": args.lookback, "threshold": 0.0, "symbol": args.symbol, "unit": args.unit})
-        elif strategy_name == "bbands":
-            strat = BollingerBands(data, params={"lookback": args.lookback, "num_std": 2.0, "symbol": args.symbol, "unit": args.unit})
-        elif strategy_name == "rsi":
-            strat = RSIStrategy(data, params={"lookback": args.lookback, "lower": 30, "upper": 70, "symbol": args.symbol, "unit": args.unit})
-        elif strategy_name == "macd":
-            strat = MACDStrategy(data, params={"fast":12, "slow":26, "signal":9, "symbol": args.symbol, "unit": args.unit})
-        engine = BacktestEngine(data=data, symbol=args.symbol, strategy=strat, starting_cash=100_000.0, broker=broker)
-        nav = engine.run()
-
-    nav_norm = nav / nav.iloc[0]
-    perf = performance_from_nav(nav_norm, risk_free=0.0, periods_per_year=252)
+            from qbt.core.engine import BacktestEngine
+            engine = BacktestEngine(data=data, symbol=args.symbol, strategy=cls(data, params=params), starting_cash=100_000.0, broker=broker)
+        res = summarize(engine.run(), engine.fills())
+        if results is not None:
+            results.put(key, res)
+
     print("Performance Summary (CLI)")
-    for k, v in perf.items():
+    for k, v in res.metrics.items():
         print(f"- {k}: {v:.4f}")
+    if args.no_report:
+        return
+    report = [str(Path("reports") / f"{args.report_name}_{part}") for part in ("metrics.csv", "equity.png", "drawdown.png")]
+    stamps = _file_stamps(report) if results is not None else None
+    if stamps is not None and res.meta.get("report") == stamps:
+        print("Report up to date in reports/")
+        return
     from qbt.report.report import generate_report
-    generate_report(nav, args.report_name)
+    generate_report(res.nav, args.report_name)
+    if results is not None:
+        res.meta["report"] = _file_stamps(report)
+        results.put(key, res)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,9 +1,10 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import Optional
 
 @dataclass
 class Order:
-    """A very minimal market order representation.
+    """A minimal order representation.
 
     Attributes
     ----------
@@ -13,10 +14,26 @@ class Order:
         Positive integer. For MVP we do not support shorting; sell is handled by selling current position.
     side : str
         'buy' or 'sell'.
+    order_type : str
+        'market' (default), 'limit', 'stop' or 'stop_limit'. Non-market orders rest in a
+        :class:`qbt.core.orderbook.OrderBook` until a bar's high/low reaches them.
+    limit_price : float, optional
+        Required for 'limit' and 'stop_limit'.
+    stop_price : float, optional
+        Trigger price, required for 'stop' and 'stop_limit'.
+    tif : str
+        Time in force of resting orders: 'gtc' (good till cancelled) or 'day' (one bar).
+    order_id : int, optional
+        Assigned by the order book.
     """
     symbol: str
     qty: int
     side: str  # 'buy' or 'sell'
+    order_type: str = "market"
+    limit_price: Optional[float] = None
+    stop_price: Optional[float] = None
+    tif: str = "gtc"
+    order_id: Optional[int] = None
 
 class Broker:
     """A simple broker that applies commission and slippage in a naive way.
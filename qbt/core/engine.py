@@ -1,16 +1,65 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
-from typing import Optional
+from typing import Dict, Optional
 from .broker import Broker, Order
+from .kernels import execute_orders, orders_from_targets
+from .orderbook import OrderBook
 from .portfolio import Portfolio
+from .profiling import NullProfiler
+
+class BarView:
+    """Lightweight, read-only view of one bar backed by column arrays.
+
+    Supports the parts of the ``pd.Series`` row API that strategies use on ``ctx.data``:
+    ``bar["close"]``, ``bar.close``, ``bar.get("close")``, ``bar[["open", "close"]]``
+    and ``bar.name`` (the bar timestamp).
+    """
+    __slots__ = ("_cols", "_i", "name")
+
+    def __init__(self, cols: Dict[str, np.ndarray], i: int, name=None):
+        self._cols = cols   # column name -> 1-D array
+        self._i = i
+        self.name = name
+
+    def __getitem__(self, key):
+        if isinstance(key, (list, tuple)):
+            return pd.Series({k: self._cols[k][self._i] for k in key}, name=self.name)
+        return self._cols[key][self._i]
+
+    def __getattr__(self, key):
+        try:
+            return self._cols[key][self._i]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __contains__(self, key) -> bool:
+        return key in self._cols
+
+    def __iter__(self):
+        return iter(self._cols)
+
+    def keys(self):
+        return self._cols.keys()
+
+    def get(self, key, default=None):
+        col = self._cols.get(key)
+        return default if col is None else col[self._i]
+
+    def to_series(self) -> pd.Series:
+        return pd.Series({k: col[self._i] for k, col in self._cols.items()}, name=self.name)
+
+    def __repr__(self) -> str:
+        return f"BarView({self.name}, {dict((k, col[self._i]) for k, col in self._cols.items())})"
 
 class Context:
     # Lightweight context passed to strategies each bar.
-    def __init__(self, now, data_slice: pd.Series, portfolio: Portfolio, submit_order_cb):
+    def __init__(self, now, data_slice: pd.Series, portfolio: Portfolio, submit_order_cb, cancel_order_cb=None):
         self.now = now
         self.data = data_slice       # current row (open/high/low/close/volume)
         self.portfolio = portfolio
-        self.submit_order = submit_order_cb  # function(symbol, qty, side)
+        self.submit_order = submit_order_cb  # function(symbol, qty, side, order_type=..., ...)
+        self.cancel_order = cancel_order_cb  # function(order_id) -> bool
 
 class BacktestEngine:
     """Event-driven backtest engine (single symbol, daily bars).
@@ -20,19 +69,35 @@ class BacktestEngine:
     - Signals are generated on bar t (after seeing close[t]).
     - Market orders are executed at the NEXT bar open (open[t+1]) with slippage/commission.
     - This avoids lookahead bias for close-to-next-open execution.
+    - Limit, stop and stop-limit orders rest in :attr:`book` (:class:`qbt.core.orderbook.OrderBook`)
+      and are matched against the high/low of each following bar, before the bar is marked.
+
+    Fast mode
+    ---------
+    With ``fast=True`` the columns are pulled into contiguous NumPy arrays once and
+    strategies receive a :class:`BarView` instead of a ``pd.Series`` built by ``iloc``.
+    Results are identical to the default mode.
+
+    Signal arrays
+    -------------
+    Strategies that implement ``target_positions()`` can skip the Python loop with
+    :meth:`run_targets`, which runs the same fills through :mod:`qbt.core.kernels`.
+
+    Profiling
+    ---------
+    With ``profiler=Profiler()`` (:mod:`qbt.core.profiling`) the run records time per
+    stage: ``data`` (row/BarView), ``mark``, ``strategy`` and ``execute``.
     """
     def __init__(self,
                  data: pd.DataFrame,
                  symbol: str,
                  strategy,
                  starting_cash: float = 100_000.0,
-                 broker: Optional[Broker] = None):
+                 broker: Optional[Broker] = None,
+                 fast: bool = False,
+                 profiler=None):
         self.data = data.copy()
-        self.symbol = symbol
-        self.strategy = strategy
-        self.portfolio = Portfolio(starting_cash=starting_cash)
-        self.broker = broker or Broker()
-        self._pending_order = None  # will execute at next bar open
+        self._init_state(symbol, strategy, starting_cash, broker, fast, profiler)
 
         # Basic input checks
         for col in ["open","high","low","close","volume"]:
@@ -42,37 +107,138 @@ class BacktestEngine:
             raise ValueError("Data index must be DatetimeIndex.")
         self.data = self.data.sort_index()
 
-    def submit_order(self, symbol: str, qty: int, side: str):
-        """Queue a market order to be executed on the next bar open.
+    def _init_state(self, symbol: str, strategy, starting_cash: float, broker: Optional[Broker], fast: bool, profiler):
+        # Run state shared with StreamingBacktestEngine, which has no ``data`` frame.
+        self.symbol = symbol
+        self.strategy = strategy
+        self.portfolio = Portfolio(starting_cash=starting_cash, symbol=symbol)
+        self.broker = broker or Broker()
+        self.fast = fast
+        self.profiler = profiler
+        self._pending_order = None  # will execute at next bar open
+        self.book = OrderBook()     # resting limit/stop orders
+        self._fills = []            # (timestamp, side, qty, price, fee) per executed order
+
+    def submit_order(self, symbol: str, qty: int, side: str, order_type: str = "market",
+                     limit_price: Optional[float] = None, stop_price: Optional[float] = None,
+                     tif: str = "gtc") -> Optional[int]:
+        """Queue a market order, or rest a limit/stop/stop-limit order in the book.
 
-        For MVP we allow only a single pending order per bar. The last one wins.
+        Market orders execute on the next bar open; only a single pending market order is
+        kept per bar (the last one wins). Other order types are added to :attr:`book`, any
+        number of them, and the order id is returned for :meth:`cancel_order`.
         """
-        self._pending_order = Order(symbol=symbol, qty=int(qty), side=side)
+        order = Order(symbol=symbol, qty=int(qty), side=side, order_type=order_type,
+                      limit_price=limit_price, stop_price=stop_price, tif=tif)
+        if order_type == "market":
+            self._pending_order = order
+            return None
+        return self.book.add(order)
+
+    def cancel_order(self, order_id: int) -> bool:
+        """Cancel a resting order; ``False`` if it is no longer in the book."""
+        return self.book.cancel(order_id)
+
+    def _column_arrays(self) -> Dict[str, np.ndarray]:
+        # One contiguous array per column, extracted once per run.
+        return {col: np.ascontiguousarray(self.data[col].to_numpy()) for col in self.data.columns}
+
+    def _process_bar(self, ts, row, lap):
+        # ``lap`` is the profiler's stage hook (a no-op without a profiler).
+        # Resting orders from previous bars trade against this bar's range
+        if self.book:
+            self._match_book(ts, row)
+            lap("execute")
+
+        # Mark-to-market at close
+        self.portfolio.mark_to_market(ts, last_price=row["close"])
+        lap("mark")
+
+        # Build context for strategy
+        ctx = Context(now=ts, data_slice=row, portfolio=self.portfolio, submit_order_cb=self.submit_order,
+                      cancel_order_cb=self.cancel_order)
+        # Strategy generates a signal using CURRENT bar
+        self.strategy.on_bar(ctx)
+        lap("strategy")
+
+        # If there is a pending order from PREVIOUS bar, execute now at this bar's OPEN
+        if self._pending_order is not None:
+            self._execute_pending(ts, row["open"])
+            lap("execute")
+
+    def _execute_pending(self, ts, open_price):
+        # Execute at current bar open (order placed last bar)
+        exec_price = self.broker.transact(price=open_price, order=self._pending_order)
+        self._fill(ts, self._pending_order, exec_price)
+        self._pending_order = None
+
+    def _fill(self, ts, order: Order, exec_price: float):
+        fee = self.broker.commission(exec_price, order.qty)
+        self._fills.append((ts, order.side, order.qty, exec_price, fee))
+        self.portfolio.on_fill(timestamp=ts, executed_price=exec_price, qty=order.qty, side=order.side, fee=fee)
+
+    def _match_book(self, ts, row):
+        # Limit fills are at (or better than) the limit price; stops become market orders and pay slippage.
+        for order, price in self.book.match(self.symbol, row["open"], row["high"], row["low"]):
+            self._fill(ts, order, self.broker.transact(price, order) if order.order_type == "stop" else price)
 
     def run(self):
         # Iterate bars and execute: mark-to-market -> strategy -> execute pending on next open
         index = self.data.index
+        self.portfolio.reserve(len(index))
+        cols = self._column_arrays() if self.fast else None
+        prof = self.profiler or NullProfiler()
+        lap = prof.lap
+        prof.start()
         for i, ts in enumerate(index):
-            row = self.data.iloc[i]
-            # Mark-to-market at close
-            self.portfolio.mark_to_market(ts, last_price=row["close"])
-
-            # Build context for strategy
-            ctx = Context(now=ts, data_slice=row, portfolio=self.portfolio, submit_order_cb=self.submit_order)
-            # Strategy generates a signal using CURRENT bar
-            self.strategy.on_bar(ctx)
-
-            # If there is a pending order from PREVIOUS bar, execute now at this bar's OPEN
-            if self._pending_order is not None and i < len(index):
-                # Execute at current bar open (order placed last bar)
-                exec_price = self.broker.transact(price=row["open"], order=self._pending_order)
-                fee = self.broker.commission(exec_price, self._pending_order.qty)
-                self.portfolio.on_fill(timestamp=ts,
-                                       executed_price=exec_price,
-                                       qty=self._pending_order.qty,
-                                       side=self._pending_order.side,
-                                       fee=fee)
-                self._pending_order = None
+            row = BarView(cols, i, ts) if cols is not None else self.data.iloc[i]
+            lap("data")
+            self._process_bar(ts, row, lap)
+        prof.stop(len(index))
 
         # Return equity series for convenience
         return self.portfolio.equity_series()
+
+    def fills(self) -> pd.DataFrame:
+        """Executed orders of the run, one row per fill."""
+        rows = self._fills
+        return pd.DataFrame({"timestamp": pd.DatetimeIndex([r[0] for r in rows]),
+                             "symbol": self.symbol,
+                             "side": [r[1] for r in rows],
+                             "qty": np.array([r[2] for r in rows], dtype=np.int64),
+                             "price": np.array([r[3] for r in rows], dtype=float),
+                             "fee": np.array([r[4] for r in rows], dtype=float)})
+
+    def run_targets(self, targets=None, jit: Optional[bool] = None):
+        """Run a target-position signal through the compiled order/fill/mark kernel.
+
+        ``targets`` (default: ``strategy.target_positions()``) is the position to hold
+        after each bar. Portfolio, ledger and equity end up exactly as after :meth:`run`
+        for a strategy that trades those targets; the raw arrays are kept in
+        ``kernel_result``. ``jit`` is passed to :func:`qbt.core.kernels.execute_orders`.
+        """
+        index = self.data.index
+        targets = self.strategy.target_positions() if targets is None else targets
+        if isinstance(targets, pd.Series):
+            targets = targets.reindex(index).ffill().fillna(0)
+        targets = np.asarray(targets)
+        if targets.shape != (len(index),):
+            raise ValueError("targets must have one value per bar")
+        close = self.data["close"].to_numpy(dtype=float)
+        pf = self.portfolio
+        r = execute_orders(self.data["open"].to_numpy(dtype=float), close, orders_from_targets(targets),
+                           starting_cash=pf.cash, commission_bps=self.broker.commission_bps,
+                           slippage=self.broker.slippage, jit=jit)
+        held = np.concatenate([[0], r.position[:-1]])
+        cash = np.concatenate([[pf.cash], r.cash[:-1]])
+        pf.ledger.extend(index, cash, r.equity, held[:, None], (held * close)[:, None])
+        if len(index):
+            pf.cash = float(r.cash[-1])
+            pf.position.qty = int(r.position[-1])
+            pf.position.cost_basis = float(r.basis[-1])
+        traded = np.flatnonzero(r.trade_qty)
+        self._fills = list(zip(index[traded], np.where(r.trade_qty[traded] > 0, "buy", "sell").tolist(),
+                               np.abs(r.trade_qty[traded]).tolist(), r.exec_price[traded].tolist(),
+                               r.fee[traded].tolist()))
+        self.kernel_result = r
+        return pf.equity_series()
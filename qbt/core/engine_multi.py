@@ -1,80 +1,198 @@
 from __future__ import annotations
-from typing import Dict, Optional
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Union
+import numpy as np
 import pandas as pd
-from .broker import Broker, Order
+from .broker import Broker
+from .engine import BarView
+from .kernels import execute_orders, orders_from_targets
 from .portfolio_multi import PortfolioMulti
+from .profiling import NullProfiler
+from .universe import AlignedUniverse
+
+class BarMap(Mapping):
+    """``{symbol: bar}`` for one timestamp; bars are :class:`BarView` rows over the universe arrays."""
+    __slots__ = ("_u", "_i", "_ts")
+
+    def __init__(self, universe: AlignedUniverse, i: int, ts):
+        self._u = universe; self._i = i; self._ts = ts
+
+    def __getitem__(self, symbol: str) -> BarView:
+        return BarView(self._u.columns(symbol), self._i, self._ts)
+
+    def __iter__(self):
+        return iter(self._u.symbols)
+
+    def __len__(self) -> int:
+        return len(self._u.symbols)
 
 class ContextMulti:
-    def __init__(self, now, data_bar_map: Dict[str, pd.Series], portfolio: PortfolioMulti, submit_order_cb, submit_target_weights_cb):
+    """Per-bar context for multi-asset strategies.
+
+    Besides the ``data`` mapping of bars, array-native strategies get ``i`` (bar number
+    in ``index``), ``prices`` (closes in ``symbols`` order), ``submit_orders`` (one
+    signed quantity per symbol) and ``universe`` (the engine's :class:`AlignedUniverse`).
+    """
+    def __init__(self, now, data_bar_map: Mapping, portfolio: PortfolioMulti, submit_order_cb, submit_target_weights_cb,
+                 symbols: Optional[List[str]] = None, i: Optional[int] = None, index=None, prices=None, submit_orders_cb=None,
+                 universe: Optional[AlignedUniverse] = None):
         self.now = now
         self.data = data_bar_map
         self.portfolio = portfolio
         self.submit_order = submit_order_cb
         self.submit_target_weights = submit_target_weights_cb
-        self.symbols = list(data_bar_map.keys())
+        self.symbols = symbols if symbols is not None else list(data_bar_map.keys())
+        self.i = i
+        self.index = index
+        self.prices = prices
+        self.submit_orders = submit_orders_cb
+        self.universe = universe
 
 class BacktestEngineMulti:
-    def __init__(self, data_map: Dict[str, pd.DataFrame], strategy, starting_cash: float = 100_000.0, broker: Optional[Broker] = None):
-        if not data_map:
-            raise ValueError("data_map is empty")
-        indices = [df.index for df in data_map.values()]
-        common = indices[0]
-        for idx in indices[1:]:
-            common = common.intersection(idx)
-        if len(common) < 3:
+    """Multi-asset engine over an :class:`~qbt.core.universe.AlignedUniverse`.
+
+    ``data_map`` is a ``{symbol: frame}`` dict, aligned here on the intersection
+    (``how="inner"``, default) or union (``how="outer"``) of the timestamps, or a
+    prebuilt universe to share across runs. Prices are the universe's (time x symbol)
+    arrays; pending orders are one signed quantity per symbol (last one wins) and fill
+    together at the bar's open with a single vector update. On a union calendar a
+    symbol's orders wait for its next real bar, while marks use its forward-filled close.
+    Target-position signals can bypass the loop entirely via :meth:`run_targets`.
+    ``profiler`` (:class:`qbt.core.profiling.Profiler`) times the ``mark``, ``context``,
+    ``strategy`` and ``execute`` stages of each bar.
+    """
+    def __init__(self, data_map: Union[Dict[str, pd.DataFrame], AlignedUniverse], strategy, starting_cash: float = 100_000.0,
+                 broker: Optional[Broker] = None, profiler=None, how: str = "inner"):
+        universe = data_map if isinstance(data_map, AlignedUniverse) else AlignedUniverse(data_map, how=how)
+        if len(universe.index) < 3:
             raise ValueError("Not enough overlapping timestamps.")
-        self.data_map = {sym: df.loc[common].sort_index() for sym, df in data_map.items()}
-        for sym, df in self.data_map.items():
-            for col in ["open","high","low","close","volume"]:
-                if col not in df.columns:
-                    raise ValueError(f"{sym} missing column: {col}")
-        self.symbols = list(self.data_map.keys())
-        self.index = common
+        self.universe = universe
+        self.symbols = universe.symbols
+        self.col = universe.col
+        self.index = universe.index
         self.strategy = strategy
-        self.portfolio = PortfolioMulti(starting_cash=starting_cash)
+        self.portfolio = PortfolioMulti(starting_cash=starting_cash, symbols=self.symbols)
         self.broker = broker or Broker()
-        self._pending: Dict[str, Order] = {}
+        self.profiler = profiler
+        self._pending_qty = np.zeros(len(self.symbols), dtype=np.int64)  # signed: +buy / -sell
+        self._fills = []   # (timestamp, cols, price, signed qty, fee) per bar with fills
+
+    @property
+    def data_map(self) -> AlignedUniverse:
+        """``{symbol: frame}`` view of the universe."""
+        return self.universe
+
+    def field(self, name: str) -> np.ndarray:
+        """(time x symbol) array of one column."""
+        return self.universe.field(name)
 
     def submit_order(self, symbol: str, qty: int, side: str):
-        if symbol not in self.symbols:
+        if symbol not in self.col:
             raise ValueError(f"Unknown symbol: {symbol}")
-        self._pending[symbol] = Order(symbol=symbol, qty=int(qty), side=side)
+        self._pending_qty[self.col[symbol]] = int(qty) if side == "buy" else -int(qty)
+
+    def submit_orders(self, qty: np.ndarray):
+        """Queue one signed order per symbol (``symbols`` order); zeros leave pending orders alone."""
+        qty = np.asarray(qty, dtype=np.int64)
+        nz = qty != 0
+        self._pending_qty[nz] = qty[nz]
 
-    def submit_target_weights(self, weights: Dict[str, float], prices: Dict[str, float]):
-        total = sum(max(w, 0.0) for w in weights.values())
+    def submit_target_weights(self, weights: Union[Dict[str, float], np.ndarray], prices: Union[Dict[str, float], np.ndarray]):
+        """Queue the orders that move the portfolio to ``weights`` of current equity.
+
+        Negative weights are floored at zero and the rest normalized to sum to one.
+        """
+        if isinstance(weights, Mapping):
+            weights = np.array([weights.get(sym, 0.0) for sym in self.symbols], dtype=float)
+        weights = np.maximum(np.asarray(weights, dtype=float), 0.0)
+        total = weights.sum()
         if total <= 0:
             return
-        weights = {sym: max(0.0, w) / total for sym, w in weights.items() if sym in self.symbols}
-        equity = self.portfolio.cash
-        for sym in self.symbols:
-            if sym in self.portfolio.positions:
-                equity += self.portfolio.positions[sym].qty * prices[sym]
-        for sym in self.symbols:
-            target_val = weights.get(sym, 0.0) * equity
-            px = prices[sym]
-            current_qty = self.portfolio.positions.get(sym, None).qty if sym in self.portfolio.positions else 0
-            target_qty = int(target_val // max(px, 1e-8))
-            delta = target_qty - current_qty
-            if delta > 0:
-                self.submit_order(sym, qty=delta, side="buy")
-            elif delta < 0:
-                self.submit_order(sym, qty=abs(delta), side="sell")
+        prices = self.portfolio.prices_array(prices)
+        equity = self.portfolio.equity(prices)
+        prices = np.where(np.isnan(prices), np.inf, np.maximum(prices, 1e-8))   # no bar yet: no position
+        target_qty = np.floor_divide(weights / total * equity, prices).astype(np.int64)
+        self.submit_orders(target_qty - self.portfolio.qty)
+
+    def _execute(self, ts, open_row: np.ndarray, valid_row: Optional[np.ndarray] = None):
+        q = self._pending_qty
+        cols = np.flatnonzero(q) if valid_row is None else np.flatnonzero((q != 0) & valid_row)
+        if not len(cols):
+            return
+        qty = q[cols]
+        exec_px = open_row[cols] + np.where(qty > 0, self.broker.slippage, -self.broker.slippage)
+        fee = self.broker.commission(exec_px, np.abs(qty))
+        self.portfolio.on_fills(ts, cols, exec_px, qty, fee)
+        self._fills.append((ts, cols, exec_px, qty, fee))
+        q[cols] = 0
 
     def run(self):
         idx = self.index
+        self.portfolio.reserve(len(idx))
+        opens, closes = self.field("open"), self.field("close")
+        bars = self.universe
+        valid = None if bars.dense else bars.valid
+        prof = self.profiler or NullProfiler()
+        lap = prof.lap
+        prof.start()
         for i, ts in enumerate(idx):
-            last_prices = {sym: self.data_map[sym].iloc[i]["close"] for sym in self.symbols}
-            self.portfolio.mark_to_market(ts, last_prices)
-            bar_map = {sym: self.data_map[sym].iloc[i] for sym in self.symbols}
-            ctx = ContextMulti(now=ts, data_bar_map=bar_map, portfolio=self.portfolio,
+            prices = closes[i]
+            self.portfolio.mark_to_market(ts, prices)
+            lap("mark")
+            ctx = ContextMulti(now=ts, data_bar_map=BarMap(bars, i, ts), portfolio=self.portfolio,
                                submit_order_cb=self.submit_order,
-                               submit_target_weights_cb=lambda w: self.submit_target_weights(w, last_prices))
+                               submit_target_weights_cb=lambda w, p=prices: self.submit_target_weights(w, p),
+                               symbols=self.symbols, i=i, index=idx, prices=prices, submit_orders_cb=self.submit_orders,
+                               universe=bars)
+            lap("context")
             self.strategy.on_bar(ctx)
-            if self._pending and i < len(idx):
-                for sym, order in list(self._pending.items()):
-                    open_px = self.data_map[sym].iloc[i]["open"]
-                    exec_px = self.broker.transact(price=open_px, order=order)
-                    fee = self.broker.commission(exec_px, order.qty)
-                    self.portfolio.on_fill(timestamp=ts, symbol=sym, executed_price=exec_px, qty=order.qty, side=order.side, fee=fee)
-                self._pending.clear()
+            lap("strategy")
+            if self._pending_qty.any():
+                self._execute(ts, opens[i], None if valid is None else valid[i])
+                lap("execute")
+        prof.stop(len(idx))
         return self.portfolio.equity_series()
+
+    def fills(self) -> pd.DataFrame:
+        """Executed orders of the run, one row per symbol and fill bar."""
+        batches = self._fills
+        cols = np.concatenate([b[1] for b in batches]) if batches else np.zeros(0, dtype=np.int64)
+        qty = np.concatenate([b[3] for b in batches]) if batches else np.zeros(0, dtype=np.int64)
+        ts = pd.DatetimeIndex([b[0] for b in batches], dtype=self.index.dtype).repeat([len(b[1]) for b in batches])
+        return pd.DataFrame({"timestamp": ts,
+                             "symbol": np.array(self.symbols, dtype=object)[cols],
+                             "side": np.where(qty > 0, "buy", "sell"),
+                             "qty": np.abs(qty),
+                             "price": np.concatenate([b[2] for b in batches]) if batches else np.zeros(0),
+                             "fee": np.concatenate([b[4] for b in batches]) if batches else np.zeros(0)})
+
+    def run_targets(self, targets=None, jit: Optional[bool] = None):
+        """Run (time x symbol) target positions through the compiled order/fill/mark kernel.
+
+        ``targets`` (default: ``strategy.target_positions()``) is a DataFrame aligned to
+        ``index``/``symbols`` by label, or an array in that layout. Equity matches
+        :meth:`run` up to the last bits of the per-bar sums; the raw arrays are kept in
+        ``kernel_result``.
+        """
+        targets = self.strategy.target_positions() if targets is None else targets
+        if isinstance(targets, pd.DataFrame):
+            targets = targets.reindex(index=self.index, columns=self.symbols).ffill().fillna(0)
+        targets = np.asarray(targets)
+        if targets.shape != (len(self.index), len(self.symbols)):
+            raise ValueError("targets must be (bars x symbols)")
+        closes = self.field("close")
+        pf = self.portfolio
+        r = execute_orders(self.field("open"), closes, orders_from_targets(targets),
+                           starting_cash=pf.cash, commission_bps=self.broker.commission_bps,
+                           slippage=self.broker.slippage, jit=jit)
+        held = np.zeros_like(r.position)
+        held[1:] = r.position[:-1]
+        cash = np.concatenate([[pf.cash], r.cash[:-1]])
+        pf.ledger.extend(self.index, cash, r.equity, held, np.where(held != 0, held * closes, 0.0))
+        pf.cash = float(r.cash[-1])
+        pf.qty[:], pf.basis[:] = r.position[-1], r.basis[-1]
+        pf.traded |= (r.trade_qty != 0).any(axis=0)
+        self._fills = [(self.index[t], np.flatnonzero(row), r.exec_price[t][row != 0], row[row != 0], r.fee[t][row != 0])
+                       for t, row in enumerate(r.trade_qty) if row.any()]
+        self.kernel_result = r
+        return pf.equity_series()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+from .broker import Broker
+from .engine import BacktestEngine, BarView
+from .profiling import NullProfiler
+
+class StreamingBacktestEngine(BacktestEngine):
+    """``BacktestEngine`` over a stream of OHLCV chunks, for histories that do not fit in memory.
+
+    Feed it the output of :func:`qbt.data.loader.iter_csv_chunks` (or any iterable of
+    time-ordered OHLCV frames). Only the current chunk is materialized; strategies get
+    ``strategy.on_chunk(chunk)`` before its bars so indicator state can carry across
+    chunk boundaries (see :meth:`qbt.strategies.base.Strategy.on_chunk`). Bars are
+    processed exactly as in ``BacktestEngine(fast=True)``; a profiler also times the
+    ``load`` (reading the next chunk) and ``on_chunk`` stages.
+
+    Example
+    -------
+    >>> chunks = iter_csv_chunks("minute_bars.csv", chunksize=500_000, symbol="ES")
+    >>> strat = SmaCross(None, params={"short_window": 20, "long_window": 100, "symbol": "ES"})
+    >>> nav = StreamingBacktestEngine(chunks, "ES", strat).run()
+    """
+    def __init__(self,
+                 chunks: Iterable[pd.DataFrame],
+                 symbol: str,
+                 strategy,
+                 starting_cash: float = 100_000.0,
+                 broker: Optional[Broker] = None,
+                 profiler=None):
+        self.data = None  # never materialized
+        self.chunks = chunks
+        self._init_state(symbol, strategy, starting_cash, broker, True, profiler)
+        self.bars_processed = 0
+
+    def run(self):
+        last = None
+        prof, start = self.profiler or NullProfiler(), self.bars_processed
+        lap, step = prof.lap, self._process_bar
+        prof.start()
+        for chunk in self.chunks:
+            if len(chunk) == 0:
+                continue
+            for col in ["open","high","low","close","volume"]:
+                if col not in chunk.columns:
+                    raise ValueError(f"Data missing required column: {col}")
+            if not isinstance(chunk.index, pd.DatetimeIndex):
+                raise ValueError("Data index must be DatetimeIndex.")
+            if not chunk.index.is_monotonic_increasing or (last is not None and chunk.index[0] <= last):
+                raise ValueError("Chunks must be time-ordered and non-overlapping.")
+            last = chunk.index[-1]
+            lap("load")
+            on_chunk = getattr(self.strategy, "on_chunk", None)
+            if on_chunk is not None:
+                on_chunk(chunk)
+                lap("on_chunk")
+            cols = {col: np.ascontiguousarray(chunk[col].to_numpy()) for col in chunk.columns}
+            for i, ts in enumerate(chunk.index):
+                row = BarView(cols, i, ts)
+                lap("data")
+                step(ts, row, lap)
+            self.bars_processed += len(chunk)
+        prof.stop(self.bars_processed - start)
+        return self.portfolio.equity_series()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional, Union
+import numpy as np
+import pandas as pd
+from .broker import Broker
+
+@dataclass
+class SimulationResult:
+    """Arrays produced by :func:`simulate_targets`; every field has the shape of ``targets``.
+
+    position  : holdings after the fill on each bar
+    trade_qty : signed quantity filled on each bar (0 = no trade)
+    exec_price: fill price including slippage (NaN when no trade)
+    fee       : commission paid on each bar
+    cash      : cash after the fill on each bar
+    equity    : marked equity recorded on each bar
+    """
+    position: np.ndarray
+    trade_qty: np.ndarray
+    exec_price: np.ndarray
+    fee: np.ndarray
+    cash: np.ndarray
+    equity: np.ndarray
+
+def simulate_targets(open_: np.ndarray, close: np.ndarray, targets: np.ndarray,
+                     starting_cash: float = 100_000.0, commission_bps: float = 0.0,
+                     slippage: float = 0.0) -> SimulationResult:
+    """Turn target positions into fills, cash and equity with array operations only.
+
+    Parameters
+    ----------
+    open_, close : np.ndarray
+        Bar prices, shape (n,).
+    targets : np.ndarray
+        Integer position to hold after each bar, shape (n,) or (k, n) for k runs at once.
+    starting_cash : float
+        Initial cash of every run.
+    commission_bps, slippage : float
+        Same meaning as in :class:`qbt.core.broker.Broker`.
+
+    Notes
+    -----
+    Uses the fill timing of ``BacktestEngine``: the position change decided on bar t is
+    filled at open[t], and the equity recorded on bar t is marked at close[t] with the
+    holdings from *before* that fill. Floating-point operations are applied in the same
+    order as ``Broker``/``Portfolio`` so the results match the loop engine bit for bit.
+    """
+    targets = np.asarray(targets, dtype=np.int64)
+    open_ = np.asarray(open_, dtype=float)
+    close = np.asarray(close, dtype=float)
+    prev = np.zeros_like(targets)
+    prev[..., 1:] = targets[..., :-1]
+    trade_qty = targets - prev
+    exec_price, fee, cash_delta = _fill_arrays(open_, trade_qty, commission_bps, slippage)
+    cash_before, cash_after = _running_cash(starting_cash, cash_delta)
+    equity = cash_before + prev * close
+    return SimulationResult(position=targets, trade_qty=trade_qty, exec_price=exec_price,
+                            fee=fee, cash=cash_after, equity=equity)
+
+def _fill_arrays(open_: np.ndarray, trade_qty: np.ndarray, commission_bps: float, slippage: float):
+    # Fill price, fee and cash change of signed orders at ``open_``, as Broker/Portfolio apply them.
+    buy = trade_qty > 0
+    traded = trade_qty != 0
+    qty = np.abs(trade_qty)
+    exec_price = np.where(buy, open_ + slippage, open_ - slippage)
+    exec_price = np.where(traded, exec_price, np.nan)
+    notional = np.where(traded, exec_price * qty, 0.0)
+    fee = notional * commission_bps
+    cash_delta = np.where(buy, -notional - fee, notional - fee)
+    return exec_price, fee, cash_delta
+
+def _running_cash(starting_cash: float, cash_delta: np.ndarray):
+    # Cash before and after each bar (last axis); the starting cash is prepended so the
+    # running sum adds deltas in the loop engine's order.
+    start = np.full(cash_delta.shape[:-1] + (1,), float(starting_cash))
+    cash = np.cumsum(np.concatenate([start, cash_delta], axis=-1), axis=-1)
+    return cash[..., :-1], cash[..., 1:]
+
+class BacktestEngineVectorized:
+    """Single-symbol backtester that replaces the bar loop with array operations.
+
+    The strategy describes what it wants to hold instead of reacting bar by bar: it must
+    implement ``target_positions() -> pd.Series`` (integer holdings per bar), or a target
+    series can be passed directly via ``targets``. Output matches ``BacktestEngine`` exactly
+    for the built-in single-symbol strategies.
+    """
+    def __init__(self,
+                 data: pd.DataFrame,
+                 symbol: str,
+                 strategy=None,
+                 starting_cash: float = 100_000.0,
+                 broker: Optional[Broker] = None,
+                 targets: Optional[Union[pd.Series, np.ndarray]] = None):
+        if strategy is None and targets is None:
+            raise ValueError("Provide a strategy with target_positions() or a targets series.")
+        for col in ["open","high","low","close","volume"]:
+            if col not in data.columns:
+                raise ValueError(f"Data missing required column: {col}")
+        if not isinstance(data.index, pd.DatetimeIndex):
+            raise ValueError("Data index must be DatetimeIndex.")
+        self.data = data.sort_index()
+        self.symbol = symbol
+        self.strategy = strategy
+        self.starting_cash = float(starting_cash)
+        self.broker = broker or Broker()
+        self.targets = targets
+        self.result: Optional[SimulationResult] = None
+
+    def _target_array(self) -> np.ndarray:
+        targets = self.targets if self.targets is not None else self.strategy.target_positions()
+        if isinstance(targets, pd.Series):
+            targets = targets.reindex(self.data.index).ffill().fillna(0)
+        targets = np.asarray(targets)
+        if targets.shape != (len(self.data),):
+            raise ValueError("targets must have one value per bar")
+        return targets.astype(np.int64)
+
+    def run(self) -> pd.Series:
+        self.result = simulate_targets(self.data["open"].to_numpy(dtype=float),
+                                       self.data["close"].to_numpy(dtype=float),
+                                       self._target_array(),
+                                       starting_cash=self.starting_cash,
+                                       commission_bps=self.broker.commission_bps,
+                                       slippage=self.broker.slippage)
+        return pd.Series(self.result.equity, index=self.data.index, name="equity")
+
+    def fills(self) -> pd.DataFrame:
+        """Fills of the last run, one row per traded bar."""
+        if self.result is None:
+            raise RuntimeError("Call run() first.")
+        r = self.result
+        mask = r.trade_qty != 0
+        return pd.DataFrame({"timestamp": self.data.index[mask],
+                             "symbol": self.symbol,
+                             "side": np.where(r.trade_qty[mask] > 0, "buy", "sell"),
+                             "qty": np.abs(r.trade_qty[mask]),
+                             "price": r.exec_price[mask],
+                             "fee": r.fee[mask]})
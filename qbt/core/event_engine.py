@@ -1,24 +1,28 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Dict, Optional, Iterable
+import heapq
+import itertools
+from array import array
+from typing import Callable, List, Dict, NamedTuple, Optional, Iterable, Iterator, Tuple, Union
 import pandas as pd
 import numpy as np
+from .engine import BarView
+from .profiling import NullProfiler
+from .universe import FIELDS, AlignedUniverse, shared_fields
 
-@dataclass
-class MarketEvent:
+# Events are NamedTuples: tuple-backed, no per-instance __dict__, cheap to allocate.
+class MarketEvent(NamedTuple):
     timestamp: pd.Timestamp
-    bar: pd.Series
+    bar: BarView
     symbol: str
+    row: int = -1  # position of the bar in its symbol's stream
 
-@dataclass
-class OrderEvent:
+class OrderEvent(NamedTuple):
     timestamp: pd.Timestamp
     symbol: str
     side: str  # 'buy'|'sell'
     qty: int
 
-@dataclass
-class FillEvent:
+class FillEvent(NamedTuple):
     timestamp: pd.Timestamp
     symbol: str
     side: str
@@ -26,23 +30,195 @@ class FillEvent:
     price: float
     fee: float = 0.0
 
+class TimerEvent(NamedTuple):
+    timestamp: pd.Timestamp
+    callback: Callable
+    name: Optional[str] = None
+
+class ColumnLog:
+    """Append-only struct-of-arrays log: one typed ``array.array`` per field.
+
+    Buffers grow geometrically, so appends are amortized O(1) and a record costs only
+    its field bytes instead of a dict (or object). Columns come back as NumPy copies, so
+    callers can hold them while the log keeps growing.
+    """
+    __slots__ = ("fields", "columns")
+
+    def __init__(self, typecodes: Dict[str, str]):
+        self.fields = list(typecodes)
+        self.columns = [array(code) for code in typecodes.values()]
+
+    def append(self, *values):
+        for col, v in zip(self.columns, values):
+            col.append(v)
+
+    def __len__(self) -> int:
+        return len(self.columns[0])
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        col = self.columns[self.fields.index(field)]
+        return np.array(col, dtype=col.typecode)
+
+    def _view(self, field: str) -> np.ndarray:
+        # Zero-copy view; blocks appends while it is alive, so copy it before returning.
+        col = self.columns[self.fields.index(field)]
+        return np.frombuffer(col, dtype=col.typecode) if len(col) else np.empty(0, dtype=col.typecode)
+
+class _Stamps:
+    # Timestamps stored as int64 nanoseconds; remembers the unit/tz to rebuild them.
+    __slots__ = ("unit", "tz")
+
+    def __init__(self):
+        self.unit = None; self.tz = None
+
+    def encode(self, ts: pd.Timestamp) -> int:
+        if self.unit is None:
+            self.unit, self.tz = ts.unit, ts.tz
+        return ts.value
+
+    def decode(self, ns: np.ndarray) -> pd.DatetimeIndex:
+        idx = pd.DatetimeIndex(ns.view('M8[ns]'))
+        if self.tz is not None:
+            idx = idx.tz_localize('UTC').tz_convert(self.tz)
+        return idx.as_unit(self.unit) if self.unit else idx
+
+def _ns(ts) -> int:
+    return int(pd.Timestamp(ts).as_unit('ns').value)
+
+class EventQueue:
+    """Priority queue of events ordered by (time, kind, tie-break, arrival).
+
+    At equal timestamps fills resolve before orders, orders before timers and timers
+    before new market data; market events for the same timestamp pop in symbol order.
+    Consumers loop over :meth:`drain`, which also yields events pushed while draining.
+    """
+    FILL, ORDER, TIMER, MARKET = 0, 1, 2, 3
+
+    def __init__(self):
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+
+    def push(self, ts_ns: int, kind: int, event, tie: int = 0):
+        heapq.heappush(self._heap, (ts_ns, kind, tie, next(self._seq), event))
+
+    def pop(self) -> Tuple[int, object]:
+        ts_ns, _, _, _, event = heapq.heappop(self._heap)
+        return ts_ns, event
+
+    def drain(self) -> Iterator[Tuple[int, int, object]]:
+        """Pop ``(ts_ns, kind, event)`` in priority order until the queue is empty."""
+        heap, pop = self._heap, heapq.heappop
+        while heap:
+            ts_ns, kind, _, _, event = pop(heap)
+            yield ts_ns, kind, event
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
 class DataHandler:
-    def __init__(self, data_map: Dict[str, pd.DataFrame]):
-        self.data_map = {s: df.copy() for s, df in data_map.items()}
-        for df in self.data_map.values():
-            assert all(c in df.columns for c in ['open','high','low','close','volume'])
-        union_idx = None
-        for df in self.data_map.values():
-            union_idx = df.index if union_idx is None else union_idx.union(df.index)
-        for s in list(self.data_map.keys()):
-            self.data_map[s] = self.data_map[s].reindex(union_idx).ffill()
-        self.index = union_idx
+    """Per-symbol, time-sorted bar streams merged through an :class:`EventQueue`.
+
+    Only real bars become events, so memory and time follow the number of bars rather
+    than union length x symbols. ``align=True`` restores the legacy behaviour: every
+    symbol is put on the union of timestamps and forward-filled (NaN before its first
+    bar) by an outer :class:`~qbt.core.universe.AlignedUniverse`, exposed as dense
+    ``values[t, s, f]`` arrays, and emits a bar at every timestamp. A prebuilt universe
+    can be passed as ``data_map``; with ``align=True`` its calendar is used as is.
+    """
+    FIELDS = FIELDS
+
+    def __init__(self, data_map: Union[Dict[str, pd.DataFrame], AlignedUniverse], align: bool = False):
+        for df in data_map.values():
+            assert all(c in df.columns for c in self.FIELDS)
+        # Extra numeric columns shared by every symbol ride along with OHLCV.
+        self.fields = data_map.fields if isinstance(data_map, AlignedUniverse) else shared_fields(data_map)
+        self.symbols = list(data_map.keys())
+        self.col = {sym: s for s, sym in enumerate(self.symbols)}
+        self.align = align
+        if align:
+            uni = data_map if isinstance(data_map, AlignedUniverse) else AlignedUniverse(data_map, how="outer", fields=self.fields)
+            self.universe = uni
+            self._union = uni.index
+            self.values = np.moveaxis(uni.arrays, 0, 2)   # (time, symbol, field) view
+            self._index = [uni.index] * len(self.symbols)
+            self._bars = [uni.columns(sym) for sym in self.symbols]
+        else:
+            self._union = None
+            self._index, self._bars = [], []
+            for df in data_map.values():
+                df = df if df.index.is_monotonic_increasing else df.sort_index()
+                arr = df[self.fields].to_numpy(dtype=float)
+                self._index.append(df.index)
+                self._bars.append({f: arr[:, k] for k, f in enumerate(self.fields)})
+        self._stamps = [idx.as_unit('ns').asi8 for idx in self._index]
+        self._last_ns, self._last_ts = None, None
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """Union of all timestamps (computed on demand unless aligned)."""
+        if self._union is None:
+            union_idx = None
+            for idx in self._index:
+                union_idx = idx if union_idx is None else union_idx.union(idx)
+            self._union = union_idx
+        return self._union
+
+    def field(self, name: str) -> np.ndarray:
+        """(time x symbol) view of one field; requires ``align=True``."""
+        if not self.align:
+            raise ValueError("field() needs DataHandler(align=True)")
+        return self.values[:, :, self.fields.index(name)]
+
+    @property
+    def data_map(self) -> Dict[str, pd.DataFrame]:
+        """Per-symbol frames viewing the stored arrays (built on demand)."""
+        return {sym: pd.DataFrame(self._bars[s], index=self._index[s], copy=False) for sym, s in self.col.items()}
+
+    def push_bar(self, queue: EventQueue, s: int, r: int):
+        """Queue bar ``r`` of symbol ``s``, if the stream has one."""
+        stamps = self._stamps[s]
+        if r < len(stamps):
+            ts_ns = int(stamps[r])
+            if ts_ns != self._last_ns:   # bars of one timestamp arrive together: box it once
+                self._last_ns, self._last_ts = ts_ns, self._index[s][r]
+            ts = self._last_ts
+            ev = MarketEvent(ts, BarView(self._bars[s], r, ts), self.symbols[s], r)
+            queue.push(ts_ns, EventQueue.MARKET, ev, tie=s)
+
+    def seed(self, queue: EventQueue):
+        for s in range(len(self.symbols)):
+            self.push_bar(queue, s, 0)
+
+    def advance(self, queue: EventQueue, ev: MarketEvent):
+        """Queue the bar after ``ev`` in the same symbol's stream."""
+        self.push_bar(queue, self.col[ev.symbol], ev.row + 1)
+
+    def price(self, symbol: str, field: str, ts_ns: int) -> float:
+        """``field`` of the latest ``symbol`` bar at or before ``ts_ns`` (NaN before the first)."""
+        s = self.col[symbol]
+        r = int(self._stamps[s].searchsorted(ts_ns, side='right')) - 1
+        return float(self._bars[s][field][r]) if r >= 0 else np.nan
 
     def __iter__(self) -> Iterable[MarketEvent]:
-        syms = list(self.data_map.keys())
-        for ts in self.index:
-            for s in syms:
-                yield MarketEvent(timestamp=ts, bar=self.data_map[s].loc[ts], symbol=s)
+        queue = EventQueue()
+        self.seed(queue)
+        while queue:
+            _, ev = queue.pop()
+            self.advance(queue, ev)
+            yield ev
+
+class PriceLookup:
+    """Read-only ``{symbol: price}`` mapping of one field as of a timestamp."""
+    __slots__ = ("_dh", "_field", "_ts")
+
+    def __init__(self, dh: DataHandler, field: str, ts_ns: int):
+        self._dh = dh; self._field = field; self._ts = ts_ns
+
+    def __getitem__(self, symbol: str) -> float:
+        return self._dh.price(symbol, self._field, self._ts)
+
+    def get(self, symbol: str, default=None):
+        return self[symbol] if symbol in self._dh.col else default
 
 class BrokerED:
     def __init__(self, commission_bps: float = 0.0005, slippage: float = 0.0):
@@ -63,35 +239,58 @@ class BrokerED:
         return fills
 
 class PortfolioED:
+    """Cash + integer positions; equity marks and fills go to columnar logs."""
     def __init__(self, starting_cash: float = 100_000.0):
         self.cash = float(starting_cash)
         self.positions: Dict[str, int] = {}
-        self.timestamps: List[pd.Timestamp] = []
-        self.equity: List[float] = []
-        self.fills_log: List[Dict] = []
+        self._stamps = _Stamps()
+        self._equity = ColumnLog({'ts': 'q', 'equity': 'd'})
+        self._eq_ts, self._eq_val = self._equity.columns   # appended directly on the hot path
+        self._fills = ColumnLog({'ts': 'q', 'symbol': 'i', 'buy': 'b', 'qty': 'q', 'price': 'd', 'fee': 'd'})
+        self._symbols: Dict[str, int] = {}
 
     def on_fill(self, fill: FillEvent):
         sign = 1 if fill.side == 'buy' else -1
         qty = sign * fill.qty
         self.positions[fill.symbol] = self.positions.get(fill.symbol, 0) + qty
         self.cash -= fill.price * qty + fill.fee
-        self.fills_log.append({'timestamp': fill.timestamp, 'symbol': fill.symbol, 'side': fill.side,
-                               'qty': fill.qty, 'price': fill.price, 'fee': fill.fee})
+        code = self._symbols.setdefault(fill.symbol, len(self._symbols))
+        self._fills.append(self._stamps.encode(fill.timestamp), code, sign > 0, fill.qty, fill.price, fill.fee)
 
     def mark_to_market(self, ts: pd.Timestamp, prices: Dict[str, float]):
         eq = self.cash
         for sym, qty in self.positions.items():
             eq += qty * prices.get(sym, 0.0)
-        self.timestamps.append(ts)
-        self.equity.append(eq)
+        self._eq_ts.append(ts.value if self._stamps.unit else self._stamps.encode(ts))
+        self._eq_val.append(eq)
+
+    @property
+    def timestamps(self) -> pd.DatetimeIndex:
+        return self._stamps.decode(self._equity['ts'])
+
+    @property
+    def equity(self) -> np.ndarray:
+        return self._equity['equity']
 
     def equity_series(self) -> pd.Series:
-        return pd.Series(self.equity, index=pd.DatetimeIndex(self.timestamps), name='equity')
+        return pd.Series(self._equity._view('equity').copy(), index=self.timestamps, name='equity')
 
     def fills_dataframe(self) -> pd.DataFrame:
-        return pd.DataFrame(self.fills_log)
+        log = self._fills
+        if not len(log):
+            return pd.DataFrame(columns=['timestamp', 'symbol', 'side', 'qty', 'price', 'fee'])
+        names = np.array(list(self._symbols), dtype=object)
+        return pd.DataFrame({'timestamp': self._stamps.decode(log['ts']), 'symbol': names[log._view('symbol')].tolist(),
+                             'side': np.where(log._view('buy') > 0, 'buy', 'sell').tolist(), 'qty': log['qty'],
+                             'price': log['price'], 'fee': log['fee']})
+
+    @property
+    def fills_log(self) -> List[Dict]:
+        return self.fills_dataframe().to_dict('records')
 
 class ContextED:
+    __slots__ = ("now", "data", "symbol", "portfolio", "submit_order")
+
     def __init__(self, now, bar, symbol, portfolio, submit_order):
         self.now = now; self.data = bar; self.symbol = symbol
         self.portfolio = portfolio; self.submit_order = submit_order
@@ -111,25 +310,71 @@ class MinuteSMA:
             ctx.submit_order(OrderEvent(timestamp=ctx.now, symbol=self.symbol, side='sell', qty=pos))
 
 class EventDrivenEngine:
+    """Event loop over a single :class:`EventQueue` of market, order, fill and timer events.
+
+    Each market event marks the portfolio, updates the last close and calls the symbol's
+    strategy; orders it submits fill at the symbol's open as of that timestamp before the
+    next market event. ``align=True`` replays the legacy union/forward-fill bar grid.
+    ``profiler`` (:class:`qbt.core.profiling.Profiler`) times each event kind: ``queue``
+    (heap pops), ``mark``, ``strategy``, ``advance`` (next bar), ``order``, ``fill`` and
+    ``timer``; events per second count every event popped.
+    """
     def __init__(self, data_map: Dict[str, pd.DataFrame], strategy_map: Dict[str, MinuteSMA],
-                 starting_cash: float = 100_000.0, broker: Optional[BrokerED] = None):
-        self.dh = DataHandler(data_map); self.strategy_map=strategy_map
+                 starting_cash: float = 100_000.0, broker: Optional[BrokerED] = None, align: bool = False,
+                 profiler=None):
+        self.dh = DataHandler(data_map, align=align); self.strategy_map=strategy_map
         self.broker = broker or BrokerED(); self.portfolio = PortfolioED(starting_cash=starting_cash)
         self.last_prices: Dict[str, float] = {}
+        self.queue = EventQueue()
+        self.profiler = profiler
+        self._now_ns = None
+
+    def schedule(self, timestamp, callback: Callable, name: Optional[str] = None):
+        """Call ``callback(ctx)`` at ``timestamp``; ``ctx.submit_order`` works as in ``on_bar``."""
+        self.queue.push(_ns(timestamp), EventQueue.TIMER, TimerEvent(pd.Timestamp(timestamp), callback, name))
+
+    def submit_order(self, order: OrderEvent):
+        ts_ns = self._now_ns if self._now_ns is not None else _ns(order.timestamp)
+        self.queue.push(ts_ns, EventQueue.ORDER, order)
 
     def run(self) -> pd.Series:
-        for ev in self.dh:
-            if self.last_prices:
-                self.portfolio.mark_to_market(ev.timestamp, self.last_prices)
-            self.last_prices[ev.symbol] = float(ev.bar['close'])
-            strat = self.strategy_map.get(ev.symbol)
-            if strat:
-                ctx = ContextED(ev.timestamp, ev.bar, ev.symbol, self.portfolio, self.broker.place_order)
-                strat.on_bar(ctx)
-            open_prices = {s: float(df.loc[ev.timestamp]['open']) if ev.timestamp in df.index else self.last_prices.get(s, np.nan)
-                           for s, df in self.dh.data_map.items()}
-            for fill in self.broker.process(ev.timestamp, open_prices):
-                self.portfolio.on_fill(fill)
+        q, dh = self.queue, self.dh
+        dh.seed(q)
+        MARKET, ORDER, FILL = EventQueue.MARKET, EventQueue.ORDER, EventQueue.FILL
+        prof = self.profiler or NullProfiler()
+        lap = prof.lap
+        last_ts = None
+        events = 0
+        prof.start()
+        for self._now_ns, kind, ev in q.drain():
+            events += 1
+            lap("queue")
+            if kind == MARKET:
+                if self.last_prices:
+                    self.portfolio.mark_to_market(ev.timestamp, self.last_prices)
+                self.last_prices[ev.symbol] = float(ev.bar['close'])
+                lap("mark")
+                strat = self.strategy_map.get(ev.symbol)
+                if strat:
+                    ctx = ContextED(ev.timestamp, ev.bar, ev.symbol, self.portfolio, self.submit_order)
+                    strat.on_bar(ctx)
+                lap("strategy")
+                dh.advance(q, ev)
+                last_ts = ev.timestamp
+                lap("advance")
+            elif kind == ORDER:
+                self.broker.place_order(ev)
+                for fill in self.broker.process(ev.timestamp, PriceLookup(dh, 'open', self._now_ns)):
+                    q.push(self._now_ns, EventQueue.FILL, fill)
+                lap("order")
+            elif kind == FILL:
+                self.portfolio.on_fill(ev)
+                lap("fill")
+            else:
+                ev.callback(ContextED(ev.timestamp, None, None, self.portfolio, self.submit_order))
+                lap("timer")
+        self._now_ns = None
         if self.last_prices:
-            self.portfolio.mark_to_market(list(self.dh.index)[-1], self.last_prices)
+            self.portfolio.mark_to_market(last_ts, self.last_prices)
+        prof.stop(events)
         return self.portfolio.equity_series()
@@ -0,0 +1,185 @@
+"""Compiled order -> fill -> mark kernel for signal-array strategies.
+
+:func:`execute_orders` runs the bar loop of ``BacktestEngine`` / ``BacktestEngineMulti``
+over (time x symbol) arrays: orders fill at the bar's open with ``Broker`` slippage and
+bps commission, cost basis follows ``Portfolio``, and equity is marked at the close with
+the holdings from before the fill. When numba is installed the loop is JIT-compiled;
+otherwise fills and cash come from the array path of
+:func:`qbt.core.engine_vectorized.simulate_targets` and cost basis from grouped running
+sums.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+import pandas as pd
+from .engine_vectorized import _fill_arrays, _running_cash
+
+try:
+    import numba
+    HAVE_NUMBA = True
+except ImportError:  # optional dependency
+    numba = None
+    HAVE_NUMBA = False
+
+def _jit(fn):
+    return numba.njit(cache=True, nogil=True)(fn) if HAVE_NUMBA else fn
+
+@dataclass
+class KernelResult:
+    """Arrays produced by :func:`execute_orders`.
+
+    Per-symbol fields have the shape of ``orders``; ``cash`` and ``equity`` have one
+    value per bar.
+
+    position  : holdings after the fill on each bar
+    trade_qty : signed quantity filled on each bar (0 = no trade)
+    exec_price: fill price including slippage (NaN when no trade)
+    fee       : commission paid on each bar
+    basis     : average entry price of the long holdings after the fill (0 when flat or short)
+    cash      : cash after the fills on each bar
+    equity    : marked equity recorded on each bar
+    """
+    position: np.ndarray
+    trade_qty: np.ndarray
+    exec_price: np.ndarray
+    fee: np.ndarray
+    basis: np.ndarray
+    cash: np.ndarray
+    equity: np.ndarray
+
+def orders_from_targets(targets: np.ndarray) -> np.ndarray:
+    """Signed orders that move the position to ``targets`` (time on axis 0), starting flat."""
+    targets = np.asarray(targets, dtype=np.int64)
+    orders = targets.copy()
+    orders[1:] -= targets[:-1]
+    return orders
+
+@_jit
+def _order_loop(open_, close, orders, starting_cash, commission_bps, slippage,
+                position, exec_price, fee, basis, cash, equity):
+    n, k = orders.shape
+    c = starting_cash
+    for t in range(n):
+        # Mark at the close with the holdings carried in from the previous bar.
+        held = 0.0
+        for s in range(k):
+            q0 = position[t - 1, s] if t > 0 else 0
+            if q0 != 0:
+                held += q0 * close[t, s]
+        equity[t] = c + held
+        # Fill the bar's orders at its open.
+        notional = 0.0
+        fees = 0.0
+        for s in range(k):
+            q0 = position[t - 1, s] if t > 0 else 0
+            b = basis[t - 1, s] if t > 0 else 0.0
+            q = orders[t, s]
+            if q > 0:
+                px = open_[t, s] + slippage
+                f = px * q * commission_bps
+                total = q0 + q
+                held = q0 if q0 > 0 else 0
+                if total <= 0:
+                    b = 0.0
+                else:
+                    b = (b * held + px * (total - held)) / total
+                notional += px * q
+                fees += f
+                exec_price[t, s] = px
+                fee[t, s] = f
+            elif q < 0:
+                px = open_[t, s] - slippage
+                f = px * -q * commission_bps
+                if q0 + q <= 0:
+                    b = 0.0
+                notional -= px * -q   # -q > 0: sold quantity
+                fees += f
+                exec_price[t, s] = px
+                fee[t, s] = f
+            else:
+                exec_price[t, s] = np.nan
+                fee[t, s] = 0.0
+            position[t, s] = q0 + q
+            basis[t, s] = b
+        c -= notional + fees
+        cash[t] = c
+
+def _order_arrays(open_, close, orders, starting_cash, commission_bps, slippage,
+                  position, exec_price, fee, basis, cash, equity):
+    np.cumsum(orders, axis=0, out=position)
+    prev = np.zeros_like(position)
+    prev[1:] = position[:-1]
+    exec_price[:], fee[:], cash_delta = _fill_arrays(open_, orders, commission_bps, slippage)
+    cash_before, cash[:] = _running_cash(starting_cash, cash_delta.sum(axis=1))
+    equity[:] = cash_before + np.where(prev != 0, prev * close, 0.0).sum(axis=1)
+    basis[:] = _cost_basis(position, prev, orders, exec_price)
+
+def _cost_basis(position, prev, orders, exec_price):
+    # Average entry price of the long units, one run of positive holdings at a time: buys
+    # add to the cost, partial sells scale it by the fraction kept (a log-space running
+    # sum), and the price only changes on buys, so it is carried forward from the last one.
+    n = len(position)
+    rows = np.arange(n)[:, None]
+    long = position > 0
+    held = np.maximum(prev, 0)
+    opened = long & (prev <= 0)
+    buys = long & (orders > 0)
+    kept = np.where(long & (orders < 0), position / np.where(held > 0, held, 1), 1.0)
+    scale = np.cumsum(np.log(kept), axis=0)
+    start = np.maximum.accumulate(np.where(opened, rows, 0), axis=0)
+    rel = scale - np.take_along_axis(scale, start, axis=0)
+    cost = np.where(buys, exec_price * (position - held), 0.0) * np.exp(-rel)
+    # Running sum restarted at each opening buy (grouped, so earlier runs never cancel out).
+    runs = (start + np.arange(position.shape[1]) * n).ravel()
+    run = pd.Series(cost.ravel()).groupby(runs, sort=False).cumsum().to_numpy().reshape(cost.shape)
+    price = run * np.exp(rel) / np.where(long, position, 1)
+    last = np.maximum.accumulate(np.where(buys, rows, 0), axis=0)
+    return np.where(long, np.take_along_axis(price, last, axis=0), 0.0)
+
+def execute_orders(open_: np.ndarray, close: np.ndarray, orders: np.ndarray,
+                   starting_cash: float = 100_000.0, commission_bps: float = 0.0,
+                   slippage: float = 0.0, jit: Optional[bool] = None) -> KernelResult:
+    """Fill signed market orders bar by bar and mark the portfolio.
+
+    Parameters
+    ----------
+    open_, close : np.ndarray
+        Bar prices, shape (n,) for one symbol or (n, k) for k symbols.
+    orders : np.ndarray
+        Signed integer quantity (+buy / -sell) filled at ``open_`` on each bar, same shape.
+        Use :func:`orders_from_targets` for target-position signals.
+    starting_cash : float
+        Initial cash.
+    commission_bps, slippage : float
+        Same meaning as in :class:`qbt.core.broker.Broker`.
+    jit : bool, optional
+        Use the numba kernel (True), the array path (False), or numba when installed (None).
+
+    Notes
+    -----
+    Fill timing is that of ``BacktestEngine``: equity recorded on bar t is marked at
+    close[t] with the holdings from before that bar's fills. Single-symbol results
+    match the loop engine bit for bit; with several symbols the per-bar sums may differ
+    from ``PortfolioMulti`` in the last bits, and so may the array path's cost basis
+    after adding to a long position.
+    """
+    if jit and not HAVE_NUMBA:
+        raise ImportError("jit=True requires numba (pip install numba)")
+    orders = np.asarray(orders, dtype=np.int64)
+    shape = orders.shape
+    if orders.ndim == 1:
+        orders = orders[:, None]
+    n, k = orders.shape
+    open_ = np.ascontiguousarray(np.asarray(open_, dtype=float).reshape(n, k))
+    close = np.ascontiguousarray(np.asarray(close, dtype=float).reshape(n, k))
+    orders = np.ascontiguousarray(orders)
+    position = np.zeros((n, k), dtype=np.int64)
+    exec_price, fee, basis = np.empty((n, k)), np.empty((n, k)), np.zeros((n, k))
+    cash, equity = np.empty(n), np.empty(n)
+    kernel = _order_loop if (HAVE_NUMBA if jit is None else jit) else _order_arrays
+    kernel(open_, close, orders, float(starting_cash), float(commission_bps), float(slippage),
+           position, exec_price, fee, basis, cash, equity)
+    return KernelResult(position=position.reshape(shape), trade_qty=orders.reshape(shape),
+                        exec_price=exec_price.reshape(shape), fee=fee.reshape(shape),
+                        basis=basis.reshape(shape), cash=cash, equity=equity)
@@ -0,0 +1,144 @@
+"""Per-bar portfolio ledger backed by preallocated NumPy arrays.
+
+Each ``record`` call writes one row: timestamp, cash, per-symbol position and market
+value, and equity. Engines size the ledger from their bar count with ``reserve``;
+capacity doubles if more rows arrive. ``equity_series`` and ``cash_series`` return
+copies, since engines hand the NAV to callers who may normalize it in place; the
+``holdings`` and ``exposure`` frames view the filled rows directly instead of copying them.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, List
+import numpy as np
+import pandas as pd
+
+class Ledger:
+    def __init__(self, symbols: Iterable[str] = (), capacity: int = 0):
+        self.symbols: List[str] = list(symbols)
+        self.col: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        self.n = 0
+        self._unit = None
+        self._tz = None
+        self._alloc(max(int(capacity), 16))
+
+    def _alloc(self, capacity: int):
+        k = len(self.symbols)
+        self.ts = np.empty(capacity, dtype=np.int64)          # nanoseconds
+        self.cash = np.empty(capacity, dtype=float)
+        self.equity = np.empty(capacity, dtype=float)
+        self.qty = np.zeros((capacity, k), dtype=np.int64)
+        self.value = np.zeros((capacity, k), dtype=float)     # market value: qty * price
+
+    def _resize(self, capacity: int, k: int):
+        old = (self.ts, self.cash, self.equity, self.qty, self.value)
+        n, k0 = self.n, old[3].shape[1]
+        self._alloc(capacity)
+        if k != self.qty.shape[1]:
+            self.qty = np.zeros((capacity, k), dtype=np.int64)
+            self.value = np.zeros((capacity, k), dtype=float)
+        for new, prev in zip((self.ts, self.cash, self.equity), old[:3]):
+            new[:n] = prev[:n]
+        self.qty[:n, :k0] = old[3][:n]
+        self.value[:n, :k0] = old[4][:n]
+
+    def reserve(self, capacity: int):
+        """Make room for ``capacity`` rows in total (e.g. the engine's bar count)."""
+        if capacity > len(self.ts):
+            self._resize(int(capacity), len(self.symbols))
+
+    def add_symbol(self, symbol: str) -> int:
+        """Add a symbol column (zero history) and return its column number."""
+        if symbol not in self.col:
+            self.col[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self._resize(len(self.ts), len(self.symbols))
+        return self.col[symbol]
+
+    def _stamp(self, timestamp) -> int:
+        ts = timestamp if isinstance(timestamp, pd.Timestamp) else pd.Timestamp(timestamp)
+        if self._unit is None:
+            self._unit, self._tz = ts.unit, ts.tz
+        return ts.value
+
+    def _next_row(self) -> int:
+        n = self.n
+        if n == len(self.ts):
+            self._resize(2 * n, len(self.symbols))
+        self.n = n + 1
+        return n
+
+    def record(self, timestamp, cash: float, equity: float, qty=None, value=None):
+        """Append one row. ``qty``/``value`` are per-symbol arrays in ``symbols`` order."""
+        n = self._next_row()
+        self.ts[n] = self._stamp(timestamp)
+        self.cash[n] = cash
+        self.equity[n] = equity
+        if qty is not None:
+            self.qty[n] = qty
+            self.value[n] = value
+
+    def record_one(self, timestamp, cash: float, equity: float, col: int, qty: int, value: float):
+        """Append one row where only symbol column ``col`` can be non-zero."""
+        n = self._next_row()
+        self.ts[n] = self._stamp(timestamp)
+        self.cash[n] = cash
+        self.equity[n] = equity
+        self.qty[n, col] = qty
+        self.value[n, col] = value
+
+    def extend(self, index: pd.DatetimeIndex, cash, equity, qty=None, value=None):
+        """Append one row per timestamp in ``index`` from whole arrays (e.g. a kernel run).
+
+        ``qty``/``value`` are (len(index) x symbols) arrays in ``symbols`` order.
+        """
+        m = len(index)
+        if not m:
+            return
+        n = self.n
+        self.reserve(n + m)
+        if self._unit is None:
+            self._unit, self._tz = index.unit, index.tz
+        self.ts[n:n + m] = index.as_unit("ns").asi8
+        self.cash[n:n + m] = cash
+        self.equity[n:n + m] = equity
+        if qty is not None:
+            self.qty[n:n + m] = qty
+            self.value[n:n + m] = value
+        self.n = n + m
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        idx = pd.DatetimeIndex(self.ts[:self.n].view("M8[ns]"), copy=False)
+        if self._tz is not None:
+            idx = idx.tz_localize("UTC").tz_convert(self._tz)
+        return idx.as_unit(self._unit) if self._unit and self._unit != "ns" else idx
+
+    def equity_series(self) -> pd.Series:
+        """Equity after each bar's mark (a copy: safe to modify)."""
+        if not self.n:
+            return pd.Series(dtype=float)
+        return pd.Series(self.equity[:self.n].copy(), index=self.index, name="equity", copy=False)
+
+    def cash_series(self) -> pd.Series:
+        """Cash at each bar's mark (a copy: safe to modify)."""
+        return pd.Series(self.cash[:self.n].copy(), index=self.index, name="cash", copy=False)
+
+    def holdings(self) -> pd.DataFrame:
+        """Position (shares) per symbol after each bar's mark, as a (time x symbol) frame.
+
+        The frame views the ledger's buffer; copy it before modifying it in place.
+        """
+        return pd.DataFrame(self.qty[:self.n], index=self.index, columns=self.symbols, copy=False)
+
+    def exposure(self) -> pd.DataFrame:
+        """Market value (qty x mark price) per symbol, as a (time x symbol) frame.
+
+        The frame views the ledger's buffer; copy it before modifying it in place.
+        """
+        return pd.DataFrame(self.value[:self.n], index=self.index, columns=self.symbols, copy=False)
+
+    def history(self) -> list:
+        """(timestamp, equity) tuples, the legacy ``equity_history`` layout."""
+        return list(zip(self.index, self.equity[:self.n].tolist()))
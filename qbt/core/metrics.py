@@ -1,7 +1,9 @@
 from __future__ import annotations
 import numpy as np
 import pandas as pd
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional, Union
+
+METRICS = ['annual_return', 'annual_vol', 'sharpe', 'max_drawdown', 'total_return', 'sortino', 'calmar', 'information_ratio']
 
 def compute_drawdown(nav: pd.Series) -> pd.Series:
     peak = nav.cummax()
@@ -12,7 +14,7 @@ def performance_from_nav(nav: pd.Series, risk_free: float = 0.0, periods_per_yea
     nav = nav.dropna()
     rets = nav.pct_change().dropna()
     if rets.empty:
-        return {k: float('nan') for k in ['annual_return','annual_vol','sharpe','max_drawdown','total_return','sortino','calmar','information_ratio']}
+        return {k: float('nan') for k in METRICS}
     mean_r = rets.mean(); std_r = rets.std(ddof=0)
     ann_ret = (1+mean_r)**periods_per_year - 1
     ann_vol = std_r * np.sqrt(periods_per_year)
@@ -36,3 +38,177 @@ def performance_from_nav(nav: pd.Series, risk_free: float = 0.0, periods_per_yea
     return {"annual_return": float(ann_ret), "annual_vol": float(ann_vol), "sharpe": float(sharpe),
             "max_drawdown": float(max_dd), "total_return": float(total_ret), "sortino": float(sortino),
             "calmar": float(calmar), "information_ratio": float(information_ratio)}
+
+def _as_frame(navs: Union[pd.DataFrame, pd.Series, np.ndarray]) -> pd.DataFrame:
+    if isinstance(navs, pd.Series):
+        return navs.to_frame()
+    if isinstance(navs, np.ndarray):
+        return pd.DataFrame(navs if navs.ndim == 2 else navs[:, None])
+    return navs
+
+def _returns(v: np.ndarray):
+    # Per-column simple returns against the previous non-NaN value, i.e. what
+    # ``nav.dropna().pct_change()`` gives for every column, laid back on the full index.
+    # Also returns the row of that previous value (-1 if none).
+    pos = np.arange(len(v))[:, None]
+    last = np.maximum.accumulate(np.where(np.isnan(v), -1, pos), axis=0)
+    prev_row = np.full_like(last, -1)
+    prev_row[1:] = last[:-1]
+    prev = np.where(prev_row >= 0, np.take_along_axis(v, prev_row.clip(0), axis=0), np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rets = v / prev - 1
+    return rets, prev_row
+
+def _bench_returns(benchmark_nav: pd.Series, index: pd.Index, v: np.ndarray, prev_row: np.ndarray):
+    # Benchmark level per column, forward-filled over that column's own observations
+    # (as ``benchmark_nav.reindex(nav.dropna().index).ffill()`` does), and its return
+    # over the same steps as the column.
+    raw = benchmark_nav.reindex(index).to_numpy(dtype=float)[:, None]
+    pos = np.arange(len(v))[:, None]
+    src = np.maximum.accumulate(np.where(~np.isnan(v) & ~np.isnan(raw), pos, -1), axis=0)
+    b = np.where(src >= 0, raw[src.clip(0), 0], np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        b_rets = b / np.where(prev_row >= 0, np.take_along_axis(b, prev_row.clip(0), axis=0), np.nan) - 1
+    return b, b_rets
+
+def _nan_moments(x: np.ndarray):
+    # Count, mean and population std per column, ignoring NaNs.
+    n = (~np.isnan(x)).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(x, axis=0) / n
+        std = np.sqrt(np.nansum((x - mean) ** 2, axis=0) / n)
+    return n, mean, std
+
+def _ratios(mean_r, std_r, down_std, max_dd, risk_free: float, periods_per_year: int) -> dict:
+    # The annualised metrics shared by the batched, rolling and expanding variants.
+    ann_ret = (1 + mean_r) ** periods_per_year - 1
+    ann_vol = std_r * np.sqrt(periods_per_year)
+    rf_period = (1 + risk_free) ** (1 / periods_per_year) - 1
+    excess = (mean_r - rf_period) * periods_per_year
+    ann_down = down_std * np.sqrt(periods_per_year)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {"annual_return": ann_ret, "annual_vol": ann_vol,
+                "sharpe": np.where(ann_vol == 0, np.nan, excess / ann_vol),
+                "sortino": np.where(ann_down == 0, np.nan, excess / ann_down),
+                "calmar": np.where(max_dd == 0, np.nan, ann_ret / np.abs(max_dd))}
+
+def performance_from_navs(navs: Union[pd.DataFrame, np.ndarray], risk_free: float = 0.0, periods_per_year: int = 252,
+                          benchmark_nav: Optional[pd.Series] = None) -> pd.DataFrame:
+    """:func:`performance_from_nav` for many NAV curves at once (runs as columns).
+
+    Each column gets the same treatment as ``performance_from_nav(navs[col])``, missing
+    values included (they are skipped per column), but every step is a single array
+    operation over the whole matrix instead of a Python loop over runs. Returns one row
+    per column with the metric keys as columns.
+    """
+    frame = _as_frame(navs)
+    v = frame.to_numpy(dtype=float)
+    rets, prev_row = _returns(v)
+    valid = ~np.isnan(v)
+    rf_period = (1 + risk_free) ** (1 / periods_per_year) - 1
+    n, mean_r, std_r = _nan_moments(rets)
+    n_down, _, down_std = _nan_moments(np.where(rets < rf_period, rets, np.nan))
+    down_std = np.where(n_down > 0, down_std, 0.0)
+    cols = np.arange(v.shape[1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        max_dd = np.fmin.reduce(v / np.fmax.accumulate(v, axis=0) - 1.0, axis=0) if len(v) else np.full(len(cols), np.nan)
+        first = v[valid.argmax(axis=0), cols] if len(v) else np.nan
+        last = v[len(v) - 1 - valid[::-1].argmax(axis=0), cols] if len(v) else np.nan
+    out = {"total_return": last / first - 1, "max_drawdown": max_dd,
+           **_ratios(mean_r, std_r, down_std, max_dd, risk_free, periods_per_year)}
+    ir = np.full(len(cols), np.nan)
+    if benchmark_nav is not None and len(v):
+        b, b_rets = _bench_returns(benchmark_nav, frame.index, v, prev_row)
+        covered = ~(valid & np.isnan(b)).any(axis=0)   # benchmark known wherever the run is
+        n_act, mean_a, std_a = _nan_moments(rets - b_rets)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ir = np.where(covered & (n_act > 0) & (std_a != 0),
+                          (mean_a * periods_per_year) / (std_a * np.sqrt(periods_per_year)), np.nan)
+    out["information_ratio"] = ir
+    res = pd.DataFrame({k: out[k] for k in METRICS}, index=frame.columns, dtype=float)
+    res.loc[n == 0] = np.nan
+    return res
+
+def _rolling_max_drawdown(v: np.ndarray, window: int, chunk_elems: int = 1 << 22) -> np.ndarray:
+    # Max drawdown of every trailing ``window`` of rows (NaN before the first full one),
+    # from strided views processed in chunks so memory stays bounded.
+    out = np.full(v.shape, np.nan)
+    if len(v) < window:
+        return out
+    views = np.lib.stride_tricks.sliding_window_view(v, window, axis=0)   # (ends, cols, window)
+    step = max(1, chunk_elems // (window * max(v.shape[1], 1)))
+    for a in range(0, len(views), step):
+        blk = views[a:a + step]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[window - 1 + a:window - 1 + a + len(blk)] = np.fmin.reduce(blk / np.fmax.accumulate(blk, axis=-1) - 1.0, axis=-1)
+    return out
+
+def _windowed_performance(frame: pd.DataFrame, agg: Callable, first, last, max_dd, start: np.ndarray,
+                          min_rets: int, risk_free: float, periods_per_year: int, benchmark_nav: Optional[pd.Series]):
+    # ``start`` is the row each window's first NAV observation sits on.
+    v = frame.to_numpy(dtype=float)
+    rets, prev_row = _returns(v)
+    rf_period = (1 + risk_free) ** (1 / periods_per_year) - 1
+    r = agg(pd.DataFrame(rets))
+    n = r.count().to_numpy()
+    mean_r, std_r = r.mean().to_numpy(), r.std(ddof=0).to_numpy()
+    down_std = np.nan_to_num(agg(pd.DataFrame(np.where(rets < rf_period, rets, np.nan))).std(ddof=0).to_numpy())
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = {"total_return": last / first - 1, "max_drawdown": max_dd,
+               **_ratios(mean_r, std_r, down_std, max_dd, risk_free, periods_per_year)}
+    ir = np.full(v.shape, np.nan)
+    if benchmark_nav is not None:
+        _, b_rets = _bench_returns(benchmark_nav, frame.index, v, prev_row)
+        a = agg(pd.DataFrame(rets - b_rets))
+        mean_a, std_a = a.mean().to_numpy(), a.std(ddof=0).to_numpy()
+        # Like performance_from_nav: the benchmark must be known from the window's first row on.
+        raw = benchmark_nav.reindex(frame.index).to_numpy(dtype=float)
+        covered = ~np.isnan(raw[start])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ir = np.where(covered & (std_a > 0), (mean_a * periods_per_year) / (std_a * np.sqrt(periods_per_year)), np.nan)
+    out["information_ratio"] = ir
+    short = n < min_rets
+    return {k: pd.DataFrame(np.where(short, np.nan, out[k]), index=frame.index, columns=frame.columns) for k in METRICS}
+
+def _shape_windowed(metrics: Dict[str, pd.DataFrame], series: bool) -> pd.DataFrame:
+    if series:
+        return pd.DataFrame({k: m.iloc[:, 0] for k, m in metrics.items()})
+    return pd.concat(metrics, axis=1)
+
+def rolling_performance(navs: Union[pd.Series, pd.DataFrame], window: int, risk_free: float = 0.0,
+                        periods_per_year: int = 252, benchmark_nav: Optional[pd.Series] = None) -> pd.DataFrame:
+    """Metrics of every trailing ``window`` rows, for one NAV series or many (runs as columns).
+
+    The value at row ``t`` equals ``performance_from_nav(nav.iloc[t - window + 1:t + 1])``
+    (rows before the first full window, and windows with missing values, are NaN).
+    Moments come from pandas' rolling aggregations and drawdowns from strided window
+    views, so no per-window Python loop runs. A Series gives one column per metric; a DataFrame gives ``(metric, run)`` columns.
+    """
+    if window < 2:
+        raise ValueError("window must cover at least two NAV observations")
+    frame = _as_frame(navs)
+    v = frame.to_numpy(dtype=float)
+    first = frame.shift(window - 1).to_numpy(dtype=float)
+    rows = np.broadcast_to(np.arange(len(v))[:, None] - (window - 1), v.shape)
+    metrics = _windowed_performance(frame, lambda x: x.rolling(window - 1, min_periods=1), first, v,
+                                    _rolling_max_drawdown(v, window), rows.clip(0), window - 1, risk_free, periods_per_year,
+                                    benchmark_nav)
+    return _shape_windowed(metrics, isinstance(navs, pd.Series))
+
+def expanding_performance(navs: Union[pd.Series, pd.DataFrame], min_periods: int = 2, risk_free: float = 0.0,
+                          periods_per_year: int = 252, benchmark_nav: Optional[pd.Series] = None) -> pd.DataFrame:
+    """Metrics from the start of each NAV up to every row (``performance_from_nav(nav.iloc[:t + 1])``).
+
+    Rows with fewer than ``min_periods`` NAV observations are NaN. Same output layout as
+    :func:`rolling_performance`.
+    """
+    frame = _as_frame(navs)
+    v = frame.to_numpy(dtype=float)
+    first = np.broadcast_to(frame.bfill().to_numpy(dtype=float)[:1], v.shape)
+    last = frame.ffill().to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mdd = np.fmin.accumulate(v / np.fmax.accumulate(v, axis=0) - 1.0, axis=0)
+    start = np.broadcast_to((~np.isnan(v)).argmax(axis=0), v.shape)
+    metrics = _windowed_performance(frame, lambda x: x.expanding(min_periods=1), first, last, mdd, start,
+                                    max(min_periods - 1, 1), risk_free, periods_per_year, benchmark_nav)
+    return _shape_windowed(metrics, isinstance(navs, pd.Series))
@@ -0,0 +1,163 @@
+"""Resting limit, stop and stop-limit orders matched against OHLC bars.
+
+Orders are kept per symbol in four price-sorted lists (buy limits, sell limits, buy
+stops, sell stops). Each list is keyed so that the orders a bar can reach form its
+tail: buy limits and sell stops by price (reached when ``price >= low``), sell limits
+and buy stops by negated price (reached when ``price <= high``). Matching a bar is a
+``bisect`` per list plus one slice per filled batch, i.e. O(log n + fills) however many
+orders rest in the book.
+
+Fill prices
+-----------
+- Limit: the limit price, or the open if the bar gaps through it (``min(open, limit)``
+  for buys, ``max(open, limit)`` for sells).
+- Stop: becomes a market order when the bar trades through the stop; fills at the stop,
+  or at the open on a gap (``max(open, stop)`` for buys, ``min(open, stop)`` for sells).
+- Stop-limit: once triggered it fills at the stop fill price if that is within the
+  limit; otherwise it rests as a limit order from the next bar on (the bar's path after
+  the trigger is unknown).
+
+Orders fill in full (bar volume is not checked); reached orders fill best price first,
+then in submission order. ``tif="gtc"`` orders rest until filled or cancelled,
+``tif="day"`` orders are cancelled after the first bar they are matched against.
+
+Example
+-------
+>>> book = OrderBook()
+>>> oid = book.add(Order("SPY", 10, "buy", order_type="limit", limit_price=99.5))
+>>> book.match("SPY", open_=100.0, high=101.0, low=99.0)   # [(order, 99.5)]
+"""
+from __future__ import annotations
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+from .broker import Order
+
+ORDER_TYPES = ("market", "limit", "stop", "stop_limit")
+_LISTS = ("buy_limit", "sell_limit", "buy_stop", "sell_stop")
+
+def _list_and_key(side: str, kind: str, price: float) -> Tuple[str, float]:
+    # Which sorted list the order rests in, and its key there (reached orders are the tail).
+    name = f"{side}_{kind}"
+    return name, (price if name in ("buy_limit", "sell_stop") else -price)
+
+class OrderBook:
+    """Per-symbol, price-indexed book of resting (non-market) orders."""
+    def __init__(self):
+        self._books: Dict[str, Dict[str, list]] = {}   # symbol -> list name -> sorted (key, -seq, order)
+        self._where: Dict[int, Tuple[str, str, tuple]] = {}   # order_id -> (symbol, list name, entry)
+        self._day: List[int] = []                      # day orders not yet matched against a bar
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def _insert(self, order: Order, name: str, key: float):
+        entry = (key, -order.order_id, order)
+        lists = self._books.get(order.symbol)
+        if lists is None:
+            lists = self._books[order.symbol] = {n: [] for n in _LISTS}
+        insort(lists[name], entry)
+        self._where[order.order_id] = (order.symbol, name, entry)
+
+    def add(self, order: Order) -> int:
+        """Rest ``order`` in the book and return its ``order_id``.
+
+        Raises
+        ------
+        ValueError
+            For market orders, unknown order types or sides, non-positive quantities,
+            a missing ``limit_price`` / ``stop_price`` or an unknown ``tif``.
+        """
+        if order.order_type not in ORDER_TYPES or order.order_type == "market":
+            raise ValueError(f"OrderBook takes limit, stop or stop_limit orders, got: {order.order_type}")
+        if order.side not in ("buy", "sell"):
+            raise ValueError(f"Unknown side: {order.side}")
+        if order.qty <= 0:
+            raise ValueError("Order qty must be positive")
+        if order.order_type in ("limit", "stop_limit") and order.limit_price is None:
+            raise ValueError(f"{order.order_type} order needs a limit_price")
+        if order.order_type in ("stop", "stop_limit") and order.stop_price is None:
+            raise ValueError(f"{order.order_type} order needs a stop_price")
+        if order.tif not in ("gtc", "day"):
+            raise ValueError(f"Unknown tif: {order.tif}")
+        self._seq += 1
+        order.order_id = self._seq
+        if order.order_type == "limit":
+            self._insert(order, *_list_and_key(order.side, "limit", float(order.limit_price)))
+        else:
+            self._insert(order, *_list_and_key(order.side, "stop", float(order.stop_price)))
+        if order.tif == "day":
+            self._day.append(order.order_id)
+        return order.order_id
+
+    def cancel(self, order_id: int) -> bool:
+        """Remove a resting order; ``False`` if it already filled, expired or was cancelled."""
+        loc = self._where.pop(order_id, None)
+        if loc is None:
+            return False
+        symbol, name, entry = loc
+        lst = self._books[symbol][name]
+        del lst[bisect_left(lst, entry[:2])]
+        return True
+
+    def get(self, order_id: int) -> Optional[Order]:
+        loc = self._where.get(order_id)
+        return None if loc is None else loc[2][2]
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[Order]:
+        """Resting orders (all symbols by default), in submission order."""
+        orders = [loc[2][2] for loc in self._where.values() if symbol is None or loc[0] == symbol]
+        return sorted(orders, key=lambda o: o.order_id)
+
+    def _take(self, lists: Dict[str, list], name: str, threshold: float) -> list:
+        # Pop the reached tail, best price first, then oldest first.
+        lst = lists[name]
+        i = bisect_left(lst, (threshold,))
+        if i == len(lst):
+            return []
+        hit = lst[i:]
+        del lst[i:]
+        for entry in hit:
+            del self._where[-entry[1]]
+        hit.reverse()
+        return hit
+
+    def match(self, symbol: str, open_: float, high: float, low: float) -> List[Tuple[Order, float]]:
+        """Fill the orders of ``symbol`` that one bar reaches.
+
+        Returns
+        -------
+        list of (Order, float)
+            Filled orders with their fill price (before slippage, which only applies to
+            ``"stop"`` orders, see :meth:`qbt.core.broker.Broker.transact`).
+        """
+        fills: List[Tuple[Order, float]] = []
+        lists = self._books.get(symbol)
+        if lists is not None and self._where:
+            for _, _, o in self._take(lists, "buy_limit", low):
+                fills.append((o, min(open_, o.limit_price)))
+            for _, _, o in self._take(lists, "sell_limit", -high):
+                fills.append((o, max(open_, o.limit_price)))
+            for name, sign in (("buy_stop", 1), ("sell_stop", -1)):
+                for _, _, o in self._take(lists, name, low if sign < 0 else -high):
+                    px = max(open_, o.stop_price) if sign > 0 else min(open_, o.stop_price)
+                    if o.order_type == "stop" or sign * (o.limit_price - px) >= 0:
+                        fills.append((o, px))
+                    else:   # triggered stop-limit whose limit is not reachable at the trigger
+                        self._insert(o, *_list_and_key(o.side, "limit", float(o.limit_price)))
+        if self._day:
+            self._expire(symbol)
+        return fills
+
+    def _expire(self, symbol: str):
+        # Day orders of ``symbol`` have now seen their bar.
+        keep = []
+        for oid in self._day:
+            loc = self._where.get(oid)
+            if loc is None:
+                continue
+            if loc[0] == symbol:
+                self.cancel(oid)
+            else:
+                keep.append(oid)
+        self._day = keep
@@ -0,0 +1,199 @@
+"""Run independent backtests across a process pool.
+
+Market data is published once as a memory-mapped ``DataStore`` (under ``/dev/shm`` when
+available, so pages live in shared memory). Workers map them read-only at start-up
+instead of receiving pickled DataFrames with every job. Results come back in job order;
+a failing job is reported in its :class:`JobResult` without affecting the others. A
+worker that dies breaks the whole pool, so the unfinished jobs are re-run on a fresh
+one (and, if that breaks too, each in a pool of its own) until only the crashing job
+is left failed.
+
+Example
+-------
+>>> jobs = [BacktestJob(SmaCross, {"short_window": s, "long_window": 50}, symbols=["AAA"]) for s in (5, 10, 20)]
+>>> results = run_parallel(jobs, data_map, max_workers=4, progress=print_progress)
+"""
+from __future__ import annotations
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+import pandas as pd
+from .broker import Broker
+from .metrics import performance_from_nav
+from ..data.store import DataStore
+
+FIELDS = ["open", "high", "low", "close", "volume"]
+
+@dataclass
+class BacktestJob:
+    """One independent backtest.
+
+    Attributes
+    ----------
+    strategy : type
+        Strategy class, importable at module level (classes are pickled by reference).
+        Single-symbol classes are built as ``strategy(data, params)``, multi-symbol ones
+        as ``strategy(data_map, params)``.
+    params : dict
+        Strategy params. For single-symbol jobs ``symbol`` defaults to the job symbol.
+    symbols : list of str
+        One symbol runs ``BacktestEngine``; several (or ``multi=True``) run ``BacktestEngineMulti``.
+    start, end : optional
+        Index labels bounding the rows the job runs on (both included); the whole
+        history by default. Lets many jobs share one published ``data_map``.
+    """
+    strategy: type
+    params: dict = field(default_factory=dict)
+    symbols: Sequence[str] = ()
+    starting_cash: float = 100_000.0
+    commission_bps: float = 0.0
+    slippage: float = 0.0
+    multi: bool = False
+    name: Optional[str] = None
+    start: Optional[object] = None
+    end: Optional[object] = None
+
+@dataclass
+class JobResult:
+    index: int
+    name: Optional[str]
+    nav: Optional[pd.Series] = None
+    metrics: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+class SharedMarketData:
+    """OHLCV arrays of a ``data_map`` written once to a memory-mapped :class:`DataStore`.
+
+    The object itself is small and picklable (it only carries the store path), so it
+    can be handed to pool initializers. Use it as a context manager, or call
+    :meth:`close` to delete the files.
+    """
+    def __init__(self, data_map: Dict[str, pd.DataFrame], root: Optional[str] = None):
+        if root is None:
+            base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+            root = tempfile.mkdtemp(prefix="qbt-shared-", dir=base)
+        self.root = str(root)
+        self.symbols = list(data_map)
+        store = DataStore(self.root)
+        for sym, df in data_map.items():
+            store.write(sym, df)
+
+    def load(self) -> Dict[str, pd.DataFrame]:
+        """Map the arrays read-only and wrap them in DataFrames without copying the values."""
+        return DataStore(self.root).load_many(self.symbols, columns=FIELDS)
+
+    def close(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_WORKER_DATA: Dict[str, pd.DataFrame] = {}
+
+def _init_worker(shared: SharedMarketData):
+    global _WORKER_DATA
+    _WORKER_DATA = shared.load()
+
+def _run_job(index: int, job: BacktestJob) -> JobResult:
+    from .engine import BacktestEngine
+    from .engine_multi import BacktestEngineMulti
+    t0 = time.perf_counter()
+    try:
+        symbols = list(job.symbols)
+        if not symbols:
+            raise ValueError("job has no symbols")
+        broker = Broker(commission_bps=job.commission_bps, slippage=job.slippage)
+        # Shallow copies: strategies may add indicator columns, the mapped values stay shared.
+        if job.multi or len(symbols) > 1:
+            data_map = {s: _WORKER_DATA[s].loc[job.start:job.end].copy(deep=False) for s in symbols}
+            strat = job.strategy(data_map, dict(job.params))
+            engine = BacktestEngineMulti(data_map=data_map, strategy=strat,
+                                         starting_cash=job.starting_cash, broker=broker)
+        else:
+            data = _WORKER_DATA[symbols[0]].loc[job.start:job.end].copy(deep=False)
+            strat = job.strategy(data, {"symbol": symbols[0], **job.params})
+            engine = BacktestEngine(data=data, symbol=symbols[0], strategy=strat,
+                                    starting_cash=job.starting_cash, broker=broker)
+        nav = engine.run()
+        metrics = performance_from_nav(nav / nav.iloc[0])
+        return JobResult(index, job.name, nav=nav, metrics=metrics, elapsed=time.perf_counter() - t0)
+    except Exception:
+        return JobResult(index, job.name, error=traceback.format_exc(), elapsed=time.perf_counter() - t0)
+
+def print_progress(done: int, total: int, result: JobResult):
+    """Default progress reporter: one status line per finished job on stderr."""
+    status = "ok" if result.ok else "FAILED"
+    label = result.name if result.name is not None else f"job {result.index}"
+    print(f"[{done}/{total}] {label}: {status} ({result.elapsed:.2f}s)", file=sys.stderr)
+
+def run_parallel(jobs: Sequence[BacktestJob],
+                 data_map: Dict[str, pd.DataFrame],
+                 max_workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, int, JobResult], None]] = None) -> List[JobResult]:
+    """Run ``jobs`` over a process pool and return their results in job order.
+
+    Parameters
+    ----------
+    jobs : sequence of BacktestJob
+    data_map : dict
+        Symbol -> OHLCV frame; published once via :class:`SharedMarketData`.
+    max_workers : int, optional
+        Pool size (default: CPU count). ``0`` runs every job in this process, which is
+        handy for debugging and gives identical results.
+    progress : callable, optional
+        Called as ``progress(done, total, result)`` after each job, in completion order.
+    """
+    jobs = list(jobs)
+    results: List[Optional[JobResult]] = [None] * len(jobs)
+    with SharedMarketData(data_map) as shared:
+        if max_workers == 0:
+            _init_worker(shared)
+            for i, job in enumerate(jobs):
+                results[i] = _run_job(i, job)
+                if progress:
+                    progress(i + 1, len(jobs), results[i])
+            return results
+        done, pending, broken = 0, list(range(len(jobs))), 0
+        while pending:
+            # After two broken pools, run each remaining job alone to find the crashing one.
+            batches = [pending] if broken < 2 else [[i] for i in pending]
+            pending = []
+            for batch in batches:
+                workers = max_workers if len(batch) > 1 else 1
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared,)) as pool:
+                    futures = {pool.submit(_run_job, i, jobs[i]): i for i in batch}
+                    for fut in as_completed(futures):
+                        i = futures[fut]
+                        try:
+                            results[i] = fut.result()
+                        except BrokenProcessPool:
+                            # A worker died and took every unfinished job down with it.
+                            if len(batch) > 1:
+                                pending.append(i)
+                                continue
+                            results[i] = JobResult(i, jobs[i].name, error=traceback.format_exc())
+                        except Exception:
+                            # e.g. an unpicklable result.
+                            results[i] = JobResult(i, jobs[i].name, error=traceback.format_exc())
+                        done += 1
+                        if progress:
+                            progress(done, len(jobs), results[i])
+            if pending:
+                pending.sort()
+                broken += 1
+    return results
@@ -1,11 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict
+from typing import Optional
+from .ledger import Ledger
 
 @dataclass
 class Position:
     qty: int = 0
-    cost_basis: float = 0.0  # average price
+    cost_basis: float = 0.0  # average entry price of a long position (0 when flat or short)
 
 class Portfolio:
     """Cash + single-symbol position portfolio (MVP).
@@ -15,19 +16,29 @@ class Portfolio:
     - Single-symbol simplifies bookkeeping for beginners.
     - Extending to multi-symbol requires using a dict[str, Position].
     """
-    def __init__(self, starting_cash: float = 100_000.0):
+    def __init__(self, starting_cash: float = 100_000.0, symbol: Optional[str] = None):
         self.cash = float(starting_cash)
         self.position = Position()
-        self.equity_history = []  # list of (timestamp, equity)
+        self.ledger = Ledger([symbol or "position"])  # per-bar cash/position/value/equity
+
+    def reserve(self, bars: int):
+        """Preallocate the ledger for a run of ``bars`` bars."""
+        self.ledger.reserve(bars)
+
+    @property
+    def equity_history(self) -> list:
+        """List of (timestamp, equity), rebuilt from the ledger."""
+        return self.ledger.history()
 
     def _update_cost_basis_on_buy(self, price: float, qty: int):
-        # Weighted average price update
+        # Weighted average price update over the long units only
         total_qty = self.position.qty + qty
+        held = max(self.position.qty, 0)
         if total_qty <= 0:
-            # If fully closed (shouldn't happen on buy), reset basis
-            self.position.cost_basis = price
+            # Still short (or flat) after covering: no long units to price
+            self.position.cost_basis = 0.0
         else:
-            new_basis = (self.position.cost_basis * self.position.qty + price * qty) / total_qty
+            new_basis = (self.position.cost_basis * held + price * (total_qty - held)) / total_qty
             self.position.cost_basis = new_basis
 
     def on_fill(self, timestamp, executed_price: float, qty: int, side: str, fee: float):
@@ -55,19 +66,15 @@ class Portfolio:
             cash_delta = (executed_price * qty) - fee
             self.cash += cash_delta
             self.position.qty -= qty
-            if self.position.qty == 0:
-                # Reset basis when flat
+            if self.position.qty <= 0:
+                # Reset basis when flat or short
                 self.position.cost_basis = 0.0
 
     def mark_to_market(self, timestamp, last_price: float):
         """Record equity using the latest market price."""
         position_value = self.position.qty * last_price
         equity = self.cash + position_value
-        self.equity_history.append((timestamp, equity))
+        self.ledger.record_one(timestamp, self.cash, equity, 0, self.position.qty, position_value)
 
     def equity_series(self):
-        import pandas as pd
-        if not self.equity_history:
-            return pd.Series(dtype=float)
-        idx, vals = zip(*self.equity_history)
-        return pd.Series(vals, index=idx, name="equity").sort_index()
+        return self.ledger.equity_series()
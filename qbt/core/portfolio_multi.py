@@ -1,53 +1,130 @@
 from __future__ import annotations
+from collections.abc import Mapping
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Iterable, Union
+import numpy as np
+from .ledger import Ledger
 
 @dataclass
 class Position:
     qty: int = 0
     cost_basis: float = 0.0
 
+class PositionsView(Mapping):
+    """Read-only ``{symbol: Position}`` view over the portfolio arrays.
+
+    Holds the symbols that have traded, like the dict it replaces; each lookup returns
+    a fresh :class:`Position` snapshot.
+    """
+    def __init__(self, pf: "PortfolioMulti"):
+        self._pf = pf
+
+    def __getitem__(self, symbol: str) -> Position:
+        j = self._pf.col.get(symbol)
+        if j is None or not self._pf.traded[j]:
+            raise KeyError(symbol)
+        return Position(int(self._pf.qty[j]), float(self._pf.basis[j]))
+
+    def __contains__(self, symbol) -> bool:
+        j = self._pf.col.get(symbol)
+        return j is not None and bool(self._pf.traded[j])
+
+    def __iter__(self):
+        symbols = self._pf.symbols
+        return (symbols[j] for j in np.flatnonzero(self._pf.traded))
+
+    def __len__(self) -> int:
+        return int(self._pf.traded.sum())
+
 class PortfolioMulti:
-    """Cash + multi-symbol positions portfolio."""
-    def __init__(self, starting_cash: float = 100_000.0):
+    """Cash + multi-symbol positions portfolio.
+
+    Positions are arrays aligned with ``symbols`` (``qty``, ``basis``), so marks and
+    rebalances are single vector operations; ``positions`` gives the dict-style view.
+    """
+    def __init__(self, starting_cash: float = 100_000.0, symbols: Iterable[str] = ()):
         self.cash = float(starting_cash)
-        self.positions: Dict[str, Position] = {}
-        self.equity_history = []
+        self.ledger = Ledger(symbols)  # per-bar cash/positions/values/equity
+        self.symbols = self.ledger.symbols
+        self.col = self.ledger.col
+        k = len(self.symbols)
+        self.qty = np.zeros(k, dtype=np.int64)
+        self.basis = np.zeros(k)
+        self.traded = np.zeros(k, dtype=bool)
+
+    @property
+    def positions(self) -> PositionsView:
+        return PositionsView(self)
 
-    def _pos(self, symbol: str) -> Position:
-        if symbol not in self.positions:
-            self.positions[symbol] = Position()
-        return self.positions[symbol]
+    def reserve(self, bars: int):
+        """Preallocate the ledger for a run of ``bars`` bars."""
+        self.ledger.reserve(bars)
+
+    @property
+    def equity_history(self) -> list:
+        """List of (timestamp, equity), rebuilt from the ledger."""
+        return self.ledger.history()
+
+    def _col(self, symbol: str) -> int:
+        j = self.col.get(symbol)
+        if j is None:
+            j = self.ledger.add_symbol(symbol)
+            self.qty = np.append(self.qty, 0)
+            self.basis = np.append(self.basis, 0.0)
+            self.traded = np.append(self.traded, False)
+        return j
 
     def on_fill(self, timestamp, symbol: str, executed_price: float, qty: int, side: str, fee: float):
-        pos = self._pos(symbol)
+        j = self._col(symbol)
+        self.traded[j] = True
+        pos_qty, basis = int(self.qty[j]), float(self.basis[j])
         if side == "buy":
             cash_delta = -(executed_price * qty) - fee
             self.cash += cash_delta
-            total_qty = pos.qty + qty
+            total_qty = pos_qty + qty
+            held = max(pos_qty, 0)
             if total_qty > 0:
-                pos.cost_basis = (pos.cost_basis * pos.qty + executed_price * qty) / total_qty
+                basis = (basis * held + executed_price * (total_qty - held)) / total_qty
             else:
-                pos.cost_basis = 0.0
-            pos.qty += qty
+                basis = 0.0
+            pos_qty += qty
         else:
             cash_delta = (executed_price * qty) - fee
             self.cash += cash_delta
-            pos.qty -= qty
-            if pos.qty == 0:
-                pos.cost_basis = 0.0
-
-    def mark_to_market(self, timestamp, last_prices: Dict[str, float]):
-        equity = self.cash
-        for sym, pos in self.positions.items():
-            px = last_prices.get(sym)
-            if px is not None:
-                equity += pos.qty * px
-        self.equity_history.append((timestamp, equity))
+            pos_qty -= qty
+            if pos_qty <= 0:
+                basis = 0.0
+        self.qty[j], self.basis[j] = pos_qty, basis
+
+    def on_fills(self, timestamp, cols: np.ndarray, executed_price: np.ndarray, qty: np.ndarray, fee: np.ndarray):
+        """Apply one fill per column in ``cols`` at once; ``qty`` is signed (+buy / -sell).
+
+        Same bookkeeping as :meth:`on_fill`, as array operations.
+        """
+        old = self.qty[cols]
+        new = old + qty
+        basis = self.basis[cols]
+        held = np.maximum(old, 0)
+        bought = (basis * held + executed_price * (new - held)) / np.where(new > 0, new, 1)
+        self.basis[cols] = np.where(new > 0, np.where(qty > 0, bought, basis), 0.0)
+        self.qty[cols] = new
+        self.traded[cols] = True
+        self.cash -= float(np.sum(executed_price * qty)) + float(np.sum(fee))
+
+    def prices_array(self, last_prices: Union[Dict[str, float], np.ndarray]) -> np.ndarray:
+        if isinstance(last_prices, np.ndarray):
+            return last_prices
+        return np.array([last_prices.get(s, 0.0) for s in self.symbols], dtype=float)
+
+    def equity(self, last_prices: Union[Dict[str, float], np.ndarray]) -> float:
+        """Cash plus positions at ``last_prices`` (array in ``symbols`` order, or a dict)."""
+        value = self.qty * self.prices_array(last_prices)
+        return self.cash + float(np.sum(value[self.qty != 0]))
+
+    def mark_to_market(self, timestamp, last_prices: Union[Dict[str, float], np.ndarray]):
+        value = self.qty * self.prices_array(last_prices)
+        value[self.qty == 0] = 0.0   # flat or unpriced symbols contribute nothing
+        self.ledger.record(timestamp, self.cash, self.cash + float(value.sum()), self.qty, value)
 
     def equity_series(self):
-        import pandas as pd
-        if not self.equity_history:
-            return pd.Series(dtype=float)
-        idx, vals = zip(*self.equity_history)
-        return pd.Series(vals, index=idx, name="equity").sort_index()
+        return self.ledger.equity_series()
@@ -0,0 +1,144 @@
+"""Opt-in per-stage timing for the engines.
+
+Pass ``profiler=Profiler()`` to ``BacktestEngine``, ``BacktestEngineMulti`` or
+``EventDrivenEngine`` to accumulate wall time and call counts per stage (data access,
+marking, strategy, execution, ...). The engines have a single bar/event loop that calls
+:meth:`Profiler.lap` after each stage; without a profiler those calls go to a
+:class:`NullProfiler`, whose hooks do nothing.
+
+Example
+-------
+>>> prof = Profiler(trace=True)
+>>> BacktestEngine(df, "AAPL", strat, profiler=prof).run()
+>>> prof.report()["stages"]["strategy"]        # {'calls': ..., 'total_s': ..., 'mean_us': ..., 'share': ...}
+>>> prof.write_chrome_trace("run_trace.json")  # open in chrome://tracing or Perfetto
+"""
+from __future__ import annotations
+import json
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def _maxrss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024   # bytes on macOS, KiB elsewhere
+
+class Profiler:
+    """Cumulative time and call counts per stage, plus events/s and peak memory of a run.
+
+    Parameters
+    ----------
+    trace : bool
+        Also keep every span for :meth:`chrome_trace` (one tuple per stage call).
+    memory : {"rss", "tracemalloc", None}
+        ``"rss"`` reads the process peak RSS before/after the run (free); ``"tracemalloc"``
+        measures the peak of Python allocations during the run (precise, but slows it down).
+    """
+    def __init__(self, trace: bool = False, memory: Optional[str] = "rss"):
+        if memory not in ("rss", "tracemalloc", None):
+            raise ValueError("memory must be 'rss', 'tracemalloc' or None")
+        self.trace = trace
+        self.memory = memory
+        self.total_ns: Dict[str, int] = {}
+        self.calls: Dict[str, int] = {}
+        self.spans: List[Tuple[str, int, int]] = []   # (stage, start_ns, duration_ns)
+        self.events = 0
+        self.wall_ns = 0
+        self.peak_bytes: Optional[int] = None
+        self.rss_growth_bytes: Optional[int] = None
+        self._t0 = self._lap = self._rss0 = None
+        self._own_tracemalloc = False
+
+    def add(self, stage: str, t0: int, t1: int):
+        """Record one call of ``stage`` that ran from ``t0`` to ``t1`` (``perf_counter_ns``)."""
+        self.total_ns[stage] = self.total_ns.get(stage, 0) + (t1 - t0)
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        if self.trace:
+            self.spans.append((stage, t0, t1 - t0))
+
+    def lap(self, stage: str):
+        """Record one call of ``stage`` lasting from the previous lap (or :meth:`start`) until now."""
+        t = time.perf_counter_ns()
+        self.add(stage, self._lap, t)
+        self._lap = t
+
+    @contextmanager
+    def span(self, stage: str):
+        """Time a block of user code (e.g. inside ``on_bar``) as ``stage``."""
+        t0 = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(stage, t0, time.perf_counter_ns())
+
+    def start(self):
+        """Called by the engine when a run begins."""
+        if self.memory == "tracemalloc":
+            import tracemalloc
+            self._own_tracemalloc = not tracemalloc.is_tracing()
+            if self._own_tracemalloc:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        elif self.memory == "rss":
+            self._rss0 = _maxrss_bytes()
+        self._t0 = self._lap = time.perf_counter_ns()
+
+    def stop(self, events: int):
+        """Called by the engine when a run ends, with the number of bars/events processed."""
+        self.wall_ns += time.perf_counter_ns() - self._t0
+        self.events += events
+        if self.memory == "tracemalloc":
+            import tracemalloc
+            peak = tracemalloc.get_traced_memory()[1]
+            self.peak_bytes = max(self.peak_bytes or 0, peak)
+            if self._own_tracemalloc:
+                tracemalloc.stop()
+        elif self.memory == "rss":
+            rss = _maxrss_bytes()
+            if rss is not None:
+                self.peak_bytes = rss
+                self.rss_growth_bytes = (self.rss_growth_bytes or 0) + rss - self._rss0
+
+    def report(self) -> dict:
+        """Structured summary: wall time, events/s, memory and per-stage totals."""
+        wall = self.wall_ns / 1e9
+        stages = {name: {"calls": self.calls[name],
+                         "total_s": ns / 1e9,
+                         "mean_us": ns / 1e3 / self.calls[name],
+                         "share": ns / self.wall_ns if self.wall_ns else 0.0}
+                  for name, ns in sorted(self.total_ns.items(), key=lambda kv: -kv[1])}
+        return {"wall_s": wall, "events": self.events,
+                "events_per_s": self.events / wall if wall else 0.0,
+                "peak_bytes": self.peak_bytes, "rss_growth_bytes": self.rss_growth_bytes,
+                "memory": self.memory, "stages": stages}
+
+    def chrome_trace(self) -> dict:
+        """Spans in Chrome trace-event format (requires ``trace=True``)."""
+        events = [{"name": name, "ph": "X", "ts": t0 / 1e3, "dur": dur / 1e3, "pid": 0, "tid": 0}
+                  for name, t0, dur in self.spans]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.chrome_trace(), fh)
+
+class NullProfiler:
+    """Stand-in the engines use when no profiler is given: every hook is a no-op."""
+    __slots__ = ()
+
+    def start(self):
+        pass
+
+    def stop(self, events: int):
+        pass
+
+    def lap(self, stage: str):
+        pass
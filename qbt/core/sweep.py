@@ -0,0 +1,185 @@
+"""Batched parameter sweeps for the built-in single-symbol strategies.
+
+Instead of running one engine per parameter set, a sweep computes each distinct
+indicator once, gathers them into (parameter sets x bars) arrays, derives the
+entry/exit signals of every run in one pass and simulates all equity curves
+together with :func:`qbt.core.engine_vectorized.simulate_targets`.
+
+Indicators use the same pandas expressions as the strategy classes, so each row of
+the result matches a ``BacktestEngine`` run with those parameters. They are looked up
+in :mod:`qbt.cache` first, so repeated sweeps and strategy runs on the same prices share
+them.
+"""
+from __future__ import annotations
+import itertools
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from ..cache import cached, fingerprint
+from .broker import Broker
+from .engine_vectorized import simulate_targets
+from .metrics import performance_from_navs
+
+Grid = Union[Dict[str, Iterable], pd.DataFrame]
+
+def param_grid(**axes: Iterable) -> pd.DataFrame:
+    """Cartesian product of parameter axes, one row per parameter set."""
+    names = list(axes)
+    combos = list(itertools.product(*(list(v) for v in axes.values())))
+    return pd.DataFrame(combos, columns=names)
+
+def _stack(series_by_key: Dict, keys: Iterable) -> np.ndarray:
+    # Gather per-value indicator rows into one (runs x bars) array.
+    return np.stack([series_by_key[k] for k in keys])
+
+def _crosses(fast: np.ndarray, slow: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Cross up/down between consecutive bars where both lines are defined (SmaCross rules).
+    valid = ~(np.isnan(fast) | np.isnan(slow))
+    above = fast > slow
+    prev_valid = np.zeros_like(valid); prev_valid[:, 1:] = valid[:, :-1]
+    prev_above = np.zeros_like(above); prev_above[:, 1:] = above[:, :-1]
+    live = valid & prev_valid
+    return live & above & ~prev_above, live & prev_above & ~above
+
+def _signals_sma(close: pd.Series, params: pd.DataFrame):
+    windows = np.unique(params[["short_window", "long_window"]].to_numpy())
+    fp = fingerprint(close)
+    sma = {int(w): cached("sma", fp, lambda w=int(w): close.rolling(w).mean(), window=int(w)).to_numpy() for w in windows}
+    return _crosses(_stack(sma, params["short_window"].astype(int)), _stack(sma, params["long_window"].astype(int)))
+
+def _signals_momentum(close: pd.Series, params: pd.DataFrame):
+    fp = fingerprint(close)
+    mom = {int(lb): cached("roc", fp, lambda lb=int(lb): close.pct_change(lb), periods=int(lb)).to_numpy()
+           for lb in params["lookback"].unique()}
+    m = _stack(mom, params["lookback"].astype(int))
+    thr = params["threshold"].to_numpy(dtype=float)[:, None]
+    return m > thr, m <= thr
+
+def _signals_bbands(close: pd.Series, params: pd.DataFrame):
+    lbs = params["lookback"].astype(int)
+    fp = fingerprint(close)
+    mid = {int(lb): cached("sma", fp, lambda lb=int(lb): close.rolling(lb).mean(), window=int(lb)).to_numpy()
+           for lb in lbs.unique()}
+    std = {int(lb): cached("std", fp, lambda lb=int(lb): close.rolling(lb).std(ddof=0), window=int(lb), ddof=0).to_numpy()
+           for lb in lbs.unique()}
+    mid, std = _stack(mid, lbs), _stack(std, lbs)
+    k = params["num_std"].to_numpy(dtype=float)[:, None]
+    c = close.to_numpy()[None, :]
+    return c > mid + k * std, c < mid - k * std
+
+def _signals_rsi(close: pd.Series, params: pd.DataFrame):
+    from qbt.strategies.ta_rsi import _rsi
+    fp = fingerprint(close)
+    rsi = {int(lb): _rsi(close, window=int(lb), fp=fp).to_numpy() for lb in params["lookback"].unique()}
+    r = _stack(rsi, params["lookback"].astype(int))
+    return r < params["lower"].to_numpy(dtype=float)[:, None], r > params["upper"].to_numpy(dtype=float)[:, None]
+
+def _signals_macd(close: pd.Series, params: pd.DataFrame):
+    from qbt.strategies.ta_macd import _ema
+    spans = np.unique(params[["fast", "slow"]].to_numpy())
+    fp = fingerprint(close)
+    ema = {int(s): _ema(close, int(s), fp) for s in spans}
+    diff = np.empty((len(params), len(close)))
+    # The signal EWM runs over many MACD lines at once, grouped by signal span.
+    for span, rows in params.groupby("signal").indices.items():
+        sub = params.iloc[rows]
+        macd = pd.DataFrame({j: ema[int(f)] - ema[int(s)] for j, (f, s) in enumerate(zip(sub["fast"], sub["slow"]))})
+        sig = macd.ewm(span=int(span), adjust=False).mean()
+        diff[rows] = (macd - sig).to_numpy().T
+    prev = np.full_like(diff, np.nan); prev[:, 1:] = diff[:, :-1]
+    return (prev <= 0) & (diff > 0), (prev >= 0) & (diff < 0)
+
+# Name -> (parameters with the strategy class's defaults, signal function).
+SWEEPS: Dict[str, Tuple[Dict[str, float], Callable]] = {
+    "sma": ({"short_window": 10, "long_window": 30}, _signals_sma),
+    "momentum": ({"lookback": 60, "threshold": 0.0}, _signals_momentum),
+    "bbands": ({"lookback": 20, "num_std": 2.0}, _signals_bbands),
+    "rsi": ({"lookback": 14, "lower": 30.0, "upper": 70.0}, _signals_rsi),
+    "macd": ({"fast": 12, "slow": 26, "signal": 9}, _signals_macd),
+}
+
+def _valid_params(strategy: str, params: pd.DataFrame) -> pd.DataFrame:
+    if strategy == "sma":
+        params = params[params["short_window"] < params["long_window"]]
+    elif strategy == "macd":
+        params = params[params["fast"] < params["slow"]]
+    return params.reset_index(drop=True)
+
+def long_flat_matrix(enter: np.ndarray, exit: np.ndarray, unit: int) -> np.ndarray:
+    """2-D version of :func:`qbt.strategies.base.long_flat_targets` (forward fill along bars)."""
+    has = enter | exit
+    sig = np.where(enter, unit, 0)
+    idx = np.where(has, np.arange(has.shape[1])[None, :], -1)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    held = np.take_along_axis(sig, np.maximum(idx, 0), axis=1)
+    return np.where(idx >= 0, held, 0).astype(np.int64)
+
+def resolve_grid(strategy: str, grid: Grid) -> pd.DataFrame:
+    """Parameter table of ``grid`` for ``strategy``: defaults filled in, invalid sets dropped."""
+    if strategy not in SWEEPS:
+        raise ValueError(f"Unknown sweep strategy: {strategy}. Choose from {sorted(SWEEPS)}")
+    defaults = SWEEPS[strategy][0]
+    params = grid.copy() if isinstance(grid, pd.DataFrame) else param_grid(**grid)
+    for name, value in defaults.items():
+        if name not in params.columns:
+            params[name] = value
+    return _valid_params(strategy, params[list(defaults)])
+
+def sweep_targets(close: pd.Series, strategy: str, params: pd.DataFrame, unit: int = 100) -> np.ndarray:
+    """Target positions, shape (parameter sets x bars), of ``strategy`` for each row of ``params``."""
+    enter, exit = SWEEPS[strategy][1](close.astype(float), params)
+    return long_flat_matrix(enter, exit, unit)
+
+def sweep(data: pd.DataFrame,
+          strategy: str,
+          grid: Grid,
+          unit: int = 100,
+          starting_cash: float = 100_000.0,
+          broker: Optional[Broker] = None,
+          rank_by: str = "sharpe",
+          ascending: bool = False,
+          chunk_size: int = 1024,
+          periods_per_year: int = 252) -> pd.DataFrame:
+    """Evaluate every parameter set in ``grid`` and return a ranked metrics table.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        OHLCV frame with a DatetimeIndex (as returned by ``load_csv``). Not modified.
+    strategy : str
+        One of ``SWEEPS``: 'sma', 'momentum', 'bbands', 'rsi', 'macd'.
+    grid : dict or pd.DataFrame
+        Either axes (``{"short_window": [5, 10], "long_window": [20, 50]}``), expanded with
+        :func:`param_grid`, or an explicit table of parameter sets. Parameters missing from
+        the grid take the strategy's defaults.
+    unit : int
+        Lot size, as in the strategy ``unit`` param.
+    rank_by, ascending : str, bool
+        Metric column used to sort the result (NaNs last).
+    chunk_size : int
+        Parameter sets simulated per batch; bounds memory at ~chunk_size x bars arrays.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per valid parameter set: the parameters, ``num_trades``, ``final_equity``
+        and the keys of :func:`~qbt.core.metrics.performance_from_nav` on the normalized NAV
+        (computed for the whole chunk at once by :func:`~qbt.core.metrics.performance_from_navs`).
+    """
+    params = resolve_grid(strategy, grid)
+    broker = broker or Broker()
+    data = data.sort_index()
+    close = data["close"].astype(float)
+    open_ = data["open"].to_numpy(dtype=float)
+    stats = []
+    for start in range(0, len(params), chunk_size):
+        chunk = params.iloc[start:start + chunk_size]
+        res = simulate_targets(open_, close.to_numpy(), sweep_targets(close, strategy, chunk, unit),
+                               starting_cash=starting_cash, commission_bps=broker.commission_bps,
+                               slippage=broker.slippage)
+        perf = performance_from_navs((res.equity / res.equity[:, :1]).T, periods_per_year=periods_per_year)
+        perf.insert(0, "num_trades", (res.trade_qty != 0).sum(axis=1))
+        perf.insert(1, "final_equity", res.equity[:, -1])
+        stats.append(perf.set_axis(chunk.index))
+    out = pd.concat([params, pd.concat(stats) if stats else pd.DataFrame(index=params.index)], axis=1)
+    return out.sort_values(rank_by, ascending=ascending, na_position="last", kind="stable").reset_index(drop=True)
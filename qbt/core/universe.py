@@ -0,0 +1,170 @@
+"""Aligned multi-symbol universe: one master calendar and dense (time x symbol) arrays.
+
+:class:`AlignedUniverse` is built once from ``{symbol: OHLCV frame}``: the calendar is
+the intersection (``how="inner"``) or union (``how="outer"``) of the symbols'
+timestamps, found with one ``np.unique`` over all stamps instead of pairwise index
+set operations, and every field is scattered into a (time x symbol) float array by
+``searchsorted`` position. ``valid[t, j]`` marks real bars; on a union calendar the
+other cells are forward-filled from the symbol's previous bar (NaN before its first).
+
+Engines take the universe in place of a ``data_map`` (:class:`BacktestEngineMulti`,
+:class:`~qbt.core.event_engine.EventDrivenEngine`), and as a ``Mapping`` of
+``symbol -> frame of real bars`` it also stands in for the ``data_map`` strategies are
+built from. Reusing one universe across runs skips the alignment work and lets
+strategies cache arrays keyed on it.
+
+Example
+-------
+>>> uni = AlignedUniverse(data_map, how="outer")
+>>> uni.field("close")[-1]                         # last close of every symbol
+>>> for params in grid:
+...     BacktestEngineMulti(uni, TopNMomentum(uni, params)).run()
+"""
+from __future__ import annotations
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+FIELDS = ["open", "high", "low", "close", "volume"]
+
+def shared_fields(data_map: Mapping) -> List[str]:
+    """OHLCV plus the extra numeric columns every frame has, in the first frame's order."""
+    frames = list(data_map.values())
+    return FIELDS + [c for c in frames[0].columns if c not in FIELDS
+                     and all(c in df.columns and pd.api.types.is_numeric_dtype(df[c]) for df in frames)]
+
+_UNITS = ["s", "ms", "us", "ns"]
+
+def _values(df: pd.DataFrame, fields: List[str]) -> np.ndarray:
+    # (field x rows) floats; one conversion for all-numeric frames.
+    try:
+        arr = df.to_numpy(dtype=float)
+    except (TypeError, ValueError):
+        return np.array([df[f].to_numpy(dtype=float) for f in fields]).reshape(len(fields), len(df))
+    pos = {c: i for i, c in enumerate(df.columns)}
+    take = [pos[f] for f in fields]
+    return arr.T if take == list(range(arr.shape[1])) else arr[:, take].T
+
+class AlignedUniverse(Mapping):
+    """Master calendar, per-symbol validity mask and dense field arrays for a set of symbols.
+
+    Parameters
+    ----------
+    data_map : dict of str -> pd.DataFrame
+        OHLCV frames on DatetimeIndexes (any order; duplicate stamps keep the first row).
+    how : str
+        ``"inner"``: timestamps every symbol has (every cell is a real bar);
+        ``"outer"``: timestamps any symbol has.
+    fields : list of str, optional
+        Columns to keep (default: :func:`shared_fields`).
+
+    Attributes
+    ----------
+    index : pd.DatetimeIndex
+        The calendar.
+    symbols : list of str
+    arrays : np.ndarray
+        (field x time x symbol) float array; :meth:`field` returns one (time x symbol) slice.
+    valid : np.ndarray
+        (time x symbol) bool, True where the symbol has a bar.
+    dense : bool
+        True when every cell is valid.
+    """
+    def __init__(self, data_map: Mapping, how: str = "inner", fields: Optional[Sequence[str]] = None):
+        if how not in ("inner", "outer"):
+            raise ValueError(f"how must be 'inner' or 'outer', got: {how}")
+        if not data_map:
+            raise ValueError("data_map is empty")
+        self.fields = list(fields) if fields is not None else shared_fields(data_map)
+        for sym, df in data_map.items():
+            for col in self.fields:
+                if col not in df.columns:
+                    raise ValueError(f"{sym} missing column: {col}")
+        self.how = how
+        self.symbols = list(data_map.keys())
+        self.col = {sym: j for j, sym in enumerate(self.symbols)}
+        unit = max((df.index.unit for df in data_map.values()), key=_UNITS.index)
+        stamps, columns = [], []
+        for df in data_map.values():
+            s = (df.index if df.index.unit == unit else df.index.as_unit(unit)).asi8
+            cols = _values(df, self.fields)
+            if len(s) > 1 and not (s[1:] > s[:-1]).all():
+                s, first = np.unique(s, return_index=True)   # sorted, first row per stamp
+                cols = cols[:, first]
+            stamps.append(s)
+            columns.append(cols)
+        first = stamps[0]
+        same = all(len(s) == len(first) and np.array_equal(s, first) for s in stamps[1:])
+        if same:
+            calendar = first
+        else:
+            uniq, counts = np.unique(np.concatenate(stamps), return_counts=True)
+            calendar = uniq[counts == len(stamps)] if how == "inner" else uniq
+        ref = next(iter(data_map.values())).index
+        index = pd.DatetimeIndex(calendar.astype(f"datetime64[{unit}]"), name=ref.name)
+        self.index = index.tz_localize("UTC").tz_convert(ref.tz) if ref.tz is not None else index
+        T, k = len(calendar), len(stamps)
+        if same:
+            self.arrays = np.stack(columns, axis=-1)   # field -> (time x symbol), C-contiguous
+            self.valid = np.ones((T, k), dtype=bool)
+        else:
+            self.arrays = np.full((len(self.fields), T, k), np.nan)
+            self.valid = np.zeros((T, k), dtype=bool)
+            for j, (s, cols) in enumerate(zip(stamps, columns)):
+                pos = np.searchsorted(calendar, s)
+                hit = pos < T
+                hit[hit] = calendar[pos[hit]] == s[hit]
+                self.arrays[:, pos[hit], j] = cols[:, hit]
+                self.valid[pos[hit], j] = True
+        self.dense = bool(self.valid.all())
+        if not self.dense:
+            self._forward_fill()
+        self._columns: Dict[str, Dict[str, np.ndarray]] = {}
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    def _forward_fill(self):
+        # Gather every cell from the symbol's latest valid row (-1: none yet -> NaN).
+        T, k = self.valid.shape
+        last = np.maximum.accumulate(np.where(self.valid, np.arange(T)[:, None], -1), axis=0)
+        rows, cols = np.maximum(last, 0), np.arange(k)
+        for m in range(len(self.fields)):
+            self.arrays[m] = np.where(last >= 0, self.arrays[m][rows, cols], np.nan)
+
+    def field(self, name: str) -> np.ndarray:
+        """(time x symbol) array of one field (shared, treat as read-only)."""
+        return self.arrays[self.fields.index(name)]
+
+    def columns(self, symbol: str) -> Dict[str, np.ndarray]:
+        """``{field: column over the calendar}`` views for one symbol (for :class:`BarView`)."""
+        cols = self._columns.get(symbol)
+        if cols is None:
+            j = self.col[symbol]
+            cols = self._columns[symbol] = {f: self.arrays[m][:, j] for m, f in enumerate(self.fields)}
+        return cols
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """Symbol's fields over the whole calendar (forward-filled on an outer calendar)."""
+        return pd.DataFrame(self.columns(symbol), index=self.index)
+
+    def __getitem__(self, symbol: str) -> pd.DataFrame:
+        # The symbol's real bars, like the frame it was built from.
+        df = self._frames.get(symbol)
+        if df is None:
+            df = self.frame(symbol)
+            if not self.dense:
+                df = df[self.valid[:, self.col[symbol]]]
+            self._frames[symbol] = df
+        return df
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self.col
+
+    def __repr__(self) -> str:
+        return f"AlignedUniverse({len(self.symbols)} symbols x {len(self.index)} bars, how={self.how!r})"
@@ -0,0 +1,268 @@
+"""Walk-forward optimization: tune on a training window, trade the following test window, roll on.
+
+For every window the parameter grid is evaluated in-sample, the set with the best
+``objective`` (any :func:`~qbt.core.metrics.performance_from_nav` key, or a callable)
+is run on the out-of-sample window that follows, and the out-of-sample NAV segments
+are chained into one curve. Windows are independent and run on a process pool.
+
+Two execution paths:
+
+* ``strategy`` given by :data:`~qbt.core.sweep.SWEEPS` name ('sma', 'momentum', ...):
+  each worker computes the indicators and target positions of the whole grid once on
+  the full history; every window then slices those arrays and simulates all
+  parameter sets together (:func:`~qbt.core.engine_vectorized.simulate_targets`).
+  Indicators at a window's first bars are therefore warmed up on earlier data.
+* ``strategy`` given as a class (e.g. ``TopNMomentum``, or any bar-loop strategy):
+  one :class:`~qbt.core.parallel.BacktestJob` per window and parameter set, run by
+  :func:`~qbt.core.parallel.run_parallel` on the window's rows.
+
+Example
+-------
+>>> res = walk_forward(df, "sma", {"short_window": [5, 10, 20], "long_window": [50, 100]},
+...                    train="5Y", test="1Y", objective="sharpe")
+>>> res.windows[["test_start", "short_window", "long_window", "score", "total_return"]]
+>>> res.nav.plot()
+"""
+from __future__ import annotations
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+from .broker import Broker
+from .engine_vectorized import simulate_targets
+from .metrics import METRICS, performance_from_nav, performance_from_navs
+from .parallel import BacktestJob, run_parallel
+from .sweep import Grid, param_grid, resolve_grid, sweep_targets
+
+Span = Union[int, str, pd.DateOffset, pd.Timedelta]
+Objective = Union[str, Callable[[pd.DataFrame], np.ndarray]]
+
+@dataclass
+class WalkForwardResult:
+    """Outcome of :func:`walk_forward`.
+
+    Attributes
+    ----------
+    windows : pd.DataFrame
+        One row per window: ``train_start``, ``train_end``, ``test_start``, ``test_end``
+        (index labels, inclusive), the chosen parameters, their in-sample ``score`` and
+        the out-of-sample metrics of the test segment.
+    nav : pd.Series
+        Out-of-sample equity, test segments chained end to end from ``starting_cash``.
+    metrics : dict
+        :func:`performance_from_nav` of the normalized stitched NAV.
+    """
+    windows: pd.DataFrame
+    nav: pd.Series
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+def _offset(span: Span):
+    if isinstance(span, str):
+        m = re.fullmatch(r"(\d+)\s*([YM])", span.strip())
+        if m:   # calendar years/months, e.g. "5Y", "6M"
+            n = int(m.group(1))
+            return pd.DateOffset(years=n) if m.group(2) == "Y" else pd.DateOffset(months=n)
+        return pd.tseries.frequencies.to_offset(span)
+    return span
+
+def _bounds(index: pd.Index, train: Span, test: Span, step: Optional[Span], anchored: bool) -> np.ndarray:
+    # Half-open row positions (train_start, train_end, test_start, test_end) per window.
+    n = len(index)
+    step = test if step is None else step
+    if isinstance(test, int) != isinstance(step, int):
+        raise ValueError("test and step must both be bar counts or both be time spans")
+    if isinstance(test, int):
+        if step < test:
+            raise ValueError("step must be at least test: out-of-sample windows may not overlap")
+        first = train if isinstance(train, int) else int(index.searchsorted(index[0] + _offset(train)))
+        starts = np.arange(first, n, step)
+        ends = np.minimum(starts + test, n)
+    else:
+        t_test, t_step = _offset(test), _offset(step)
+        if index[0] + t_step < index[0] + t_test:
+            raise ValueError("step must be at least test: out-of-sample windows may not overlap")
+        t = index[min(train, n - 1)] if isinstance(train, int) else index[0] + _offset(train)
+        times = []
+        while t <= index[-1]:
+            times.append(t)
+            t = t + t_step
+        times = pd.DatetimeIndex(times)
+        starts, ends = index.searchsorted(times), index.searchsorted(times + t_test)
+    if anchored:
+        train_starts = np.zeros_like(starts)
+    elif isinstance(train, int):
+        train_starts = starts - train
+    else:
+        train_starts = index.searchsorted(index[starts] - _offset(train))
+    out = np.unique(np.column_stack([train_starts, starts, starts, ends]).astype(np.int64), axis=0)
+    return out[(out[:, 3] > out[:, 2]) & (out[:, 1] - out[:, 0] >= 2) & (out[:, 0] >= 0)]
+
+def _labels(index: pd.Index, b: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({"train_start": index[b[:, 0]], "train_end": index[b[:, 1] - 1],
+                         "test_start": index[b[:, 2]], "test_end": index[b[:, 3] - 1]})
+
+def walk_forward_windows(index: pd.Index, train: Span, test: Span, step: Optional[Span] = None,
+                         anchored: bool = False) -> pd.DataFrame:
+    """Train/test windows over ``index``, as inclusive index labels.
+
+    ``train``, ``test`` and ``step`` are bar counts (int) or time spans: ``"5Y"``,
+    ``"6M"``, any pandas offset alias (``"90D"``) or a ``pd.DateOffset``. Test windows
+    start after the first full training window and advance by ``step`` (default:
+    ``test``); the last one may be shorter. ``anchored=True`` grows the training window
+    from the first bar instead of rolling it.
+    """
+    return _labels(index, _bounds(index, train, test, step, anchored))
+
+def _scores(metrics: pd.DataFrame, objective: Objective) -> np.ndarray:
+    if callable(objective):
+        return np.asarray(objective(metrics), dtype=float)
+    return metrics[objective].to_numpy(dtype=float)
+
+def _best(scores: np.ndarray, maximize: bool) -> int:
+    s = np.where(np.isnan(scores), -np.inf, scores if maximize else -scores)
+    return int(np.argmax(s))
+
+_WF: dict = {}   # per-worker arrays of the batched (SWEEPS) path
+
+def _init_sweep_worker(open_: np.ndarray, close: pd.Series, strategy: str, params: pd.DataFrame, unit: int):
+    # Indicators and targets of the whole grid, computed once per worker for all windows.
+    _WF.update(open=open_, close=close.to_numpy(dtype=float),
+               targets=sweep_targets(close, strategy, params, unit))
+
+def _sweep_window(bounds, objective: Objective, maximize: bool, cash: float, commission_bps: float,
+                  slippage: float, periods_per_year: int):
+    a, b, c, d = bounds
+    o, cl, tg = _WF["open"], _WF["close"], _WF["targets"]
+    ins = simulate_targets(o[a:b], cl[a:b], tg[:, a:b], cash, commission_bps, slippage)
+    perf = performance_from_navs((ins.equity / ins.equity[:, :1]).T, periods_per_year=periods_per_year)
+    scores = _scores(perf, objective)
+    j = _best(scores, maximize)
+    oos = simulate_targets(o[c:d], cl[c:d], tg[j, c:d], cash, commission_bps, slippage)
+    return j, float(scores[j]), oos.equity
+
+def _run_sweep_path(data: pd.DataFrame, strategy: str, grid: Grid, bounds: np.ndarray, objective: Objective,
+                    maximize: bool, unit: int, cash: float, broker: Broker, max_workers: Optional[int],
+                    periods_per_year: int):
+    params = resolve_grid(strategy, grid)
+    if params.empty:
+        raise ValueError("grid has no valid parameter sets")
+    init = (data["open"].to_numpy(dtype=float), data["close"].astype(float), strategy, params, unit)
+    args = (objective, maximize, cash, broker.commission_bps, broker.slippage, periods_per_year)
+    if max_workers == 0:
+        _init_sweep_worker(*init)
+        out = [_sweep_window(bd, *args) for bd in bounds]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_sweep_worker, initargs=init) as pool:
+            out = list(pool.map(_sweep_window, bounds, *([a] * len(bounds) for a in args)))
+    records = params.to_dict("records")
+    chosen = [records[j] for j, _, _ in out]
+    return chosen, [s for _, s, _ in out], [e for _, _, e in out]
+
+def _run_engine_path(data_map: Dict[str, pd.DataFrame], cls: type, grid: Grid, bounds: np.ndarray,
+                     index: pd.Index, objective: Objective, maximize: bool, cash: float, broker: Broker,
+                     max_workers: Optional[int]):
+    params = grid.copy() if isinstance(grid, pd.DataFrame) else param_grid(**grid)
+    rows = params.to_dict("records") or [{}]
+    symbols = list(data_map)
+    costs = dict(starting_cash=cash, commission_bps=broker.commission_bps, slippage=broker.slippage,
+                 multi=len(symbols) > 1)
+
+    def run(jobs: List[BacktestJob]):
+        results = run_parallel(jobs, data_map, max_workers=max_workers)
+        failed = [r for r in results if not r.ok]
+        if failed:
+            raise RuntimeError(f"walk-forward job {failed[0].name} failed:\n{failed[0].error}")
+        return results
+
+    ins = run([BacktestJob(cls, p, symbols, name=f"window {w} in-sample {k}",
+                           start=index[a], end=index[b - 1], **costs)
+               for w, (a, b, _, _) in enumerate(bounds) for k, p in enumerate(rows)])
+    chosen, scores = [], []
+    for w in range(len(bounds)):
+        res = ins[w * len(rows):(w + 1) * len(rows)]
+        s = _scores(pd.DataFrame([r.metrics for r in res], columns=METRICS), objective)
+        j = _best(s, maximize)
+        chosen.append(rows[j]); scores.append(float(s[j]))
+    oos = run([BacktestJob(cls, chosen[w], symbols, name=f"window {w} out-of-sample",
+                           start=index[c], end=index[d - 1], **costs)
+               for w, (_, _, c, d) in enumerate(bounds)])
+    return chosen, scores, [r.nav.to_numpy(dtype=float) for r in oos]
+
+def walk_forward(data: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+                 strategy: Union[str, type],
+                 grid: Grid,
+                 train: Span,
+                 test: Span,
+                 step: Optional[Span] = None,
+                 anchored: bool = False,
+                 objective: Objective = "sharpe",
+                 maximize: bool = True,
+                 unit: int = 100,
+                 starting_cash: float = 100_000.0,
+                 broker: Optional[Broker] = None,
+                 max_workers: Optional[int] = None,
+                 periods_per_year: int = 252) -> WalkForwardResult:
+    """Rolling in-sample optimization with out-of-sample evaluation, windows in parallel.
+
+    Parameters
+    ----------
+    data : pd.DataFrame or dict
+        OHLCV frame (single symbol) or symbol -> frame on a shared index (multi-asset
+        strategy classes such as ``TopNMomentum``).
+    strategy : str or type
+        A :data:`~qbt.core.sweep.SWEEPS` name for the batched path, or a strategy class
+        run through the engines (single-symbol classes get ``symbol`` filled in).
+    grid : dict or pd.DataFrame
+        Parameter axes or an explicit table, as in :func:`~qbt.core.sweep.sweep`.
+    train, test, step, anchored
+        Window layout, see :func:`walk_forward_windows`.
+    objective : str or callable
+        ``performance_from_nav`` key to rank in-sample runs by, or a function taking the
+        in-sample metrics table (one row per parameter set) and returning scores.
+        NaN scores never win.
+    maximize : bool
+        Pick the highest (default) or lowest score.
+    unit : int
+        Lot size for the batched path (strategy classes take it from ``grid``).
+    max_workers : int, optional
+        Pool size (default: CPU count); ``0`` runs every window in this process.
+
+    Notes
+    -----
+    Each test segment starts flat with ``starting_cash``; segments are chained by
+    compounding their returns, so the stitched NAV closes the position at the last
+    mark of one segment and re-opens it at the next segment's first fill.
+    """
+    if isinstance(objective, str) and objective not in METRICS:
+        raise ValueError(f"Unknown objective: {objective}. Choose from {METRICS} or pass a callable")
+    broker = broker or Broker()
+    if isinstance(data, pd.DataFrame):
+        data = data.sort_index()
+        index = data.index
+    else:
+        index = next(iter(data.values())).sort_index().index
+    bounds = _bounds(index, train, test, step, anchored)
+    if not len(bounds):
+        raise ValueError("no complete train/test window fits in the data")
+    if isinstance(strategy, str):
+        if not isinstance(data, pd.DataFrame):
+            raise ValueError("sweep strategies take a single-symbol DataFrame")
+        chosen, scores, segments = _run_sweep_path(data, strategy, grid, bounds, objective, maximize, unit,
+                                                   starting_cash, broker, max_workers, periods_per_year)
+    else:
+        data_map = {str(data["symbol"].iloc[0]) if "symbol" in data.columns else "ASSET": data} \
+            if isinstance(data, pd.DataFrame) else data
+        chosen, scores, segments = _run_engine_path(data_map, strategy, grid, bounds, index, objective, maximize,
+                                                    starting_cash, broker, max_workers)
+    level, pieces, stats = 1.0, [], []
+    for (_, _, c, d), eq in zip(bounds, segments):
+        seg = pd.Series(eq / eq[0], index=index[c:c + len(eq)])
+        stats.append(performance_from_nav(seg, periods_per_year=periods_per_year))
+        pieces.append(level * seg)
+        level *= seg.iloc[-1]
+    nav = starting_cash * pd.concat(pieces)
+    windows = pd.concat([_labels(index, bounds), pd.DataFrame(chosen), pd.Series(scores, name="score"),
+                         pd.DataFrame(stats)], axis=1)
+    return WalkForwardResult(windows, nav, performance_from_nav(nav / starting_cash, periods_per_year=periods_per_year))
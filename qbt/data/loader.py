@@ -1,33 +1,11 @@
 from __future__ import annotations
 import pandas as pd
-from typing import Optional
+from typing import Iterator, Optional
 
 REQUIRED_COLS = ["datetime", "open", "high", "low", "close", "volume"]
 
-def load_csv(path: str, symbol: Optional[str] = None, tz: Optional[str] = None) -> pd.DataFrame:
-    """Load OHLCV data from a CSV and return a standardized DataFrame.
-
-    Parameters
-    ----------
-    path : str
-        File path to the CSV.
-    symbol : Optional[str]
-        Symbol identifier to attach as a column if not present in the CSV.
-    tz : Optional[str]
-        Timezone to localize the datetime index; leave None to keep naive.
-
-    Returns
-    -------
-    pd.DataFrame
-        Columns: ['open','high','low','close','volume'] indexed by DatetimeIndex (ascending).
-        If 'symbol' exists or provided, it's kept as a column for reference.
-
-    Notes
-    -----
-    - Expected columns: datetime, open, high, low, close, volume (case-insensitive allowed).
-    - For simplicity we assume the CSV is already adjusted (no split/dividend adjustments here).
-    """
-    df = pd.read_csv(path)
+def _standardize(df: pd.DataFrame, tz: Optional[str] = None) -> pd.DataFrame:
+    # Normalize column names, parse/sort/dedup timestamps and set the index.
     lower_cols = {c.lower(): c for c in df.columns}
     # Normalize column names (case-insensitive)
     missing = [c for c in REQUIRED_COLS if c not in lower_cols]
@@ -49,6 +27,10 @@ def load_csv(path: str, symbol: Optional[str] = None, tz: Optional[str] = None)
             df.index = df.index.tz_localize(tz)
         else:
             df.index = df.index.tz_convert(tz)
+    return df
+
+def _finalize(df: pd.DataFrame, symbol: Optional[str] = None) -> pd.DataFrame:
+    # Attach symbol, coerce numerics, drop incomplete bars and select output columns.
     if 'symbol' not in df.columns and symbol is not None:
         df['symbol'] = symbol
     # Ensure numeric types
@@ -56,3 +38,59 @@ def load_csv(path: str, symbol: Optional[str] = None, tz: Optional[str] = None)
         df[col] = pd.to_numeric(df[col], errors='coerce')
     df = df.dropna(subset=['open','high','low','close'])
     return df[['open','high','low','close','volume'] + (['symbol'] if 'symbol' in df.columns else [])]
+
+def load_csv(path: str, symbol: Optional[str] = None, tz: Optional[str] = None) -> pd.DataFrame:
+    """Load OHLCV data from a CSV and return a standardized DataFrame.
+
+    Parameters
+    ----------
+    path : str
+        File path to the CSV.
+    symbol : Optional[str]
+        Symbol identifier to attach as a column if not present in the CSV.
+    tz : Optional[str]
+        Timezone to localize the datetime index; leave None to keep naive.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: ['open','high','low','close','volume'] indexed by DatetimeIndex (ascending).
+        If 'symbol' exists or provided, it's kept as a column for reference.
+
+    Notes
+    -----
+    - Expected columns: datetime, open, high, low, close, volume (case-insensitive allowed).
+    - For simplicity we assume the CSV is already adjusted (no split/dividend adjustments here).
+    """
+    df = pd.read_csv(path)
+    return _finalize(_standardize(df, tz=tz), symbol=symbol)
+
+def iter_csv_chunks(path: str, chunksize: int = 100_000, symbol: Optional[str] = None,
+                    tz: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Stream a large OHLCV CSV as standardized chunks of at most ``chunksize`` rows.
+
+    Each chunk goes through the same column normalization, numeric coercion and dropna
+    rules as :func:`load_csv`, so concatenating the chunks equals ``load_csv(path)``.
+    Only one raw chunk is held in memory at a time.
+
+    Notes
+    -----
+    - Streaming cannot sort the whole file, so rows must be in time order across chunks
+      (order inside a chunk is fixed up). A timestamp earlier than one already emitted
+      raises ``ValueError``.
+    - A timestamp repeated across a chunk boundary keeps its first occurrence, as
+      ``load_csv`` does.
+    """
+    last = None
+    for raw in pd.read_csv(path, chunksize=chunksize):
+        df = _standardize(raw, tz=tz)
+        stamps = df.index[df.index.notna()]   # unparseable timestamps sort last as NaT
+        if last is not None and len(stamps):
+            if stamps[0] < last:
+                raise ValueError(f"CSV is not sorted by datetime: {stamps[0]} after {last}")
+            df = df[~(df.index <= last)]
+        if len(stamps):
+            last = stamps[-1]
+        df = _finalize(df, symbol=symbol)
+        if len(df):
+            yield df
@@ -0,0 +1,288 @@
+"""Bar aggregation: OHLCV bars at any frequency from trade ticks or finer bars.
+
+Rows are bucketed by an integer key per row (time bucket, or cumulative volume /
+dollar threshold crossings) and every bucket is reduced with ``np.maximum.reduceat``
+and friends over the contiguous runs of equal keys, so no group-by or sort is needed
+for time-ordered input (unordered input is put in order once with a stable sort).
+
+- Time bars: fixed-width frequencies (``"5min"``, ``"h"``, ``"D"``) are counted from
+  midnight of the first row's day, like ``DataFrame.resample``; ``"W"``, ``"ME"``,
+  ``"QE"`` and ``"YE"`` use calendar periods. Bars are labeled with the start of their
+  interval and empty intervals are skipped. Tz-aware data is bucketed in local time.
+- Volume / dollar bars close on the row that takes the cumulative volume (or
+  ``close * volume``, ``price * size`` for ticks) to the next multiple of the threshold,
+  and are labeled with the timestamp of their first row. Rows are not split.
+
+:class:`BarAggregator` does the same over a stream of chunks, holding back only the
+rows of the bar still being built. :func:`higher_timeframe` and :func:`asof_positions`
+give multi-timeframe strategies ``searchsorted`` lookups from one frequency into another.
+
+Example
+-------
+>>> hourly = resample_ohlcv(minute_bars, "h")
+>>> bars = ticks_to_bars(ticks, "1min")                 # ticks: price/size columns
+>>> vbars = ticks_to_bars(ticks, volume=50_000)
+>>> daily, pos = higher_timeframe(minute_bars, "D")      # daily.iloc[pos[i]]: last completed day at minute i
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Day, Tick
+
+OHLCV = ["open", "high", "low", "close", "volume"]
+_DAY = 86_400_000_000_000
+_MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+def _period_freq(off) -> str:
+    # Period alias for a calendar offset: W-SUN, M, Q-DEC, Y-DEC.
+    code = off.rule_code
+    if off.n != 1:
+        raise ValueError(f"Calendar frequencies must have n=1, got: {off.freqstr}")
+    if code.startswith("W-"):
+        return code
+    if code in ("ME", "MS"):
+        return "M"
+    kind, _, month = code.partition("-")
+    if kind in ("QE", "YE"):
+        return f"{kind[0]}-{month}"
+    if kind in ("QS", "YS"):   # periods starting in ``month`` end the month before
+        return f"{kind[0]}-{_MONTHS[_MONTHS.index(month) - 1]}"
+    raise ValueError(f"Unsupported bar frequency: {off.freqstr}")
+
+def _step(off) -> Optional[int]:
+    # Width in ns of a fixed-width frequency, None for calendar frequencies.
+    if isinstance(off, Tick):
+        return int(off.nanos)
+    if isinstance(off, Day):
+        return off.n * _DAY
+    return None
+
+def _index(frame: pd.DataFrame) -> pd.DatetimeIndex:
+    if isinstance(frame.index, pd.DatetimeIndex):
+        return frame.index
+    if "datetime" in frame.columns:
+        return pd.DatetimeIndex(pd.to_datetime(frame["datetime"]))
+    raise ValueError("Expected a DatetimeIndex or a 'datetime' column")
+
+def _arrays(frame: pd.DataFrame, price: Optional[str], size: str) -> Tuple[pd.DatetimeIndex, Dict[str, np.ndarray]]:
+    # Time index and OHLCV arrays of bars (``price=None``) or ticks, in time order.
+    index = _index(frame)
+    if price is None:
+        missing = [c for c in OHLCV if c not in frame.columns]
+        if missing:
+            raise ValueError(f"Bars missing required columns: {missing}")
+        cols = {c: frame[c].to_numpy(dtype=float) for c in OHLCV}
+    else:
+        p = frame[price].to_numpy(dtype=float)
+        v = frame[size].to_numpy(dtype=float) if size in frame.columns else np.ones(len(p))
+        cols = {"open": p, "high": p, "low": p, "close": p, "volume": v}
+    if not index.is_monotonic_increasing:
+        order = np.argsort(index.asi8, kind="stable")
+        index, cols = index[order], {k: a[order] for k, a in cols.items()}
+    return index, cols
+
+def _wall(index: pd.DatetimeIndex) -> np.ndarray:
+    return (index.tz_localize(None) if index.tz is not None else index).as_unit("ns").asi8
+
+def _time_keys(index: pd.DatetimeIndex, off, origin: Optional[int]) -> Tuple[np.ndarray, object]:
+    # Bucket key per row and a function mapping bucket start rows to wall-clock bucket starts (ns).
+    wall = _wall(index)
+    step = _step(off)
+    if step is not None:
+        keys = (wall - origin) // step
+        return keys, lambda starts: origin + keys[starts] * step
+    per = pd.DatetimeIndex(wall).to_period(_period_freq(off))
+    return per.asi8, lambda starts: per[starts].start_time.as_unit("ns").asi8
+
+def _threshold_keys(amount: np.ndarray, threshold: float, start: float = 0.0) -> Tuple[np.ndarray, bool]:
+    # Bar k takes the rows up to the one where the running total (from ``start``) reaches
+    # (k + 1) * threshold; also whether the last bar reached it.
+    if not threshold > 0:
+        raise ValueError("Bar threshold must be positive")
+    total = start + np.cumsum(amount)
+    keys = ((total - amount) // threshold).astype(np.int64)   # multiples passed before the row
+    return keys, bool(total[-1] >= (keys[-1] + 1) * threshold)
+
+def _reduce(cols: Dict[str, np.ndarray], starts: np.ndarray, ends: np.ndarray) -> Dict[str, np.ndarray]:
+    return {"open": cols["open"][starts],
+            "high": np.maximum.reduceat(cols["high"], starts),
+            "low": np.minimum.reduceat(cols["low"], starts),
+            "close": cols["close"][ends - 1],
+            "volume": np.add.reduceat(cols["volume"], starts)}
+
+def _runs(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return starts, np.r_[starts[1:], len(keys)]
+
+def _mode(freq, volume, dollars) -> str:
+    if sum(x is not None for x in (freq, volume, dollars)) != 1:
+        raise ValueError("Pass exactly one of freq, volume or dollars")
+    return "time" if freq is not None else "volume" if volume is not None else "dollars"
+
+def _labels(index: pd.DatetimeIndex, starts: np.ndarray, wall_labels: Optional[np.ndarray]) -> pd.DatetimeIndex:
+    first = index[starts]
+    if wall_labels is None:
+        return first
+    if index.tz is None:
+        return pd.DatetimeIndex(wall_labels.astype("datetime64[ns]")).as_unit(index.unit)
+    # shift by the UTC offset of each bar's first row (no DST ambiguity)
+    utc = first.as_unit("ns").asi8 - (_wall(first) - wall_labels)
+    return pd.DatetimeIndex(utc.astype("datetime64[ns]")).tz_localize("UTC").tz_convert(index.tz).as_unit(index.unit)
+
+def _amount(cols: Dict[str, np.ndarray], volume) -> np.ndarray:
+    return cols["volume"] if volume is not None else cols["close"] * cols["volume"]
+
+def _aggregate(index, cols, freq, volume, dollars, origin=None, start=0.0):
+    # (bars, ends, complete_last) for time-ordered arrays; ``origin`` fixes the time grid,
+    # ``start`` is the running volume/dollar total before the first row.
+    mode = _mode(freq, volume, dollars)
+    if len(index) == 0:
+        return pd.DataFrame({c: np.array([], dtype=float) for c in OHLCV}, index=index[:0]), np.array([], dtype=np.int64), True
+    to_wall = None
+    if mode == "time":
+        off = to_offset(freq)
+        if origin is None and _step(off) is not None:
+            origin = int(_wall(index[:1])[0] // _DAY * _DAY)
+        keys, to_wall = _time_keys(index, off, origin)
+        complete = False
+    else:
+        threshold = float(volume if mode == "volume" else dollars)
+        keys, complete = _threshold_keys(_amount(cols, volume), threshold, start)
+    starts, ends = _runs(keys)
+    out = pd.DataFrame(_reduce(cols, starts, ends),
+                       index=_labels(index, starts, None if to_wall is None else to_wall(starts)))
+    out.index.name = index.name
+    return out, ends, complete
+
+def resample_ohlcv(bars: pd.DataFrame, freq: Optional[str] = None, volume: Optional[float] = None,
+                   dollars: Optional[float] = None) -> pd.DataFrame:
+    """Aggregate OHLCV bars into coarser time, volume or dollar bars.
+
+    Parameters
+    ----------
+    bars : pd.DataFrame
+        ``open/high/low/close/volume`` columns on a DatetimeIndex (or a ``datetime``
+        column), e.g. from :func:`qbt.data.loader.load_csv`. Other columns are dropped.
+    freq : str, optional
+        Time bar frequency: any fixed width (``"5min"``, ``"h"``, ``"D"``) or ``"W"``,
+        ``"ME"``, ``"QE"``, ``"YE"``.
+    volume, dollars : float, optional
+        Volume or dollar (``close * volume``) per bar. Pass exactly one of the three.
+
+    Returns
+    -------
+    pd.DataFrame
+        OHLCV bars, one per non-empty bucket (``open`` of the first row, ``high`` / ``low``
+        extremes, ``close`` of the last row, summed ``volume``).
+    """
+    index, cols = _arrays(bars, None, "volume")
+    return _aggregate(index, cols, freq, volume, dollars)[0]
+
+def ticks_to_bars(ticks: pd.DataFrame, freq: Optional[str] = None, volume: Optional[float] = None,
+                  dollars: Optional[float] = None, price: str = "price", size: str = "size") -> pd.DataFrame:
+    """Build OHLCV bars from trade ticks (``price`` and ``size`` columns).
+
+    Without a ``size`` column each tick counts as volume 1 (tick count). Modes as in
+    :func:`resample_ohlcv`; dollar bars use ``price * size``.
+    """
+    index, cols = _arrays(ticks, price, size)
+    return _aggregate(index, cols, freq, volume, dollars)[0]
+
+class BarAggregator:
+    """Incremental :func:`resample_ohlcv` / :func:`ticks_to_bars` over time-ordered chunks.
+
+    ``update(chunk)`` returns the bars completed by the chunk; the rows of the bar still
+    being built are carried into the next call and ``flush()`` returns it at the end.
+    Concatenating every output equals aggregating the whole stream at once.
+
+    Example
+    -------
+    >>> agg = BarAggregator("h")
+    >>> hourly = pd.concat([agg.update(c) for c in iter_csv_chunks(path)] + [agg.flush()])
+    """
+    def __init__(self, freq: Optional[str] = None, volume: Optional[float] = None,
+                 dollars: Optional[float] = None, ticks: bool = False, price: str = "price", size: str = "size"):
+        _mode(freq, volume, dollars)
+        self.freq, self.volume, self.dollars = freq, volume, dollars
+        self.price = price if ticks else None
+        self.size = size
+        self._origin = None
+        self._start = 0.0   # running volume/dollar total before the carried rows, modulo the threshold
+        self._carry: Optional[Tuple[pd.DatetimeIndex, Dict[str, np.ndarray]]] = None
+
+    def _bars(self, chunk: Optional[pd.DataFrame], final: bool) -> pd.DataFrame:
+        if chunk is not None:
+            index, cols = _arrays(chunk, self.price, self.size)
+            if self._carry is not None:
+                prev, carried = self._carry
+                if len(index) and len(prev) and index[0] < prev[-1]:
+                    raise ValueError(f"Chunks are not in time order: {index[0]} after {prev[-1]}")
+                index = prev.append(index)
+                cols = {k: np.concatenate([carried[k], cols[k]]) for k in cols}
+        elif self._carry is not None:
+            index, cols = self._carry
+        else:
+            self._origin, self._start = None, 0.0
+            return _aggregate(pd.DatetimeIndex([]), {}, self.freq, self.volume, self.dollars)[0]
+        if self.freq is not None and self._origin is None and len(index) and _step(to_offset(self.freq)) is not None:
+            self._origin = int(_wall(index[:1])[0] // _DAY * _DAY)
+        out, ends, complete = _aggregate(index, cols, self.freq, self.volume, self.dollars, self._origin, self._start)
+        if final:
+            self._carry, self._origin, self._start = None, None, 0.0
+            return out
+        cut = len(index) if complete or not len(out) else int(ends[-2]) if len(ends) > 1 else 0
+        if self.freq is None:
+            threshold = self.volume if self.volume is not None else self.dollars
+            self._start = float((self._start + _amount(cols, self.volume)[:cut].sum()) % threshold)
+        self._carry = (index[cut:], {k: a[cut:] for k, a in cols.items()}) if cut < len(index) else None
+        return out if cut == len(index) else out.iloc[:-1]
+
+    def update(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Add a chunk; return the bars it completed."""
+        return self._bars(chunk, final=False)
+
+    def flush(self) -> pd.DataFrame:
+        """Return the bar still being built (if any) and reset."""
+        return self._bars(None, final=True)
+
+def resample_chunks(chunks: Iterable[pd.DataFrame], freq: Optional[str] = None, volume: Optional[float] = None,
+                    dollars: Optional[float] = None, ticks: bool = False, **kw) -> Iterator[pd.DataFrame]:
+    """Yield aggregated bars from a chunk stream (e.g. :func:`qbt.data.loader.iter_csv_chunks`).
+
+    Feed the output to :class:`qbt.core.engine_stream.StreamingBacktestEngine` to backtest
+    a coarser frequency of a file that does not fit in memory.
+    """
+    agg = BarAggregator(freq, volume, dollars, ticks=ticks, **kw)
+    for chunk in chunks:
+        out = agg.update(chunk)
+        if len(out):
+            yield out
+    out = agg.flush()
+    if len(out):
+        yield out
+
+def asof_positions(index, keys) -> np.ndarray:
+    """Position of the last ``keys`` timestamp at or before each ``index`` timestamp (-1 if none).
+
+    ``keys`` must be sorted. One ``searchsorted`` replaces a ``.loc`` / ``asof`` lookup per bar.
+    """
+    return np.searchsorted(pd.DatetimeIndex(keys).as_unit("ns").asi8,
+                           pd.DatetimeIndex(index).as_unit("ns").asi8, side="right") - 1
+
+def higher_timeframe(bars: pd.DataFrame, freq: Optional[str] = None, volume: Optional[float] = None,
+                     dollars: Optional[float] = None) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Resample ``bars`` and map every row to the last coarse bar completed by then.
+
+    Returns ``(coarse, pos)``: ``coarse`` as from :func:`resample_ohlcv` and ``pos[i]``
+    the position in ``coarse`` of the latest bar whose last row is at or before row
+    ``i`` of ``bars`` (-1 before the first one completes). A coarse bar becomes visible
+    on its own last row, never earlier, so ``coarse.iloc[pos[i]]`` has no lookahead.
+    ``bars`` must be in time order.
+    """
+    if not _index(bars).is_monotonic_increasing:
+        raise ValueError("bars must be in time order")
+    index, cols = _arrays(bars, None, "volume")
+    coarse, ends, _ = _aggregate(index, cols, freq, volume, dollars)
+    return coarse, np.searchsorted(ends - 1, np.arange(len(index)), side="right") - 1
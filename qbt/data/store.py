@@ -0,0 +1,155 @@
+"""Columnar on-disk OHLCV store keyed by symbol.
+
+Layout: ``<root>/<symbol>/`` holds ``data.bin`` and ``meta.json``. ``data.bin`` packs the
+int64 timestamps (UTC for tz-aware data) and every column in its native dtype as
+contiguous, 64-byte aligned arrays; ``meta.json`` records their dtypes and offsets.
+Loads memory-map the file once and view the columns in place, so reading a symbol costs
+one file open rather than a CSV parse. Column and date-range projection slice the mapped
+arrays without copying them.
+
+Example
+-------
+>>> store = DataStore("data/store")
+>>> store.ingest_csv("examples/data_sample/AAPL.csv", symbol="AAPL")   # parse once
+>>> df = store.load("AAPL", columns=["close"], start="2020-01-01")       # near zero-copy
+"""
+from __future__ import annotations
+import json
+import mmap as _mmap
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote, unquote
+import numpy as np
+import pandas as pd
+from .loader import load_csv
+
+OHLCV = ["open", "high", "low", "close", "volume"]
+_ALIGN = 64
+
+class DataStore:
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _dir(self, symbol: str) -> Path:
+        return self.root / quote(str(symbol), safe="")
+
+    def symbols(self) -> List[str]:
+        return sorted(unquote(p.name) for p in self.root.iterdir() if (p / "meta.json").exists())
+
+    def __contains__(self, symbol: str) -> bool:
+        return (self._dir(symbol) / "meta.json").exists()
+
+    def meta(self, symbol: str) -> dict:
+        path = self._dir(symbol) / "meta.json"
+        if not path.exists():
+            raise KeyError(f"Symbol not in store: {symbol}")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def write(self, symbol: str, df: pd.DataFrame, source: Optional[dict] = None):
+        """Store a standardized OHLCV frame (DatetimeIndex, numeric columns) for ``symbol``.
+
+        Non-numeric columns (such as ``symbol``) are not stored; the store key names the symbol.
+        """
+        missing = [c for c in OHLCV if c not in df.columns]
+        if missing:
+            raise ValueError(f"{symbol} missing columns: {missing}")
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError("Data index must be DatetimeIndex.")
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        columns = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+        idx = df.index
+        tz = str(idx.tz) if idx.tz is not None else None
+        stamps = idx.tz_convert("UTC").tz_localize(None) if tz else idx
+        tmp = self._dir(symbol).with_name(self._dir(symbol).name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        layout = {}
+        with open(tmp / "data.bin", "wb") as f:
+            for name, arr in [("__index__", stamps.asi8)] + [(c, df[c].to_numpy()) for c in columns]:
+                arr = np.ascontiguousarray(arr)
+                f.write(b"\0" * (-f.tell() % _ALIGN))
+                layout[name] = [arr.dtype.str, f.tell()]
+                f.write(arr.tobytes())
+        meta = {"symbol": str(symbol), "columns": columns, "rows": int(len(df)), "tz": tz,
+                "unit": idx.unit, "index_name": idx.name, "layout": layout, "source": source}
+        (tmp / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        # Swap in the complete directory so readers never see a half-written symbol.
+        shutil.rmtree(self._dir(symbol), ignore_errors=True)
+        os.replace(tmp, self._dir(symbol))
+
+    def ingest_csv(self, path: str, symbol: Optional[str] = None, tz: Optional[str] = None,
+                   force: bool = False) -> str:
+        """Parse a CSV with :func:`load_csv` and store it, unless this exact file is already stored.
+
+        The file size, modification time and ``tz`` are recorded, so re-ingesting an unchanged
+        file the same way is a no-op and a changed file (or another ``tz``) is re-parsed.
+        Returns the symbol key used.
+        """
+        symbol = symbol or Path(path).stem
+        stat = os.stat(path)
+        source = {"path": str(Path(path).resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                  "tz": tz}
+        if not force and symbol in self and self.meta(symbol).get("source") == source:
+            return symbol
+        self.write(symbol, load_csv(path, symbol=symbol, tz=tz), source=source)
+        return symbol
+
+    def _bound(self, meta: dict, ts) -> int:
+        ts = pd.Timestamp(ts)
+        if meta["tz"]:
+            ts = ts.tz_localize(meta["tz"]) if ts.tz is None else ts
+            ts = ts.tz_convert("UTC").tz_localize(None)
+        return int(ts.to_datetime64().astype(f"M8[{meta['unit']}]").astype(np.int64))
+
+    def load(self, symbol: str, columns: Optional[Iterable[str]] = None, start=None, end=None,
+             mmap: bool = True, with_symbol: bool = False) -> pd.DataFrame:
+        """Load ``symbol`` as an OHLCV DataFrame.
+
+        Parameters
+        ----------
+        columns : iterable of str, optional
+            Columns to load (default: all stored columns). Other columns are never read.
+        start, end : timestamp-like, optional
+            Inclusive date range, like ``df.loc[start:end]``.
+        mmap : bool
+            Memory-map the columns read-only (default). ``False`` reads them into memory.
+        with_symbol : bool
+            Add a ``symbol`` column, as ``load_csv(path, symbol=...)`` does.
+        """
+        meta = self.meta(symbol)
+        d = self._dir(symbol)
+        columns = list(columns) if columns is not None else meta["columns"]
+        unknown = [c for c in columns if c not in meta["columns"]]
+        if unknown:
+            raise ValueError(f"{symbol} has no columns: {unknown}")
+        rows, layout = meta["rows"], meta["layout"]
+        with open(d / "data.bin", "rb") as f:
+            if mmap and rows:
+                buf = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+            else:
+                buf = f.read()   # bytes: also read-only, but owned by this process
+        def col(name):
+            dtype, offset = layout[name]
+            return np.frombuffer(buf, dtype=np.dtype(dtype), count=rows, offset=offset)
+        stamps = col("__index__")
+        lo = 0 if start is None else int(np.searchsorted(stamps, self._bound(meta, start), side="left"))
+        hi = len(stamps) if end is None else int(np.searchsorted(stamps, self._bound(meta, end), side="right"))
+        idx = pd.DatetimeIndex(stamps[lo:hi].view(f"M8[{meta['unit']}]"), name=meta.get("index_name"))
+        if meta["tz"]:
+            idx = idx.tz_localize("UTC").tz_convert(meta["tz"])
+        data = {c: col(c)[lo:hi] for c in columns}
+        df = pd.DataFrame(data, index=idx, copy=False)
+        if with_symbol:
+            df["symbol"] = meta["symbol"]
+        return df
+
+    def load_many(self, symbols: Iterable[str], **kwargs) -> Dict[str, pd.DataFrame]:
+        """Load several symbols with the same projection; returns a ``data_map``."""
+        return {sym: self.load(sym, **kwargs) for sym in symbols}
+
+    def delete(self, symbol: str):
+        shutil.rmtree(self._dir(symbol), ignore_errors=True)
@@ -0,0 +1,285 @@
+"""Incremental (online) technical indicators with O(1) updates per bar.
+
+Each calculator keeps a small fixed-size state and is fed one value at a time with
+``update(x)``, or a block of values with ``update_many(values)``; state carries across
+calls, so a series can be processed in arbitrary chunks. Feeding a whole series gives
+the same numbers as the pandas expressions used by the strategies (``rolling().mean()``,
+``rolling().std(ddof=0)``, ``ewm(adjust=False).mean()``, ``pct_change``): the update
+rules follow pandas' compensated rolling sums and EWM recurrence, so results agree to
+floating-point rounding (and are usually identical).
+
+Example
+-------
+>>> sma = SMA(20)
+>>> for px in prices:
+...     value = sma.update(px)      # NaN until 20 observations
+"""
+from __future__ import annotations
+import math
+from typing import Optional, Tuple
+import numpy as np
+
+NAN = float("nan")
+
+class Indicator:
+    """Base class: ``update`` one value, ``update_many`` an array, ``reset`` the state."""
+    __slots__ = ()
+
+    def update(self, x: float):
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+    def update_many(self, values) -> np.ndarray:
+        """Feed ``values`` in order and return the output after each one.
+
+        Multi-output indicators return an array of shape (len(values), n_outputs).
+        """
+        update = self.update
+        return np.array([update(x) for x in np.asarray(values, dtype=float).tolist()], dtype=float)
+
+class _Window:
+    # Fixed-length ring buffer of the last `window` inputs.
+    __slots__ = ("window", "buf", "pos", "count")
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = int(window)
+        self.buf = [NAN] * self.window
+        self.pos = 0
+        self.count = 0
+
+    def push(self, x: float) -> Optional[float]:
+        """Store x; return the value that fell out of the window (None while filling)."""
+        old = self.buf[self.pos] if self.count >= self.window else None
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.window
+        self.count += 1
+        return old
+
+class SMA(Indicator):
+    """Simple moving average, equal to ``series.rolling(window).mean()``."""
+    __slots__ = ("_win", "_nobs", "_sum", "_comp_add", "_comp_rem", "_neg", "_same", "_prev", "value")
+
+    def __init__(self, window: int):
+        self._win = _Window(window)
+        self.reset()
+
+    @property
+    def window(self) -> int:
+        return self._win.window
+
+    def reset(self) -> None:
+        self._win = _Window(self._win.window)
+        self._nobs = 0; self._sum = 0.0; self._comp_add = 0.0; self._comp_rem = 0.0
+        self._neg = 0; self._same = 0; self._prev = NAN
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if self._win.count == 0:
+            self._prev = x
+        old = self._win.push(x)
+        if old is not None and old == old:
+            # Kahan-compensated removal, as in pandas' rolling mean
+            self._nobs -= 1
+            y = -old - self._comp_rem
+            t = self._sum + y
+            self._comp_rem = t - self._sum - y
+            self._sum = t
+            if math.copysign(1.0, old) < 0:
+                self._neg -= 1
+        if x == x:
+            self._nobs += 1
+            y = x - self._comp_add
+            t = self._sum + y
+            self._comp_add = t - self._sum - y
+            self._sum = t
+            if math.copysign(1.0, x) < 0:
+                self._neg += 1
+            self._same = self._same + 1 if x == self._prev else 1
+            self._prev = x
+        n = self._nobs
+        if n >= self._win.window:
+            v = self._sum / n
+            if self._same >= n:
+                v = self._prev
+            elif self._neg == 0 and v < 0:
+                v = 0.0
+            elif self._neg == n and v > 0:
+                v = 0.0
+        else:
+            v = NAN
+        self.value = v
+        return v
+
+class RollingStd(Indicator):
+    """Rolling standard deviation, equal to ``series.rolling(window).std(ddof=ddof)``.
+
+    Uses Welford's add/remove updates, so the state is O(window) for the buffer and O(1)
+    for the moments.
+    """
+    __slots__ = ("_win", "ddof", "_nobs", "_mean", "_ssq", "_comp_add", "_comp_rem", "value")
+
+    def __init__(self, window: int, ddof: int = 0):
+        self._win = _Window(window)
+        self.ddof = int(ddof)
+        self.reset()
+
+    @property
+    def window(self) -> int:
+        return self._win.window
+
+    def reset(self) -> None:
+        self._win = _Window(self._win.window)
+        self._nobs = 0; self._mean = 0.0; self._ssq = 0.0
+        self._comp_add = 0.0; self._comp_rem = 0.0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        old = self._win.push(x)
+        if old is not None and old == old:
+            self._nobs -= 1
+            if self._nobs:
+                prev_mean = self._mean - self._comp_rem
+                y = old - self._comp_rem
+                t = y - self._mean
+                self._comp_rem = t + self._mean - y
+                self._mean -= t / self._nobs
+                self._ssq -= (old - prev_mean) * (old - self._mean)
+            else:
+                self._mean = 0.0; self._ssq = 0.0
+        if x == x:
+            self._nobs += 1
+            prev_mean = self._mean - self._comp_add
+            y = x - self._comp_add
+            t = y - self._mean
+            self._comp_add = t + self._mean - y
+            self._mean += t / self._nobs
+            self._ssq += (x - prev_mean) * (x - self._mean)
+        n = self._nobs
+        if n >= self._win.window and n > self.ddof:
+            v = 0.0 if n == 1 else math.sqrt(max(self._ssq / (n - self.ddof), 0.0))
+        else:
+            v = NAN
+        self.value = v
+        return v
+
+class EMA(Indicator):
+    """Exponential moving average, equal to ``series.ewm(span=..., adjust=False).mean()``.
+
+    Give either ``span`` (alpha = 2 / (span + 1)) or ``alpha`` directly. Missing values
+    keep the previous average, as pandas does with ``ignore_na=False``.
+    """
+    __slots__ = ("alpha", "_factor", "_old_wt", "value")
+
+    def __init__(self, span: Optional[float] = None, alpha: Optional[float] = None):
+        if (span is None) == (alpha is None):
+            raise ValueError("Give exactly one of span or alpha")
+        self.alpha = float(alpha) if alpha is not None else 2.0 / (float(span) + 1.0)
+        if not 0 < self.alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self._factor = 1.0 - self.alpha
+        self.reset()
+
+    def reset(self) -> None:
+        self._old_wt = 1.0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        w = self.value
+        if w == w:
+            self._old_wt *= self._factor
+            if x == x:
+                if w != x:
+                    self.value = (self._old_wt * w + self.alpha * x) / (self._old_wt + self.alpha)
+                self._old_wt = 1.0
+        elif x == x:
+            self.value = x
+        return self.value
+
+class ROC(Indicator):
+    """Rate of change over ``window`` bars, equal to ``series.pct_change(window)``."""
+    __slots__ = ("_win", "value")
+
+    def __init__(self, window: int):
+        self._win = _Window(window)
+        self.value = NAN
+
+    def reset(self) -> None:
+        self._win = _Window(self._win.window)
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        old = self._win.push(x)
+        self.value = NAN if old is None else x / old - 1.0
+        return self.value
+
+class RSI(Indicator):
+    """Wilder-style RSI on EWM gains/losses (alpha = 1/window), as in ``ta_rsi._rsi``."""
+    __slots__ = ("_gain", "_loss", "_prev", "value")
+
+    def __init__(self, window: int = 14):
+        self._gain = EMA(alpha=1.0 / window)
+        self._loss = EMA(alpha=1.0 / window)
+        self.reset()
+
+    def reset(self) -> None:
+        self._gain.reset(); self._loss.reset()
+        self._prev = NAN
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        delta = x - self._prev          # NaN on the first bar, like series.diff()
+        self._prev = x
+        gain = self._gain.update(delta if not delta < 0 else 0.0)
+        loss = self._loss.update(-min(delta, 0.0) if delta == delta else NAN)
+        rs = gain / (loss if loss != 0 else 1e-12)
+        self.value = 100 - (100 / (1 + rs))
+        return self.value
+
+class MACD(Indicator):
+    """MACD line, signal line and histogram, as in ``MACDStrategy``.
+
+    ``update`` returns ``(macd, signal, hist)``.
+    """
+    __slots__ = ("_fast", "_slow", "_signal", "value")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self._fast = EMA(span=fast); self._slow = EMA(span=slow); self._signal = EMA(span=signal)
+        self.value = (NAN, NAN, NAN)
+
+    def reset(self) -> None:
+        self._fast.reset(); self._slow.reset(); self._signal.reset()
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, x: float) -> Tuple[float, float, float]:
+        macd = self._fast.update(x) - self._slow.update(x)
+        sig = self._signal.update(macd)
+        self.value = (macd, sig, macd - sig)
+        return self.value
+
+class Bollinger(Indicator):
+    """Bollinger bands: ``update`` returns ``(mid, upper, lower)`` as in ``BollingerBands``."""
+    __slots__ = ("num_std", "_mid", "_std", "value")
+
+    def __init__(self, window: int = 20, num_std: float = 2.0, ddof: int = 0):
+        self.num_std = float(num_std)
+        self._mid = SMA(window); self._std = RollingStd(window, ddof=ddof)
+        self.value = (NAN, NAN, NAN)
+
+    def reset(self) -> None:
+        self._mid.reset(); self._std.reset()
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, x: float) -> Tuple[float, float, float]:
+        mid = self._mid.update(x)
+        std = self._std.update(x)
+        self.value = (mid, mid + self.num_std * std, mid - self.num_std * std)
+        return self.value
@@ -1,10 +1,10 @@
 from __future__ import annotations
 import pandas as pd
-import matplotlib.pyplot as plt
 from pathlib import Path
 from qbt.core.metrics import performance_from_nav, compute_drawdown
 
 def generate_report(nav: pd.Series, name: str, out_dir: str = "reports"):
+    import matplotlib.pyplot as plt   # deferred: the plotting stack is the slowest import in qbt
     Path(out_dir).mkdir(parents=True, exist_ok=True)
     nav_norm = nav / nav.iloc[0]
     perf = performance_from_nav(nav_norm, risk_free=0.0, periods_per_year=252)
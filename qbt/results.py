@@ -0,0 +1,118 @@
+"""Persistent store of finished backtests (NAV, fills and metrics).
+
+Results are keyed by a stable hash of the input data (see :func:`qbt.cache.fingerprint`),
+the strategy class, its parameters, the ``Broker`` settings and the starting cash. A
+repeated query is answered from memory or from one pickle file instead of re-running
+the engine; editing the source data changes its fingerprint, so stale results are never
+returned.
+
+Example
+-------
+>>> store = ResultStore(".qbt_results")
+>>> res = store.run(df, "AAPL", SmaCross, {"short_window": 10, "long_window": 30, "symbol": "AAPL"})
+>>> res.nav, res.fills, res.metrics
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Union
+import pandas as pd
+from .cache import fingerprint
+from .core.broker import Broker
+from .core.metrics import performance_from_nav
+
+FORMAT = 1   # bump when the engine's results change for the same inputs
+
+@dataclass
+class BacktestResult:
+    nav: pd.Series
+    fills: pd.DataFrame
+    metrics: Dict[str, float]
+    key: str = ""
+    meta: dict = field(default_factory=dict)
+
+def result_key(data: Union[pd.DataFrame, Mapping], strategy, params: Optional[dict] = None,
+               broker: Optional[Broker] = None, starting_cash: float = 100_000.0, **extra) -> str:
+    """Stable hash of one backtest's inputs.
+
+    ``data`` is a frame or a ``{symbol: frame}`` mapping; ``strategy`` a class or its name.
+    Extra keyword arguments (e.g. the engine mode) are folded into the key.
+    """
+    if isinstance(data, Mapping):
+        data_fp = [(str(sym), fingerprint(df)) for sym, df in sorted(data.items())]
+    else:
+        data_fp = fingerprint(data)
+    name = strategy if isinstance(strategy, str) else f"{strategy.__module__}.{strategy.__qualname__}"
+    broker = broker or Broker()
+    spec = {"format": FORMAT, "data": data_fp, "strategy": name, "params": params or {},
+            "broker": [float(broker.commission_bps), float(broker.slippage)],
+            "starting_cash": float(starting_cash), "extra": extra}
+    text = json.dumps(spec, sort_keys=True, default=str)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+def summarize(nav: pd.Series, fills: Optional[pd.DataFrame] = None, key: str = "", **meta) -> BacktestResult:
+    """Bundle a run's NAV and fills with ``performance_from_nav`` metrics on the normalized NAV."""
+    metrics = performance_from_nav(nav / nav.iloc[0], risk_free=0.0, periods_per_year=252) if len(nav) else {}
+    return BacktestResult(nav=nav, fills=fills if fills is not None else pd.DataFrame(),
+                          metrics=metrics, key=key, meta=meta)
+
+class ResultStore:
+    """Directory of pickled :class:`BacktestResult`s, one file per key, plus an in-process map."""
+    def __init__(self, root: Union[str, Path] = ".qbt_results"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._mem: Dict[str, BacktestResult] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.pkl"
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._mem or self._path(key).exists()
+
+    def get(self, key: str) -> Optional[BacktestResult]:
+        res = self._mem.get(key)
+        if res is None:
+            try:
+                with open(self._path(key), "rb") as fh:
+                    res = pickle.load(fh)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                self.misses += 1
+                return None
+            self._mem[key] = res
+        self.hits += 1
+        return res
+
+    def put(self, key: str, result: BacktestResult) -> BacktestResult:
+        result.key = key
+        self._mem[key] = result
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(result, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+        return result
+
+    def clear(self):
+        self._mem.clear()
+        for p in self.root.glob("*.pkl"):
+            p.unlink(missing_ok=True)
+
+    def run(self, data: pd.DataFrame, symbol: str, strategy_cls, params: Optional[dict] = None,
+            broker: Optional[Broker] = None, starting_cash: float = 100_000.0) -> BacktestResult:
+        """Memoized single-symbol ``BacktestEngine`` run of ``strategy_cls(data.copy(), params)``."""
+        from .core.engine import BacktestEngine
+        key = result_key(data, strategy_cls, params, broker, starting_cash, symbol=symbol)
+        res = self.get(key)
+        if res is not None:
+            return res
+        engine = BacktestEngine(data, symbol, strategy_cls(data.copy(), params), starting_cash=starting_cash,
+                                broker=broker, fast=True)
+        nav = engine.run()
+        return self.put(key, summarize(nav, engine.fills(), symbol=symbol))
@@ -1,17 +1,87 @@
 from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+def long_flat_targets(enter: pd.Series, exit: pd.Series, unit: int) -> pd.Series:
+    """Turn boolean entry/exit signals into a long/flat target position series.
+
+    Holds ``unit`` from an entry bar until the next exit bar, 0 otherwise. Bars with
+    neither signal keep the previous target, mirroring the ``pos_qty`` checks that the
+    long/flat strategies perform in ``on_bar``.
+    """
+    sig = np.full(len(enter), np.nan)
+    sig[exit.to_numpy(dtype=bool)] = 0
+    sig[enter.to_numpy(dtype=bool)] = unit
+    return pd.Series(sig, index=enter.index).ffill().fillna(0).astype("int64")
 
 class Strategy:
     """Base class for strategies.
 
     Child classes should override 'on_bar'.
     """
+    #: Bars of history ``prepare`` needs before the first bar it fills in; used when
+    #: streaming. None means the indicators need the full history (e.g. EWM).
+    warmup: int | None = 0
+
     def __init__(self, params: dict | None = None):
         self.params = params or {}
 
+    def prepare(self, data: pd.DataFrame) -> None:
+        """Compute indicator columns on 'data' in place (no-op by default)."""
+
+    def indicators(self) -> dict | None:
+        """Optional: online calculators from ``qbt.indicators`` for streaming runs.
+
+        Maps an output column (or a tuple of columns for multi-output calculators, with
+        None to drop an output) to a calculator fed with 'close'. Must produce the same
+        columns as 'prepare'.
+        """
+        return None
+
+    def update_indicators(self, data: pd.DataFrame) -> None:
+        """Advance the online calculators over 'data' and write their columns in place."""
+        if getattr(self, "_online", None) is None:
+            self._online = self.indicators() or {}
+        close = data['close'].to_numpy(dtype=float)
+        for cols, ind in self._online.items():
+            cols = cols if isinstance(cols, tuple) else (cols,)
+            out = np.asarray(ind.update_many(close)).reshape(len(data), len(cols))
+            for j, col in enumerate(cols):
+                if col is not None:
+                    data[col] = out[:, j]
+
+    def on_chunk(self, data: pd.DataFrame) -> None:
+        """Streaming hook, called by ``StreamingBacktestEngine`` before the bars of each chunk.
+
+        Strategies with online 'indicators' update them over the chunk, which becomes
+        'self.data' for 'on_bar'. Otherwise the last 'warmup' bars of the previous window
+        are prepended so rolling indicators carry across chunk boundaries, and 'prepare'
+        runs on that window.
+        """
+        if getattr(self, "_online", None) or self.indicators() is not None:
+            self.update_indicators(data)
+            self.data = data
+            return
+        if self.warmup is None:
+            raise NotImplementedError(f"{type(self).__name__} needs the full history and cannot stream")
+        tail = getattr(self, "_tail", None)
+        window = data if tail is None or len(tail) == 0 else pd.concat([tail, data])
+        self.prepare(window)
+        self.data = window
+        self._tail = window.iloc[len(window) - self.warmup:] if self.warmup else window.iloc[:0]
+
     def on_bar(self, ctx) -> None:
         """Called each bar. Access data via 'ctx.data', portfolio via 'ctx.portfolio'.
 
         Use 'ctx.submit_order(symbol, qty, side)' to queue a market order that will be
-        executed on the NEXT bar open.
+        executed on the NEXT bar open. ``BacktestEngine`` also takes ``order_type="limit"``,
+        ``"stop"`` or ``"stop_limit"`` orders (see :mod:`qbt.core.orderbook`).
+        """
+        raise NotImplementedError
+
+    def target_positions(self) -> pd.Series:
+        """Optional: the position to hold after each bar, for ``BacktestEngineVectorized``.
+
+        Must reproduce what 'on_bar' would trade so both engines agree.
         """
         raise NotImplementedError
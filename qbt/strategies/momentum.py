@@ -1,6 +1,8 @@
 from __future__ import annotations
 import pandas as pd
-from .base import Strategy
+from ..cache import cached, fingerprint
+from ..indicators import ROC
+from .base import Strategy, long_flat_targets
 
 class Momentum(Strategy):
     """Momentum strategy (single symbol, full long / flat by fixed unit).
@@ -17,7 +19,7 @@ class Momentum(Strategy):
         symbol     : str, required
         unit       : int, default 100    (trade in fixed lots)
     """
-    def __init__(self, data: pd.DataFrame, params: dict | None = None):
+    def __init__(self, data: pd.DataFrame | None, params: dict | None = None):
         super().__init__(params=params)
         self.data = data
         self.lookback = int(self.params.get("lookback", 60))
@@ -26,9 +28,18 @@ class Momentum(Strategy):
         if not self.symbol:
             raise ValueError("symbol is required")
         self.unit = int(self.params.get("unit", 100))
+        self.warmup = self.lookback
 
         # Precompute momentum as percentage change over lookback
-        self.data['mom'] = self.data['close'].pct_change(self.lookback)
+        if data is not None:
+            self.prepare(self.data)
+
+    def prepare(self, data: pd.DataFrame) -> None:
+        close = data['close']; fp = fingerprint(close)
+        data['mom'] = cached('roc', fp, lambda: close.pct_change(self.lookback), periods=self.lookback)
+
+    def indicators(self) -> dict:
+        return {'mom': ROC(self.lookback)}
 
     def on_bar(self, ctx):
         ts = ctx.now
@@ -44,3 +55,7 @@ class Momentum(Strategy):
         # Exit to flat when momentum is below/equal threshold
         if mom <= self.threshold and pos_qty > 0:
             ctx.submit_order(self.symbol, qty=pos_qty, side='sell')
+
+    def target_positions(self) -> pd.Series:
+        mom = self.data['mom']
+        return long_flat_targets(mom > self.threshold, mom <= self.threshold, self.unit)
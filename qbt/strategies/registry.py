@@ -0,0 +1,36 @@
+"""Name -> strategy class registry with import-on-demand.
+
+The CLI (and anything else that picks strategies by name) looks classes up here so
+that only the chosen strategy's module, and what it imports, gets loaded.
+
+Example
+-------
+>>> cls = load_strategy("sma")                          # imports qbt.strategies.sma_cross only
+>>> register_strategy("mine", "my_pkg.strats:MyStrategy")
+"""
+from __future__ import annotations
+import importlib
+from typing import Dict
+
+STRATEGIES: Dict[str, str] = {
+    "sma": "qbt.strategies.sma_cross:SmaCross",
+    "momentum": "qbt.strategies.momentum:Momentum",
+    "topn_momentum": "qbt.strategies.topn_momentum:TopNMomentum",
+    "bbands": "qbt.strategies.ta_bbands:BollingerBands",
+    "rsi": "qbt.strategies.ta_rsi:RSIStrategy",
+    "macd": "qbt.strategies.ta_macd:MACDStrategy",
+}
+
+def register_strategy(name: str, target: str):
+    """Make ``"package.module:ClassName"`` available as ``name``."""
+    if ":" not in target:
+        raise ValueError(f"Expected 'module:Class', got: {target}")
+    STRATEGIES[name] = target
+
+def load_strategy(name: str):
+    """Import and return the strategy class registered as ``name``."""
+    try:
+        module, _, attr = STRATEGIES[name].partition(":")
+    except KeyError:
+        raise ValueError(f"Unknown strategy: {name}. Choose from {sorted(STRATEGIES)}") from None
+    return getattr(importlib.import_module(module), attr)
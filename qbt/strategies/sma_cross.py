@@ -1,6 +1,8 @@
 from __future__ import annotations
 import pandas as pd
-from .base import Strategy
+from ..cache import cached, fingerprint
+from ..indicators import SMA
+from .base import Strategy, long_flat_targets
 
 class SmaCross(Strategy):
     """Simple moving-average crossover strategy (single symbol, full long / flat).
@@ -19,7 +21,7 @@ class SmaCross(Strategy):
         symbol       : str, required
         unit         : int, default 100  (trade in fixed lots)
     """
-    def __init__(self, data: pd.DataFrame, params: dict | None = None):
+    def __init__(self, data: pd.DataFrame | None, params: dict | None = None):
         super().__init__(params=params)
         self.data = data
         self.short = int(self.params.get("short_window", 10))
@@ -30,14 +32,23 @@ class SmaCross(Strategy):
         if not self.symbol:
             raise ValueError("symbol is required")
         self.unit = int(self.params.get("unit", 100))
+        self.warmup = self.long - 1
 
         # Precompute moving averages to make on_bar trivial
-        self.data['sma_short'] = self.data['close'].rolling(self.short).mean()
-        self.data['sma_long']  = self.data['close'].rolling(self.long).mean()
+        if data is not None:
+            self.prepare(self.data)
 
         # We keep track of previous signal to detect a cross
         self.prev_above = None
 
+    def prepare(self, data: pd.DataFrame) -> None:
+        close = data['close']; fp = fingerprint(close)
+        data['sma_short'] = cached('sma', fp, lambda: close.rolling(self.short).mean(), window=self.short)
+        data['sma_long']  = cached('sma', fp, lambda: close.rolling(self.long).mean(), window=self.long)
+
+    def indicators(self) -> dict:
+        return {'sma_short': SMA(self.short), 'sma_long': SMA(self.long)}
+
     def on_bar(self, ctx):
         ts = ctx.now
         row = self.data.loc[ts]
@@ -64,3 +75,13 @@ class SmaCross(Strategy):
                 ctx.submit_order(self.symbol, qty=pos_qty, side='sell')
 
         self.prev_above = above
+
+    def target_positions(self) -> pd.Series:
+        # Crosses are measured between consecutive bars where both MAs are defined.
+        valid = self.data['sma_short'].notna() & self.data['sma_long'].notna()
+        above = (self.data['sma_short'] > self.data['sma_long'])[valid]
+        prev = above.shift(1, fill_value=False)
+        prev.iloc[:1] = above.iloc[:1]  # first defined bar only seeds prev_above
+        enter = (above & ~prev).reindex(self.data.index, fill_value=False)
+        exit = (prev & ~above).reindex(self.data.index, fill_value=False)
+        return long_flat_targets(enter, exit, self.unit)
@@ -1,17 +1,25 @@
 from __future__ import annotations
 import pandas as pd
-from .base import Strategy
+from ..cache import cached, fingerprint
+from ..indicators import Bollinger
+from .base import Strategy, long_flat_targets
 class BollingerBands(Strategy):
-    def __init__(self, data: pd.DataFrame, params: dict | None = None):
+    def __init__(self, data: pd.DataFrame | None, params: dict | None = None):
         super().__init__(params=params)
         self.data = data
         self.symbol = self.params.get("symbol"); assert self.symbol
         self.unit = int(self.params.get("unit", 100))
         self.lookback = int(self.params.get("lookback", 20))
         self.num_std = float(self.params.get("num_std", 2.0))
-        mid = self.data['close'].rolling(self.lookback).mean()
-        std = self.data['close'].rolling(self.lookback).std(ddof=0)
-        self.data['bb_mid'] = mid; self.data['bb_up'] = mid + self.num_std * std; self.data['bb_lo'] = mid - self.num_std * std
+        self.warmup = self.lookback - 1
+        if data is not None: self.prepare(self.data)
+    def prepare(self, data: pd.DataFrame) -> None:
+        close = data['close']; fp = fingerprint(close)
+        mid = cached('sma', fp, lambda: close.rolling(self.lookback).mean(), window=self.lookback)
+        std = cached('std', fp, lambda: close.rolling(self.lookback).std(ddof=0), window=self.lookback, ddof=0)
+        data['bb_mid'] = mid; data['bb_up'] = mid + self.num_std * std; data['bb_lo'] = mid - self.num_std * std
+    def indicators(self) -> dict:
+        return {('bb_mid', 'bb_up', 'bb_lo'): Bollinger(self.lookback, self.num_std)}
     def on_bar(self, ctx):
         ts = ctx.now; row = self.data.loc[ts]
         if row[['bb_up','bb_lo']].isna().any(): return
@@ -20,3 +28,6 @@ class BollingerBands(Strategy):
             ctx.submit_order(self.symbol, qty=self.unit, side='buy')
         elif row['close'] < row['bb_lo'] and pos_qty > 0:
             ctx.submit_order(self.symbol, qty=pos_qty, side='sell')
+    def target_positions(self) -> pd.Series:
+        close = self.data['close']
+        return long_flat_targets(close > self.data['bb_up'], close < self.data['bb_lo'], self.unit)
@@ -1,16 +1,27 @@
 from __future__ import annotations
 import pandas as pd
-from .base import Strategy
-def _ema(series: pd.Series, span: int) -> pd.Series: return series.ewm(span=span, adjust=False).mean()
+from ..cache import cached, fingerprint
+from ..indicators import MACD
+from .base import Strategy, long_flat_targets
+def _ema(series: pd.Series, span: int, fp: str | None = None) -> pd.Series:
+    return cached('ema', fp or fingerprint(series), lambda: series.ewm(span=span, adjust=False).mean(), span=span)
 class MACDStrategy(Strategy):
-    def __init__(self, data: pd.DataFrame, params: dict | None = None):
+    def __init__(self, data: pd.DataFrame | None, params: dict | None = None):
         super().__init__(params=params); self.data = data
         self.symbol = self.params.get("symbol"); assert self.symbol
         self.unit = int(self.params.get("unit", 100))
         self.fast = int(self.params.get("fast", 12)); self.slow = int(self.params.get("slow", 26)); self.signal = int(self.params.get("signal", 9))
-        macd = _ema(self.data['close'], self.fast) - _ema(self.data['close'], self.slow)
-        sig = macd.ewm(span=self.signal, adjust=False).mean()
-        self.data['macd']=macd; self.data['signal']=sig; self.prev_diff=None
+        self.warmup = None  # EWM state depends on the full history; streams via indicators()
+        if data is not None: self.prepare(self.data)
+        self.prev_diff=None
+    def prepare(self, data: pd.DataFrame) -> None:
+        close = data['close']; fp = fingerprint(close)
+        macd = _ema(close, self.fast, fp) - _ema(close, self.slow, fp)
+        sig = cached('macd_signal', fp, lambda: macd.ewm(span=self.signal, adjust=False).mean(),
+                     fast=self.fast, slow=self.slow, signal=self.signal)
+        data['macd']=macd; data['signal']=sig
+    def indicators(self) -> dict:
+        return {('macd', 'signal', None): MACD(self.fast, self.slow, self.signal)}
     def on_bar(self, ctx):
         ts = ctx.now; row = self.data.loc[ts]
         if row[['macd','signal']].isna().any(): return
@@ -19,3 +30,10 @@ class MACDStrategy(Strategy):
             if self.prev_diff <= 0 and diff > 0 and pos_qty <= 0: ctx.submit_order(self.symbol, qty=self.unit, side='buy')
             if self.prev_diff >= 0 and diff < 0 and pos_qty > 0: ctx.submit_order(self.symbol, qty=pos_qty, side='sell')
         self.prev_diff = diff
+    def target_positions(self) -> pd.Series:
+        valid = self.data['macd'].notna() & self.data['signal'].notna()
+        diff = (self.data['macd'] - self.data['signal'])[valid]
+        prev = diff.shift(1)  # NaN on the first valid bar, like prev_diff=None
+        enter = ((prev <= 0) & (diff > 0)).reindex(self.data.index, fill_value=False)
+        exit = ((prev >= 0) & (diff < 0)).reindex(self.data.index, fill_value=False)
+        return long_flat_targets(enter, exit, self.unit)
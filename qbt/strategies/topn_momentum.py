@@ -1,46 +1,95 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 from typing import Dict
+from ..core.universe import AlignedUniverse
 from .base import Strategy
 
+def top_k_mask(scores: np.ndarray, k: int) -> np.ndarray:
+    """Boolean mask of the ``k`` highest finite-or-inf, non-NaN scores.
+
+    Uses ``argpartition``-style selection (O(n)); ties at the cut-off go to the earliest
+    columns, as a stable descending sort would pick them.
+    """
+    valid = ~np.isnan(scores)
+    k = min(k, int(valid.sum()))
+    mask = np.zeros(scores.shape, dtype=bool)
+    if k <= 0:
+        return mask
+    s = np.where(valid, scores, -np.inf)
+    kth = np.partition(s, len(s) - k)[len(s) - k]
+    above = s > kth
+    ties = np.flatnonzero(valid & (s == kth))[:k - int(above.sum())]
+    mask[above] = True
+    mask[ties] = True
+    return mask
+
+def momentum_frame(data_map: Dict[str, pd.DataFrame], lookback: int) -> pd.DataFrame:
+    """(time x symbol) ``close.pct_change(lookback)``, each over its symbol's own bars.
+
+    A dense :class:`~qbt.core.universe.AlignedUniverse` is computed in one array pass.
+    """
+    def pct(close: np.ndarray) -> np.ndarray:
+        out = np.full(close.shape, np.nan)
+        if lookback < len(close):
+            out[lookback:] = close[lookback:] / close[:-lookback] - 1
+        return out
+    if isinstance(data_map, AlignedUniverse) and data_map.dense:
+        return pd.DataFrame(pct(data_map.field("close")), index=data_map.index, columns=data_map.symbols)
+    frames = list(data_map.values())
+    index = frames[0].index
+    if all(df.index.equals(index) for df in frames[1:]):
+        values = np.column_stack([pct(df["close"].to_numpy(dtype=float)) for df in frames])
+        return pd.DataFrame(values, index=index, columns=list(data_map))
+    return pd.DataFrame({sym: pd.Series(pct(df["close"].to_numpy(dtype=float)), index=df.index)
+                         for sym, df in data_map.items()})
+
 class TopNMomentum(Strategy):
+    """Equal-weight the ``top_n`` symbols by ``lookback`` momentum, rebalancing every bar.
+
+    Momentum is held as a (time x symbol) array; each bar ranks one row with a top-k
+    selection and turns the target weights into integer order deltas in one array step.
+    """
     def __init__(self, data_map: Dict[str, pd.DataFrame], params: dict | None = None):
         super().__init__(params=params)
-        self.data_map = {k: v.copy() for k, v in data_map.items()}
+        self.data_map = data_map
         self.lookback = int(self.params.get("lookback", 60))
         self.top_n = int(self.params.get("top_n", 2))
         self.unit_cap = int(self.params.get("unit_cap", 0))
-        for sym, df in self.data_map.items():
-            self.data_map[sym]["mom"] = df["close"].pct_change(self.lookback)
+        self.mom = momentum_frame(data_map, self.lookback)
+        self._aligned = None   # (engine index, symbols, values) cache
+
+    def _mom_rows(self, ctx) -> np.ndarray:
+        key = (ctx.index, ctx.symbols)
+        if self._aligned is None or self._aligned[0] is not key[0] or self._aligned[1] is not key[1]:
+            values = self.mom.reindex(index=ctx.index, columns=ctx.symbols).to_numpy(dtype=float)
+            self._aligned = (ctx.index, ctx.symbols, values)
+        return self._aligned[2]
 
     def on_bar(self, ctx):
-        ts = ctx.now
-        moms = {}
-        for sym in ctx.symbols:
-            mom = self.data_map[sym].loc[ts, "mom"]
-            moms[sym] = mom if pd.notna(mom) else float("-inf")
-        ranked = sorted(moms.items(), key=lambda kv: kv[1], reverse=True)
-        top = [sym for sym, _ in ranked[:self.top_n] if moms[sym] != float("-inf")]
-        targets = {sym: (1.0/len(top)) if (len(top)>0 and sym in top) else 0.0 for sym in ctx.symbols}
-        equity = ctx.portfolio.cash
-        prices = {}
-        for sym in ctx.symbols:
-            px = ctx.data[sym]["close"]
-            prices[sym] = px
-            if sym in ctx.portfolio.positions:
-                equity += ctx.portfolio.positions[sym].qty * px
-        for sym in ctx.symbols:
-            px = prices[sym]
-            current_qty = ctx.portfolio.positions.get(sym, None).qty if sym in ctx.portfolio.positions else 0
-            target_value = targets[sym] * equity
-            target_qty = int(target_value // max(px, 1e-8))
-            delta = target_qty - current_qty
-            if self.unit_cap > 0:
-                if delta > 0:
-                    delta = min(delta, self.unit_cap)
-                else:
-                    delta = max(delta, -self.unit_cap)
-            if delta > 0:
-                ctx.submit_order(sym, qty=delta, side="buy")
-            elif delta < 0:
-                ctx.submit_order(sym, qty=abs(delta), side="sell")
+        pf = ctx.portfolio
+        if ctx.i is not None:   # BacktestEngineMulti: arrays in ctx.symbols order
+            mom = self._mom_rows(ctx)[ctx.i]
+            prices, held = ctx.prices, pf.qty
+            equity = pf.equity(prices)
+        else:                   # plain ContextMulti: look the row up by timestamp
+            mom = self.mom.loc[ctx.now].reindex(ctx.symbols).to_numpy(dtype=float)
+            prices = np.array([ctx.data[sym]["close"] for sym in ctx.symbols], dtype=float)
+            held = np.array([pf.positions[s].qty if s in pf.positions else 0 for s in ctx.symbols], dtype=np.int64)
+            equity = pf.equity(dict(zip(ctx.symbols, prices)))
+        top = top_k_mask(mom, self.top_n)
+        n_top = int(top.sum())
+        weights = top / n_top if n_top else np.zeros(len(top))
+        prices = np.where(np.isnan(prices), np.inf, np.maximum(prices, 1e-8))   # unpriced symbols get no position
+        target_qty = np.floor_divide(weights * equity, prices).astype(np.int64)
+        delta = target_qty - held
+        if self.unit_cap > 0:
+            delta = np.clip(delta, -self.unit_cap, self.unit_cap)
+        if ctx.submit_orders is not None:
+            ctx.submit_orders(delta)
+            return
+        for sym, d in zip(ctx.symbols, delta.tolist()):
+            if d > 0:
+                ctx.submit_order(sym, qty=d, side="buy")
+            elif d < 0:
+                ctx.submit_order(sym, qty=-d, side="sell")
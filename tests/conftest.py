@@ -0,0 +1,18 @@
+import pytest
+
+from qbt.bench import synthetic_bars
+
+@pytest.fixture
+def daily_bars():
+    """``daily_bars(n=400, seed=11)``: business-day OHLCV frame shared by the engine tests."""
+    def make(n: int = 400, seed: int = 11):
+        return synthetic_bars(n, seed=seed, freq="B", start="2018-01-01", drift=0.0003, vol=0.01,
+                              spread=0.002, volume=(1_000, 10_000))
+    return make
+
+@pytest.fixture
+def minute_bars():
+    """``minute_bars(n=600, seed=123, start=...)``: one-minute OHLCV frame for the event-driven tests."""
+    def make(n: int = 600, seed: int = 123, start: str = "2020-01-01 09:30"):
+        return synthetic_bars(n, seed=seed, start=start, drift=0.00005, vol=0.001, volume=(50, 200))
+    return make
@@ -0,0 +1,42 @@
+import json
+
+import pandas as pd
+import pytest
+
+from qbt import bench
+from qbt.bench import append_history, compare, run_benchmarks, synthetic_bars, synthetic_universe
+
+def test_synthetic_data_is_reproducible():
+    a, b = synthetic_bars(500, seed=3), synthetic_bars(500, seed=3)
+    pd.testing.assert_frame_equal(a, b)
+    assert (a["high"] >= a[["open", "close"]].max(axis=1)).all()
+    uni = synthetic_universe(4, 100, freq="B", start="2020-01-01", vol=0.01)
+    assert list(uni) == ["S0000", "S0001", "S0002", "S0003"]
+    assert all(df.index.equals(uni["S0000"].index) for df in uni.values())
+
+def test_run_benchmarks_records_stages(tmp_path):
+    rec = run_benchmarks(bars=300, symbols=3, stages=["loader", "engine", "event_engine", "metrics"], repeat=1)
+    assert set(rec["stages"]) == {"loader", "engine", "event_engine", "metrics"}
+    assert rec["stages"]["event_engine"]["items"] == 900
+    assert all(r["seconds"] > 0 for r in rec["stages"].values())
+    append_history(rec, tmp_path / "h.json")
+    history = append_history(rec, tmp_path / "h.json")
+    assert len(json.loads((tmp_path / "h.json").read_text())) == len(history) == 2
+    with pytest.raises(ValueError):
+        run_benchmarks(bars=10, symbols=1, stages=["nope"])
+
+def test_compare_flags_slowdowns():
+    base = {"stages": {"engine": {"us_per_item": 10.0}, "metrics": {"us_per_item": 1.0}}}
+    cur = {"stages": {"engine": {"us_per_item": 10.5}, "metrics": {"us_per_item": 1.5}, "report": {"us_per_item": 9.0}}}
+    rows = {r["stage"]: r for r in compare(cur, base, threshold=0.1)}
+    assert set(rows) == {"engine", "metrics"}
+    assert not rows["engine"]["regressed"] and rows["metrics"]["regressed"]
+
+def test_cli_exit_code_on_regression(tmp_path, monkeypatch):
+    baseline = tmp_path / "base.json"
+    args = ["--bars", "200", "--symbols", "2", "--stages", "metrics", "--repeat", "1", "--history", ""]
+    assert bench.main(args + ["--save_baseline", str(baseline)]) == 0
+    rec = json.loads(baseline.read_text())
+    rec["stages"]["metrics"]["us_per_item"] /= 100   # pretend the baseline was much faster
+    baseline.write_text(json.dumps(rec))
+    assert bench.main(args + ["--baseline", str(baseline)]) == 1
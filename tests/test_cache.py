@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qbt.cache import IndicatorCache, cached, fingerprint, get_cache, set_cache
+from qbt.core.sweep import sweep
+from qbt.strategies.sma_cross import SmaCross
+
+@pytest.fixture
+def cache():
+    fresh = IndicatorCache()
+    previous = set_cache(fresh)
+    yield fresh
+    set_cache(previous)
+
+def test_fingerprint_tracks_values_index_and_name(daily_bars):
+    s = daily_bars(n=50)["close"]
+    assert fingerprint(s) == fingerprint(s.copy())
+    changed = s.copy(); changed.iloc[10] += 1e-9
+    assert fingerprint(changed) != fingerprint(s)
+    assert fingerprint(s.shift(1, freq="D")) != fingerprint(s)
+    assert fingerprint(s.rename("open")) != fingerprint(s)
+
+def test_lru_eviction_by_entries_and_bytes():
+    c = IndicatorCache(max_entries=2)
+    for k in "abc":
+        c.get_or_compute(k, "fp", lambda: np.zeros(10))
+    c.get_or_compute("b", "fp", lambda: np.zeros(10))    # hit: b becomes most recent
+    c.get_or_compute("d", "fp", lambda: np.zeros(10))    # evicts c
+    assert c.key("b", "fp") in c and c.key("c", "fp") not in c
+    s = c.stats()
+    assert (s.hits, s.misses, s.evictions, s.entries) == (1, 4, 2, 2)
+    assert s.hit_rate == pytest.approx(0.2)
+
+    small = IndicatorCache(max_bytes=1000)
+    small.get_or_compute("x", "fp", lambda: np.zeros(100))   # 800 bytes
+    small.get_or_compute("y", "fp", lambda: np.zeros(100))
+    small.get_or_compute("z", "fp", lambda: np.zeros(1000))  # larger than the budget: not kept
+    assert len(small) == 1 and small.stats().bytes == 800
+
+def test_disk_tier_survives_new_instance(tmp_path, daily_bars):
+    s = daily_bars(n=80)["close"]
+    first = IndicatorCache(disk_dir=tmp_path)
+    a = first.get_or_compute("sma", s, lambda: s.rolling(5).mean(), {"window": 5})
+    second = IndicatorCache(disk_dir=tmp_path)
+    b = second.get_or_compute("sma", s, lambda: pytest.fail("recomputed"), {"window": 5})
+    pd.testing.assert_series_equal(a, b)
+    assert second.stats().disk_hits == 1
+    capped = IndicatorCache(disk_dir=tmp_path / "capped", disk_max_bytes=3000)
+    for w in range(2, 12):
+        capped.get_or_compute("sma", s, lambda w=w: s.rolling(w).mean().to_numpy(), {"window": w})
+    assert sum(p.stat().st_size for p in (tmp_path / "capped").glob("*.pkl")) <= 3000
+
+def test_strategies_and_sweep_share_indicators(cache, daily_bars):
+    data = daily_bars(n=300, seed=2)
+    SmaCross(data.copy(), {"short_window": 5, "long_window": 20, "symbol": "M"})
+    assert cache.stats().misses == 2
+    again = data.copy()
+    SmaCross(again, {"short_window": 5, "long_window": 20, "symbol": "M"})
+    assert cache.stats().hits == 2
+    pd.testing.assert_series_equal(again["sma_long"], data["close"].rolling(20).mean(), check_names=False)
+    sweep(data, "sma", {"short_window": [5, 10], "long_window": [20]})
+    s = cache.stats()
+    assert (s.hits, s.misses) == (4, 3)   # only the 10-bar SMA is new
+
+def test_disabled_cache_computes(cache):
+    set_cache(None)
+    assert get_cache() is None
+    assert cached("x", "fp", lambda: 41) + 1 == 42
+    assert cache.stats().misses == 0
+
+def test_strategies_fingerprint_close_once(cache, daily_bars, monkeypatch):
+    import qbt.cache
+    from qbt.strategies.ta_macd import MACDStrategy
+    hashed = []
+    hash_array = qbt.cache._hash_array
+    monkeypatch.setattr(qbt.cache, "_hash_array", lambda h, a: (hashed.append(len(a)), hash_array(h, a)))
+    data = daily_bars(n=200)
+    MACDStrategy(data.copy(), {"symbol": "M"})
+    assert len(hashed) == 2 and cache.stats().misses == 3   # index + values; fast, slow and signal EWMs
+    again = data.copy()
+    MACDStrategy(again, {"symbol": "M"})
+    assert cache.stats().hits == 3
+    macd = data["close"].ewm(span=12, adjust=False).mean() - data["close"].ewm(span=26, adjust=False).mean()
+    pd.testing.assert_series_equal(again["signal"], macd.ewm(span=9, adjust=False).mean(), check_names=False)
+
+def test_disk_trim_skips_files_removed_meanwhile(tmp_path, monkeypatch):
+    c = IndicatorCache(disk_dir=tmp_path, disk_max_bytes=2000)
+    glob = type(tmp_path).glob
+    # Another process deletes a file between the directory scan and its stat().
+    monkeypatch.setattr(type(tmp_path), "glob", lambda self, pattern: [*glob(self, pattern), self / "gone.pkl"])
+    for k in range(5):
+        c.get_or_compute("x", str(k), lambda: np.zeros(100))
+    monkeypatch.undo()
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.pkl")) <= 2000
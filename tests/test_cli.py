@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from qbt.bench import check_budgets
+from qbt.strategies.registry import STRATEGIES, load_strategy, register_strategy
+
+ROOT = str(Path(__file__).resolve().parent.parent)
+
+def _python(code, cwd):
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    return subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, check=True,
+                          capture_output=True, text=True).stdout
+
+def test_cli_import_is_light_and_no_report_skips_plotting(tmp_path):
+    out = _python("import sys, qbt.cli; print(sorted(m for m in ('pandas', 'matplotlib', 'qbt.core.engine') if m in sys.modules))", tmp_path)
+    assert out.strip() == "[]"
+    out = _python("import sys; from qbt import cli; cli.main(['--no_report']); "
+                  "print('matplotlib' in sys.modules, 'qbt.strategies.momentum' in sys.modules)", tmp_path)
+    assert "- sharpe:" in out and out.strip().endswith("False False")
+    assert not (tmp_path / "reports").exists()
+
+def test_registry_loads_by_name(monkeypatch):
+    from qbt.strategies.sma_cross import SmaCross
+    assert load_strategy("sma") is SmaCross
+    with pytest.raises(ValueError):
+        load_strategy("nope")
+    monkeypatch.setitem(STRATEGIES, "sma_alias", STRATEGIES["sma"])
+    assert load_strategy("sma_alias") is SmaCross
+    with pytest.raises(ValueError):
+        register_strategy("bad", "qbt.strategies.sma_cross.SmaCross")
+
+def test_budget_check():
+    rec = {"stages": {"cli_startup": {"seconds": 0.2}, "engine": {"seconds": 3.0}}}
+    rows = check_budgets(rec, {"cli_startup": 0.1, "engine": 5.0, "report": 1.0})
+    assert [(r["stage"], r["over"]) for r in rows] == [("cli_startup", True), ("engine", False)]
@@ -0,0 +1,41 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from qbt.core.engine import BacktestEngine, BarView
+from qbt.core.broker import Broker
+from qbt.strategies.sma_cross import SmaCross
+from qbt.strategies.momentum import Momentum
+from qbt.strategies.ta_bbands import BollingerBands
+from qbt.strategies.ta_rsi import RSIStrategy
+from qbt.strategies.ta_macd import MACDStrategy
+
+STRATEGIES = [
+    (SmaCross, {"short_window": 5, "long_window": 20}),
+    (Momentum, {"lookback": 20}),
+    (BollingerBands, {"lookback": 20, "num_std": 1.0}),
+    (RSIStrategy, {"lookback": 14, "lower": 40, "upper": 60}),
+    (MACDStrategy, {"fast": 12, "slow": 26, "signal": 9}),
+]
+
+def _run(cls, params, fast, data):
+    data["symbol"] = "MOCK"
+    strat = cls(data, params={**params, "symbol": "MOCK", "unit": 100})
+    engine = BacktestEngine(data=data, symbol="MOCK", strategy=strat,
+                            broker=Broker(commission_bps=0.0005, slippage=0.01), fast=fast)
+    return engine.run(), engine.portfolio
+
+@pytest.mark.parametrize("cls,params", STRATEGIES)
+def test_fast_mode_matches_default(cls, params, daily_bars):
+    nav_slow, pf_slow = _run(cls, params, False, daily_bars())
+    nav_fast, pf_fast = _run(cls, params, True, daily_bars())
+    pd.testing.assert_series_equal(nav_slow, nav_fast, check_exact=True)
+    assert pf_slow.cash == pf_fast.cash
+    assert pf_slow.position.qty == pf_fast.position.qty
+
+def test_bar_view_row_api():
+    cols = {"open": np.array([1.0, 2.0]), "close": np.array([1.5, 2.5])}
+    bar = BarView(cols, 1, name=pd.Timestamp("2020-01-02"))
+    assert bar["close"] == 2.5 and bar.open == 2.0 and bar.get("volume") is None
+    assert list(bar[["open", "close"]]) == [2.0, 2.5]
+    assert "close" in bar and bar.name == pd.Timestamp("2020-01-02")
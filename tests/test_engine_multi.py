@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from qbt.core.broker import Broker
+from qbt.core.engine_multi import BacktestEngineMulti
+from qbt.core.portfolio_multi import PortfolioMulti
+from qbt.strategies.topn_momentum import TopNMomentum, top_k_mask
+
+def test_top_k_mask_matches_stable_sort():
+    rng = np.random.default_rng(5)
+    for _ in range(50):
+        scores = rng.integers(0, 6, size=12).astype(float)   # plenty of ties
+        scores[rng.random(12) < 0.2] = np.nan
+        k = int(rng.integers(0, 15))
+        order = sorted((i for i in range(12) if not np.isnan(scores[i])), key=lambda i: -scores[i])
+        expected = np.zeros(12, dtype=bool)
+        expected[order[:k]] = True
+        np.testing.assert_array_equal(top_k_mask(scores, k), expected)
+
+def test_vector_fills_match_scalar_fills():
+    syms = ["A", "B", "C", "D"]
+    vec, ref = PortfolioMulti(10_000.0, syms), PortfolioMulti(10_000.0, syms)
+    rng = np.random.default_rng(1)
+    for _ in range(30):
+        qty = rng.integers(-5, 8, size=4)
+        qty = np.where(vec.qty + qty < 0, 0, qty)   # long-only
+        cols = np.flatnonzero(qty)
+        px = rng.uniform(10, 20, size=len(cols))
+        fee = px * np.abs(qty[cols]) * 0.001
+        vec.on_fills(None, cols, px, qty[cols], fee)
+        for j, p, q, f in zip(cols, px, qty[cols], fee):
+            ref.on_fill(None, syms[j], p, abs(int(q)), "buy" if q > 0 else "sell", f)
+    np.testing.assert_array_equal(vec.qty, ref.qty)
+    np.testing.assert_allclose(vec.basis, ref.basis, rtol=1e-12)
+    assert abs(vec.cash - ref.cash) < 1e-9
+    assert list(vec.positions) == list(ref.positions) and vec.positions["A"].qty == ref.positions["A"].qty
+
+class _DictTopN:
+    """Per-symbol reference of TopNMomentum using only the dict-style context API."""
+    def __init__(self, data_map, lookback, top_n):
+        self.mom = {s: df["close"].pct_change(lookback) for s, df in data_map.items()}
+        self.top_n = top_n
+    def on_bar(self, ctx):
+        moms = {s: self.mom[s].loc[ctx.now] for s in ctx.symbols}
+        ranked = sorted((s for s in moms if pd.notna(moms[s])), key=lambda s: -moms[s])[:self.top_n]
+        ctx.submit_target_weights({s: 1.0 for s in ranked} if ranked else {s: 0.0 for s in ctx.symbols})
+
+def test_topn_rebalance_matches_dict_reference(daily_bars):
+    data_map = {f"S{k}": daily_bars(300, seed=k) for k in range(8)}
+    broker = Broker(0.0005, 0.01)
+    nav = BacktestEngineMulti(data_map, TopNMomentum(data_map, {"lookback": 20, "top_n": 3}), broker=broker).run()
+    ref = BacktestEngineMulti(data_map, _DictTopN(data_map, 20, 3), broker=broker).run()
+    np.testing.assert_allclose(nav.to_numpy(), ref.to_numpy(), rtol=1e-12)
+    assert nav.iloc[-1] != nav.iloc[0]
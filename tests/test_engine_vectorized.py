@@ -0,0 +1,43 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from qbt.core.engine import BacktestEngine
+from qbt.core.engine_vectorized import BacktestEngineVectorized, simulate_targets
+from qbt.core.broker import Broker
+from qbt.strategies.sma_cross import SmaCross
+from qbt.strategies.momentum import Momentum
+from qbt.strategies.ta_bbands import BollingerBands
+from qbt.strategies.ta_rsi import RSIStrategy
+from qbt.strategies.ta_macd import MACDStrategy
+
+STRATEGIES = [
+    (SmaCross, {"short_window": 5, "long_window": 20}),
+    (Momentum, {"lookback": 20, "threshold": 0.01}),
+    (BollingerBands, {"lookback": 20, "num_std": 1.0}),
+    (RSIStrategy, {"lookback": 14, "lower": 40, "upper": 60}),
+    (MACDStrategy, {"fast": 12, "slow": 26, "signal": 9}),
+]
+
+@pytest.mark.parametrize("cls,params", STRATEGIES)
+def test_vectorized_matches_loop_engine(cls, params, daily_bars):
+    broker = Broker(commission_bps=0.0005, slippage=0.01)
+    data = daily_bars(seed=3)
+    loop = BacktestEngine(data, "MOCK", cls(data.copy(), {**params, "symbol": "MOCK", "unit": 100}), broker=broker)
+    nav_loop = loop.run()
+    vec = BacktestEngineVectorized(data, "MOCK", cls(data.copy(), {**params, "symbol": "MOCK", "unit": 100}), broker=broker)
+    nav_vec = vec.run()
+    pd.testing.assert_series_equal(nav_loop, nav_vec, check_exact=True, check_freq=False)
+    assert vec.result.cash[-1] == loop.portfolio.cash
+    assert vec.result.position[-1] == loop.portfolio.position.qty
+    assert len(vec.fills()) > 0
+
+def test_simulate_targets_batches_runs(daily_bars):
+    data = daily_bars(n=50)
+    rng = np.random.default_rng(0)
+    targets = rng.integers(0, 3, size=(4, len(data))) * 10
+    res = simulate_targets(data["open"].to_numpy(), data["close"].to_numpy(), targets, commission_bps=0.001, slippage=0.02)
+    assert res.equity.shape == (4, len(data))
+    for k in range(4):
+        single = simulate_targets(data["open"].to_numpy(), data["close"].to_numpy(), targets[k], commission_bps=0.001, slippage=0.02)
+        np.testing.assert_array_equal(single.equity, res.equity[k])
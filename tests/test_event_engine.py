@@ -3,21 +3,11 @@ import numpy as np
 
 from qbt.core.event_engine import EventDrivenEngine, MinuteSMA
 from qbt.analytics.metrics_ext import trade_stats_from_fills
+from qbt.analytics.trades import round_trips
 from qbt.core.metrics import performance_from_nav
 
-def make_minute_mock(n_minutes: int = 600, seed: int = 123, start: str = "2020-01-01 09:30"):
-    rng = np.random.default_rng(seed)
-    rets = rng.normal(0.00005, 0.001, size=n_minutes)
-    price = 100 * np.exp(np.cumsum(rets))
-    open_ = np.append([price[0]], price[:-1])
-    high = np.maximum(open_, price)
-    low = np.minimum(open_, price)
-    vol = rng.integers(50, 200, size=n_minutes)
-    idx = pd.date_range(start=start, periods=n_minutes, freq="min")
-    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": price, "volume": vol}, index=idx)
-
-def test_event_engine_runs_and_metrics():
-    df = make_minute_mock()
+def test_event_engine_runs_and_metrics(minute_bars):
+    df = minute_bars()
     engine = EventDrivenEngine(data_map={"MOCK": df}, strategy_map={"MOCK": MinuteSMA(df, short=5, long=15, symbol="MOCK", unit=10)})
     nav = engine.run()
     assert isinstance(nav, pd.Series)
@@ -25,21 +15,88 @@ def test_event_engine_runs_and_metrics():
     perf = performance_from_nav(nav / nav.iloc[0])
     assert "sharpe" in perf and "max_drawdown" in perf
     fills = engine.portfolio.fills_dataframe()
-    qty_cum = 0
-    avg_cost = 0.0
-    pnls = []
-    for _, f in fills.iterrows():
-        if f["side"] == "buy":
-            total_cost = avg_cost * qty_cum + (f["price"] * f["qty"] + f["fee"])
-            qty_cum += f["qty"]
-            avg_cost = total_cost / max(qty_cum, 1)
-        else:
-            pnl = (f["price"] - avg_cost) * f["qty"] - f["fee"]
-            qty_cum -= f["qty"]
-            if qty_cum == 0:
-                avg_cost = 0.0
-            pnls.append({"trade_id": len(pnls) + 1, "timestamp": f["timestamp"], "symbol": f["symbol"], "pnl": pnl})
-    trades = pd.DataFrame(pnls)
+    trades = round_trips(fills, method="average")
+    assert len(trades) > 0 and trades["exit_time"].isin(fills["timestamp"]).all()
     stats = trade_stats_from_fills(trades)
     for k in ["num_trades","win_rate","profit_factor","avg_win","avg_loss","max_win","max_loss"]:
         assert k in stats
+
+def test_data_handler_dense_arrays(minute_bars):
+    from qbt.core.event_engine import DataHandler
+    a = minute_bars(50, seed=1)
+    b = minute_bars(40, seed=2, start="2020-01-01 09:35").iloc[::2]
+    dh = DataHandler({"A": a, "B": b}, align=True)
+    assert dh.values.shape == (50, 2, 5)
+    for sym, df in {"A": a, "B": b}.items():
+        expected = df[dh.fields].reindex(dh.index).ffill()
+        pd.testing.assert_frame_equal(dh.data_map[sym], expected.astype(float), check_freq=False)
+    events = list(dh)
+    assert len(events) == 100 and [e.symbol for e in events[:2]] == ["A", "B"]
+    ev = events[21]
+    assert ev.symbol == "B" and ev.bar["close"] == dh.field("close")[ev.row, 1]
+
+def test_event_queue_merges_real_bars_only(minute_bars):
+    from qbt.core.event_engine import DataHandler
+    a = minute_bars(50, seed=1)
+    b = minute_bars(40, seed=2, start="2020-01-01 09:35").iloc[::2]
+    events = list(DataHandler({"A": a, "B": b}))
+    assert len(events) == len(a) + len(b)
+    stamps = [e.timestamp for e in events]
+    assert stamps == sorted(stamps)
+    for e in events:
+        src = a if e.symbol == "A" else b
+        assert e.timestamp == src.index[e.row] and e.bar["close"] == src["close"].iloc[e.row]
+
+def test_event_engine_fills_and_timers(minute_bars):
+    a = minute_bars(300, seed=1)
+    b = minute_bars(200, seed=2, start="2020-01-01 10:00").iloc[::3]
+    engine = EventDrivenEngine(data_map={"A": a, "B": b},
+                               strategy_map={"A": MinuteSMA(a.copy(), short=5, long=15, symbol="A", unit=10)})
+    from qbt.core.event_engine import OrderEvent
+    when = b.index[10] + pd.Timedelta("30s")   # between B's bars
+    engine.schedule(when, lambda ctx: ctx.submit_order(OrderEvent(ctx.now, "B", "buy", 7)), name="rebalance")
+    nav = engine.run()
+    assert len(nav) == len(a) + len(b)
+    fills = engine.portfolio.fills_dataframe()
+    timer_fill = fills[fills["symbol"] == "B"]
+    assert len(timer_fill) == 1 and timer_fill["timestamp"].iloc[0] == when
+    assert timer_fill["price"].iloc[0] == b["open"].iloc[10] + engine.broker.slippage
+    fa = fills[fills["symbol"] == "A"]
+    assert len(fa) > 0
+    np.testing.assert_allclose(fa["price"], a.loc[fa["timestamp"], "open"].to_numpy() + engine.broker.slippage * np.where(fa["side"] == "buy", 1, -1))
+    assert engine.portfolio.positions["B"] == 7
+
+def test_columnar_logs_round_trip():
+    from qbt.core.event_engine import PortfolioED, FillEvent, ColumnLog
+    log = ColumnLog({"a": "q", "b": "d"})
+    for i in range(3000):
+        log.append(i, i / 2)
+    assert len(log) == 3000 and log["a"][-1] == 2999 and log["b"].dtype == np.float64
+    pf = PortfolioED(1000.0)
+    assert list(pf.fills_dataframe().columns) == ["timestamp", "symbol", "side", "qty", "price", "fee"]
+    ts = pd.Timestamp("2024-03-01 14:30", tz="America/New_York")
+    pf.on_fill(FillEvent(ts, "X", "buy", 3, 10.0, 0.5))
+    pf.mark_to_market(ts, {"X": 11.0})
+    pf.on_fill(FillEvent(ts + pd.Timedelta("1min"), "Y", "sell", 2, 5.0))
+    fills = pf.fills_dataframe()
+    assert fills["symbol"].tolist() == ["X", "Y"] and fills["side"].tolist() == ["buy", "sell"]
+    assert fills["timestamp"].iloc[1] == ts + pd.Timedelta("1min")
+    assert pf.fills_log[0] == {"timestamp": ts, "symbol": "X", "side": "buy", "qty": 3, "price": 10.0, "fee": 0.5}
+    nav = pf.equity_series()
+    assert nav.index[0] == ts and nav.iloc[0] == 1000.0 - 30.5 + 33.0
+
+def test_portfolio_equity_can_be_held_during_run(minute_bars):
+    df = minute_bars(200)
+    seen = []
+
+    class Watcher(MinuteSMA):
+        def on_bar(self, ctx):
+            seen.append(ctx.portfolio.equity)   # kept while the log keeps growing
+            super().on_bar(ctx)
+
+    engine = EventDrivenEngine(data_map={"MOCK": df}, strategy_map={"MOCK": Watcher(df.copy(), short=5, long=15, symbol="MOCK")})
+    nav = engine.run()
+    assert [len(e) for e in seen] == list(range(len(df)))
+    np.testing.assert_array_equal(seen[-1], nav.to_numpy()[:-1])
+    seen[-1][:] = 0.0
+    assert engine.portfolio.equity[0] == nav.iloc[0] != 0.0
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qbt.indicators import SMA, EMA, RollingStd, RSI, MACD, Bollinger, ROC
+from qbt.strategies.ta_rsi import _rsi
+from qbt.strategies.ta_macd import _ema
+
+def _close(n=1500, seed=3):
+    rng = np.random.default_rng(seed)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))))
+    close.iloc[300:330] = close.iloc[299]  # flat stretch
+    close.iloc[700] = np.nan
+    return close
+
+def _chunked(ind, values, sizes=(1, 7, 50, 333)):
+    # Feed in uneven chunks to check that state carries across calls.
+    out, i, k = [], 0, 0
+    while i < len(values):
+        step = sizes[k % len(sizes)]
+        out.append(np.asarray(ind.update_many(values[i:i + step])).reshape(-1, *np.shape(ind.value)))
+        i += step; k += 1
+    return np.concatenate(out)
+
+@pytest.mark.parametrize("make,expected", [
+    (lambda: SMA(20), lambda c: c.rolling(20).mean()),
+    (lambda: RollingStd(20), lambda c: c.rolling(20).std(ddof=0)),
+    (lambda: RollingStd(15, ddof=1), lambda c: c.rolling(15).std()),
+    (lambda: EMA(span=12), lambda c: _ema(c, 12)),
+    (lambda: ROC(30), lambda c: c.pct_change(30, fill_method=None)),
+    (lambda: RSI(14), lambda c: _rsi(c, 14)),
+])
+def test_online_matches_pandas(make, expected):
+    close = _close()
+    want = expected(close).to_numpy()
+    np.testing.assert_allclose(make().update_many(close), want, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(_chunked(make(), close.to_numpy()), want, rtol=1e-9, atol=1e-9)
+
+def test_multi_output_indicators():
+    close = _close().ffill()
+    macd = _ema(close, 12) - _ema(close, 26)
+    sig = macd.ewm(span=9, adjust=False).mean()
+    out = MACD(12, 26, 9).update_many(close)
+    np.testing.assert_allclose(out, np.c_[macd, sig, macd - sig], rtol=1e-9, atol=1e-9)
+    mid = close.rolling(20).mean(); std = close.rolling(20).std(ddof=0)
+    bands = _chunked(Bollinger(20, 2.0), close.to_numpy())
+    np.testing.assert_allclose(bands, np.c_[mid, mid + 2 * std, mid - 2 * std], rtol=1e-9, atol=1e-9)
+
+def test_reset_restarts_state():
+    sma = SMA(3)
+    sma.update_many([1.0, 2.0, 3.0])
+    assert sma.value == 2.0
+    sma.reset()
+    assert np.isnan(sma.update(10.0))
+    assert sma.update_many([20.0, 30.0])[-1] == 20.0
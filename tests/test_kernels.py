@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qbt.core import kernels
+from qbt.core.broker import Broker
+from qbt.core.engine import BacktestEngine
+from qbt.core.engine_multi import BacktestEngineMulti
+from qbt.core.kernels import execute_orders
+from qbt.core.portfolio import Portfolio
+from qbt.core.portfolio_multi import PortfolioMulti
+from test_engine_vectorized import STRATEGIES
+
+@pytest.fixture(params=["arrays", "loop"])
+def jit(request, monkeypatch):
+    # Without numba the loop kernel still runs, as plain Python, once HAVE_NUMBA is forced.
+    if request.param == "loop":
+        monkeypatch.setattr(kernels, "HAVE_NUMBA", True)
+        return True
+    return False
+
+@pytest.mark.parametrize("cls,params", STRATEGIES)
+def test_run_targets_matches_loop_engine(cls, params, jit, daily_bars):
+    broker = Broker(commission_bps=0.0005, slippage=0.01)
+    data = daily_bars(seed=3)
+    loop = BacktestEngine(data, "MOCK", cls(data.copy(), {**params, "symbol": "MOCK", "unit": 100}), broker=broker)
+    nav_loop = loop.run()
+    fast = BacktestEngine(data, "MOCK", cls(data.copy(), {**params, "symbol": "MOCK", "unit": 100}), broker=broker)
+    nav_fast = fast.run_targets(jit=jit)
+    pd.testing.assert_series_equal(nav_loop, nav_fast, check_exact=True, check_freq=False)
+    assert fast.portfolio.cash == loop.portfolio.cash
+    assert fast.portfolio.position == loop.portfolio.position
+    pd.testing.assert_frame_equal(loop.portfolio.ledger.holdings(), fast.portfolio.ledger.holdings())
+    pd.testing.assert_series_equal(loop.portfolio.ledger.cash_series(), fast.portfolio.ledger.cash_series())
+
+def test_cost_basis_matches_portfolio(jit, daily_bars):
+    data = daily_bars(n=120, seed=4)
+    rng = np.random.default_rng(2)
+    orders = rng.integers(-3, 4, size=len(data)) * rng.integers(0, 2, size=len(data)) * 10
+    res = execute_orders(data["open"].to_numpy(), data["close"].to_numpy(), orders,
+                         starting_cash=50_000.0, commission_bps=0.001, slippage=0.05, jit=jit)
+    broker, pf = Broker(commission_bps=0.001, slippage=0.05), Portfolio(50_000.0)
+    for t, (px, q) in enumerate(zip(data["open"].to_numpy(), orders.tolist())):
+        if q:
+            side = "buy" if q > 0 else "sell"
+            exec_px = px + broker.slippage if q > 0 else px - broker.slippage
+            pf.on_fill(None, exec_px, abs(q), side, broker.commission(exec_px, abs(q)))
+        assert res.position[t] == pf.position.qty
+        basis = pf.position.cost_basis   # the array path sums costs in another order
+        assert res.basis[t] == (basis if jit else pytest.approx(basis, rel=1e-12))
+        assert res.cash[t] == pf.cash
+
+def test_compiled_loop_matches_array_path():
+    numba = pytest.importorskip("numba")
+    assert isinstance(kernels._order_loop, numba.core.registry.CPUDispatcher)
+    rng = np.random.default_rng(11)
+    open_ = 100 + rng.normal(0, 1, size=(400, 6)).cumsum(axis=0)
+    close = open_ + rng.normal(0, 0.5, size=open_.shape)
+    orders = rng.integers(-3, 4, size=open_.shape) * rng.integers(0, 2, size=open_.shape) * 10
+    args = (open_, close, orders, 1e6, 0.0005, 0.01)
+    compiled, arrays = execute_orders(*args, jit=True), execute_orders(*args, jit=False)
+    for name in ("position", "exec_price", "fee", "basis", "cash", "equity"):
+        np.testing.assert_allclose(getattr(compiled, name), getattr(arrays, name), rtol=1e-12, err_msg=name)
+
+def test_jit_requires_numba(monkeypatch):
+    monkeypatch.setattr(kernels, "HAVE_NUMBA", False)
+    with pytest.raises(ImportError):
+        execute_orders(np.ones(3), np.ones(3), np.zeros(3, dtype=int), jit=True)
+
+class _TargetStrategy:
+    """Trades a fixed (time x symbol) target frame bar by bar."""
+    def __init__(self, targets: pd.DataFrame):
+        self.targets = targets
+
+    def target_positions(self):
+        return self.targets
+
+    def on_bar(self, ctx):
+        ctx.submit_orders(self.targets.loc[ctx.now, ctx.symbols].to_numpy() - ctx.portfolio.qty)
+
+def test_multi_run_targets_matches_loop(jit, daily_bars):
+    data_map = {f"S{j}": daily_bars(n=150, seed=10 + j) for j in range(5)}
+    index = next(iter(data_map.values())).index
+    rng = np.random.default_rng(7)
+    targets = pd.DataFrame(rng.integers(0, 4, size=(len(index), 5)) * 25, index=index, columns=list(data_map))
+    broker = Broker(commission_bps=0.0005, slippage=0.01)
+    loop = BacktestEngineMulti(data_map, _TargetStrategy(targets), broker=broker)
+    nav_loop = loop.run()
+    fast = BacktestEngineMulti(data_map, _TargetStrategy(targets), broker=broker)
+    nav_fast = fast.run_targets(jit=jit)
+    np.testing.assert_allclose(nav_fast.to_numpy(), nav_loop.to_numpy(), rtol=1e-12)
+    np.testing.assert_array_equal(fast.portfolio.qty, loop.portfolio.qty)
+    np.testing.assert_allclose(fast.portfolio.basis, loop.portfolio.basis, rtol=1e-12)
+    pd.testing.assert_frame_equal(fast.portfolio.ledger.holdings(), loop.portfolio.ledger.holdings())
+
+def test_multi_run_targets_basis_with_shorts(jit, daily_bars):
+    data_map = {f"S{j}": daily_bars(n=150, seed=20 + j) for j in range(4)}
+    index = next(iter(data_map.values())).index
+    rng = np.random.default_rng(8)
+    targets = pd.DataFrame(rng.integers(-3, 4, size=(len(index), 4)) * 25, index=index, columns=list(data_map))
+    broker = Broker(commission_bps=0.0005, slippage=0.01)
+    loop = BacktestEngineMulti(data_map, _TargetStrategy(targets), broker=broker)
+    loop.run()
+    fast = BacktestEngineMulti(data_map, _TargetStrategy(targets), broker=broker)
+    fast.run_targets(jit=jit)
+    assert (targets < 0).any().all() and (fast.kernel_result.basis[fast.kernel_result.position <= 0] == 0).all()
+    np.testing.assert_array_equal(fast.portfolio.qty, loop.portfolio.qty)
+    np.testing.assert_allclose(fast.portfolio.basis, loop.portfolio.basis, rtol=1e-12)
+    ref = PortfolioMulti(100_000.0, list(data_map))
+    for t, row in enumerate(fast.kernel_result.trade_qty):
+        cols = np.flatnonzero(row)
+        ref.on_fills(None, cols, fast.kernel_result.exec_price[t, cols], row[cols], fast.kernel_result.fee[t, cols])
+        np.testing.assert_allclose(fast.kernel_result.basis[t], ref.basis, rtol=1e-12)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from qbt.core.ledger import Ledger
+from qbt.core.engine import BacktestEngine
+from qbt.core.engine_multi import BacktestEngineMulti
+from qbt.core.broker import Broker
+from qbt.strategies.sma_cross import SmaCross
+from qbt.strategies.topn_momentum import TopNMomentum
+
+def test_ledger_grows_and_views():
+    ledger = Ledger(["A"], capacity=2)
+    idx = pd.date_range("2024-01-01", periods=5, freq="D", tz="UTC")
+    for i, ts in enumerate(idx):
+        ledger.record_one(ts, 100.0 - i, 100.0 + i, 0, i, 2.0 * i)
+    ledger.add_symbol("B")
+    assert len(ledger) == 5
+    pd.testing.assert_index_equal(ledger.index, idx, exact=False, check_exact=True)
+    assert ledger.holdings()["A"].tolist() == [0, 1, 2, 3, 4] and ledger.holdings()["B"].sum() == 0
+    assert not np.shares_memory(ledger.equity_series().to_numpy(), ledger.equity)
+    assert np.shares_memory(ledger.holdings().to_numpy(), ledger.qty)
+    assert np.shares_memory(ledger.exposure().to_numpy(), ledger.value)
+    assert ledger.history()[1] == (idx[1], 101.0)
+
+def test_single_engine_ledger_history(daily_bars):
+    data = daily_bars(300)
+    engine = BacktestEngine(data, "MOCK", SmaCross(data.copy(), {"symbol": "MOCK", "short_window": 5, "long_window": 20}),
+                            broker=Broker(0.0005, 0.01))
+    nav = engine.run()
+    ledger = engine.portfolio.ledger
+    assert len(ledger.ts) == len(data)   # sized from the bar count, no regrowth
+    holdings, exposure = ledger.holdings()["MOCK"], ledger.exposure()["MOCK"]
+    assert holdings.abs().sum() > 0
+    np.testing.assert_allclose(exposure, holdings * data["close"].to_numpy())
+    np.testing.assert_allclose(nav, ledger.cash_series() + exposure)
+    assert engine.portfolio.equity_history[-1] == (nav.index[-1], nav.iloc[-1])
+    first, cash0 = nav.iloc[0], ledger.cash_series().iloc[0]
+    nav /= nav.iloc[0]                                # callers may normalize the NAV in place
+    cash = ledger.cash_series()
+    cash -= cash0
+    assert ledger.equity[0] == first and engine.portfolio.equity_series().iloc[0] == first
+    assert ledger.cash_series().iloc[0] == cash0
+
+def test_multi_engine_ledger_matches_positions(daily_bars):
+    data_map = {f"S{k}": daily_bars(250, seed=k) for k in range(4)}
+    engine = BacktestEngineMulti(data_map, TopNMomentum(data_map, {"lookback": 20, "top_n": 2}), broker=Broker(0.0005, 0.01))
+    nav = engine.run()
+    ledger = engine.portfolio.ledger
+    assert ledger.symbols == list(data_map)
+    closes = pd.DataFrame({s: df["close"] for s, df in data_map.items()})
+    np.testing.assert_allclose(ledger.exposure(), ledger.holdings() * closes.to_numpy())
+    np.testing.assert_allclose(nav, ledger.cash_series() + ledger.exposure().sum(axis=1), rtol=1e-12)
+    assert (ledger.holdings() > 0).sum(axis=1).max() == 2
@@ -1,8 +1,16 @@
 import pandas as pd
 import numpy as np
 import math
+import pytest
 
-from qbt.core.metrics import performance_from_nav
+from qbt.core.metrics import expanding_performance, performance_from_nav, performance_from_navs, rolling_performance
+
+def _navs(n=300, runs=5, seed=1):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-01", periods=n, freq="B")
+    navs = pd.DataFrame(np.cumprod(1 + rng.normal(0.0004, 0.01, size=(n, runs)), axis=0), index=idx)
+    navs[runs - 1] = 1.0   # flat run: zero vol, no drawdown
+    return navs
 
 def test_performance_keys_and_total_return():
     idx = pd.date_range("2020-01-01", periods=10, freq="D")
@@ -22,3 +30,52 @@ def test_max_drawdown_non_negative():
     nav = pd.Series([100, 105, 110, 108, 104, 106], index=idx, name="equity")
     perf = performance_from_nav(nav / nav.iloc[0])
     assert perf["max_drawdown"] <= 0.0
+
+def test_batched_metrics_match_single_series():
+    navs = _navs()
+    navs.iloc[:20, 1] = np.nan; navs.iloc[[50, 51, 120], 2] = np.nan   # late start and gaps
+    navs[5] = np.nan                                                    # empty run
+    bench = navs[0].iloc[::2] * 1.01
+    got = performance_from_navs(navs, risk_free=0.02, benchmark_nav=bench)
+    assert list(got.index) == list(navs.columns)
+    for col in navs:
+        want = performance_from_nav(navs[col], risk_free=0.02, benchmark_nav=bench)
+        for k, v in want.items():
+            assert got.loc[col, k] == pytest.approx(v, rel=1e-9, abs=1e-12, nan_ok=True), (col, k)
+    pd.testing.assert_frame_equal(performance_from_navs(navs.to_numpy()).set_axis(navs.columns),
+                                  performance_from_navs(navs))
+
+def test_rolling_and_expanding_match_slices():
+    navs = _navs(n=80, runs=3)
+    navs.iloc[40, 0] = np.nan
+    bench = navs[1] * 0.99 + 0.01
+    roll = rolling_performance(navs, 20, benchmark_nav=bench)
+    grow = expanding_performance(navs, min_periods=5, benchmark_nav=bench)
+    for t in (3, 19, 33, 45, 79):
+        for col in navs:
+            window = navs[col].iloc[t - 19:t + 1]
+            want = performance_from_nav(window, benchmark_nav=bench) if t >= 19 and window.notna().all() else {}
+            want_grow = performance_from_nav(navs[col].iloc[:t + 1], benchmark_nav=bench) if t >= 4 else {}
+            for k in want_grow:
+                assert roll.loc[navs.index[t], (k, col)] == pytest.approx(want.get(k, np.nan), rel=1e-8, abs=1e-12, nan_ok=True)
+                assert grow.loc[navs.index[t], (k, col)] == pytest.approx(want_grow[k], rel=1e-8, abs=1e-12, nan_ok=True)
+    single = rolling_performance(navs[1], 20)
+    assert list(single.columns) == list(performance_from_nav(navs[1]))
+    pd.testing.assert_series_equal(single["sharpe"], roll[("sharpe", 1)], check_names=False)
+
+def test_windowed_information_ratio_needs_benchmark_coverage():
+    navs = _navs(n=60, runs=2)
+    navs.iloc[:5, 1] = np.nan
+    bench = (navs[0] * 1.001).iloc[10:].drop(navs.index[[25, 26, 40]])   # starts late, with gaps
+    roll = rolling_performance(navs, 15, benchmark_nav=bench)
+    grow = expanding_performance(navs, benchmark_nav=bench)
+    for t in range(len(navs)):
+        for col in navs:
+            want = performance_from_nav(navs[col].iloc[:t + 1], benchmark_nav=bench)["information_ratio"]
+            assert grow.loc[navs.index[t], ("information_ratio", col)] == pytest.approx(want, nan_ok=True)
+            if t >= 14:
+                want = performance_from_nav(navs[col].iloc[t - 14:t + 1], benchmark_nav=bench)["information_ratio"]
+                assert roll.loc[navs.index[t], ("information_ratio", col)] == pytest.approx(want, nan_ok=True)
+    assert np.isnan(grow[("information_ratio", 0)]).all()
+    ir = roll[("information_ratio", 0)]
+    assert ir.iloc[:24].isna().all() and np.isfinite(ir.iloc[24]) and np.isnan(ir.iloc[39])   # window opening on a gap
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qbt.analytics.montecarlo import block_bootstrap, bootstrap_nav, drawdown_duration, shuffle_pnl, shuffle_trades
+from qbt.bench import synthetic_bars
+from qbt.core.metrics import performance_from_nav
+
+def test_block_bootstrap_draws_contiguous_blocks():
+    r = np.arange(100, dtype=float)
+    sims = block_bootstrap(r, 50, block=10, seed=0)
+    assert sims.shape == (50, 100)
+    steps = np.diff(sims.reshape(50, 10, 10), axis=2)
+    assert np.isin(steps, [1.0, -99.0]).all()          # consecutive, wrapping at the end
+    np.testing.assert_array_equal(sims, block_bootstrap(r, 50, block=10, seed=0))
+    assert block_bootstrap(r, 20, block=10, seed=1, circular=False).max() <= 99
+    perms = shuffle_pnl(r, 30, seed=2)
+    assert (np.sort(perms, axis=1) == r).all() and not (perms == r).all()
+
+def test_bootstrap_metrics_match_series_and_ignore_chunking():
+    nav = synthetic_bars(300, freq="B", start="2020-01-01", vol=0.01)["close"]
+    mc = bootstrap_nav(nav, n_sims=40, block=5, seed=7, keep_paths=True, chunk_size=None)
+    assert mc.paths.shape == (40, 300) and mc.metrics.shape[0] == 40
+    for i in (0, 17, 39):
+        want = performance_from_nav(pd.Series(mc.paths[i]))
+        for k, v in want.items():
+            assert mc.metrics.loc[i, k] == pytest.approx(v, rel=1e-9, nan_ok=True)
+    assert mc.actual["sharpe"] == pytest.approx(performance_from_nav(nav / nav.iloc[0])["sharpe"])
+    pd.testing.assert_frame_equal(mc.metrics, bootstrap_nav(nav, n_sims=40, block=5, seed=7, chunk_size=9).metrics)
+    summary = mc.summary()
+    assert list(summary.columns) == ["actual", "q0.05", "q0.25", "q0.5", "q0.75", "q0.95"]
+    assert ((mc.rank() >= 0) & (mc.rank() <= 1)).all()
+
+def test_trade_shuffles_keep_total_and_vary_drawdown():
+    pnl = np.random.default_rng(3).normal(20, 200, size=120)
+    mc = shuffle_trades(pd.DataFrame({"pnl": pnl}), n_sims=200, seed=1, starting_cash=10_000)
+    assert np.allclose(mc.metrics["total_return"], pnl.sum() / 10_000)
+    assert mc.metrics["max_drawdown"].nunique() > 100
+    boot = shuffle_trades(pnl, n_sims=200, seed=1, replace=True)
+    assert boot.metrics["total_return"].std() > 0
+
+def test_drawdown_duration():
+    paths = np.array([[1, 2, 1.5, 1.8, 2.1, 2.0], [1, 0.9, 0.8, 0.9, 0.95, 0.99], [1, 1, 1, 1, 1, 1]])
+    assert drawdown_duration(paths).tolist() == [2, 5, 0]
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+from qbt.core.broker import Broker, Order
+from qbt.core.engine import BacktestEngine
+from qbt.core.orderbook import OrderBook
+
+def limit(side, price, qty=1, **kw):
+    return Order("X", qty, side, order_type="limit", limit_price=price, **kw)
+
+def stop(side, price, qty=1, **kw):
+    return Order("X", qty, side, order_type="stop", stop_price=price, **kw)
+
+def test_limit_and_stop_fill_prices_with_gaps():
+    book = OrderBook()
+    book.add(limit("buy", 99.0))
+    book.add(limit("sell", 103.0))
+    book.add(stop("buy", 102.0))
+    book.add(stop("sell", 97.0))
+    assert book.match("X", open_=100.0, high=101.0, low=99.5) == []
+    fills = book.match("X", open_=100.0, high=102.5, low=98.0)
+    assert [(o.side, o.order_type, px) for o, px in fills] == [("buy", "limit", 99.0), ("buy", "stop", 102.0)]
+    fills = book.match("X", open_=95.0, high=105.0, low=94.0)   # gap down through the sell stop
+    assert [(o.side, o.order_type, px) for o, px in fills] == [("sell", "limit", 103.0), ("sell", "stop", 95.0)]
+    assert len(book) == 0
+    book.add(limit("buy", 99.0))
+    assert book.match("X", open_=97.0, high=98.0, low=96.0)[0][1] == 97.0   # gap below the limit
+
+def test_fill_priority_cancel_and_day_orders():
+    book = OrderBook()
+    a, b, c = book.add(limit("buy", 98.0)), book.add(limit("buy", 99.0)), book.add(limit("buy", 99.0))
+    d = book.add(limit("buy", 95.0, tif="day"))
+    assert book.cancel(c) and not book.cancel(c)
+    assert [o.order_id for o in book.open_orders()] == [a, b, d]
+    fills = book.match("X", open_=100.0, high=100.0, low=97.0)
+    assert [o.order_id for o, _ in fills] == [b, a]
+    assert len(book) == 0 and book.get(d) is None      # day order expired unfilled
+    assert book.match("Y", 1.0, 1.0, 1.0) == []
+
+def test_stop_limit_rests_as_limit_when_gapped_past():
+    book = OrderBook()
+    oid = book.add(Order("X", 5, "buy", order_type="stop_limit", stop_price=101.0, limit_price=101.5))
+    assert book.match("X", open_=100.0, high=100.9, low=99.0) == []
+    assert book.match("X", open_=103.0, high=104.0, low=102.0) == []    # triggered above the limit
+    assert book.get(oid) is not None
+    fills = book.match("X", open_=102.0, high=102.0, low=101.0)
+    assert [(o.order_id, px) for o, px in fills] == [(oid, 101.5)]
+    book.add(Order("X", 5, "sell", order_type="stop_limit", stop_price=99.0, limit_price=98.5))
+    assert book.match("X", open_=100.0, high=100.0, low=98.0)[0][1] == 99.0
+
+def test_invalid_orders_raise():
+    book = OrderBook()
+    for order in (Order("X", 1, "buy"), Order("X", 1, "buy", order_type="limit"),
+                  Order("X", 1, "sell", order_type="stop_limit", stop_price=1.0), limit("hold", 1.0),
+                  limit("buy", 1.0, qty=0), limit("buy", 1.0, tif="ioc")):
+        with pytest.raises(ValueError):
+            book.add(order)
+
+def _scan(orders, o, h, l):
+    # Reference matcher: check every resting order.
+    fills, rest = [], []
+    for od in orders:
+        if od.order_type == "limit" and od.side == "buy" and l <= od.limit_price:
+            fills.append((od.order_id, min(o, od.limit_price)))
+        elif od.order_type == "limit" and od.side == "sell" and h >= od.limit_price:
+            fills.append((od.order_id, max(o, od.limit_price)))
+        elif od.order_type == "stop" and od.side == "buy" and h >= od.stop_price:
+            fills.append((od.order_id, max(o, od.stop_price)))
+        elif od.order_type == "stop" and od.side == "sell" and l <= od.stop_price:
+            fills.append((od.order_id, min(o, od.stop_price)))
+        else:
+            rest.append(od)
+    return sorted(fills), rest
+
+def test_matches_full_scan_on_random_grid():
+    rng = np.random.default_rng(3)
+    book, resting = OrderBook(), []
+    close = 100 + np.cumsum(rng.normal(0, 1, 300))
+    for t, c in enumerate(close):
+        for _ in range(rng.integers(0, 20)):
+            side, kind = rng.choice(["buy", "sell"]), rng.choice(["limit", "stop"])
+            px = round(float(c + rng.normal(0, 3)), 1)
+            od = Order("X", 1, str(side), order_type=str(kind), **{f"{kind}_price": px})
+            book.add(od)
+            resting.append(od)
+        o, h, l = c, c + abs(rng.normal(0, 1)), c - abs(rng.normal(0, 1))
+        expected, resting = _scan(resting, o, h, l)
+        assert sorted((od.order_id, px) for od, px in book.match("X", o, h, l)) == expected
+        assert len(book) == len(resting)
+
+class _Grid:
+    # Rests a buy ladder below the first close and a protective stop, cancelled on bar 4.
+    def __init__(self):
+        self.bar = 0
+
+    def on_bar(self, ctx):
+        self.bar += 1
+        if self.bar == 1:
+            c = ctx.data["close"]
+            for k in (1, 2, 3):
+                ctx.submit_order("X", 10, "buy", order_type="limit", limit_price=c - k)
+            self.stop_id = ctx.submit_order("X", 30, "sell", order_type="stop", stop_price=c - 50)
+        elif self.bar == 4:
+            assert ctx.cancel_order(self.stop_id)
+
+def test_engine_fills_resting_orders_on_later_bars():
+    idx = pd.date_range("2024-01-01", periods=5, freq="D")
+    data = pd.DataFrame({"open": [100, 100, 99, 97.5, 98], "high": [101, 101, 100, 98, 99],
+                         "low": [99, 99.5, 98, 96, 97], "close": [100, 100, 98.5, 97, 98],
+                         "volume": 1.0}, index=idx)
+    for fast in (False, True):
+        eng = BacktestEngine(data, "X", _Grid(), starting_cash=10_000, broker=Broker(commission_bps=0.001), fast=fast)
+        eng.run()
+        f = eng.fills()
+        assert f["timestamp"].tolist() == [idx[2], idx[2], idx[3]]
+        assert f["price"].tolist() == [99.0, 98.0, 97.0]
+        assert eng.portfolio.position.qty == 30 and len(eng.book) == 0
+        assert eng.portfolio.cash == pytest.approx(10_000 - 2940 * 1.001)
@@ -0,0 +1,53 @@
+import os
+import pandas as pd
+
+from qbt.core.engine import BacktestEngine
+from qbt.core.parallel import BacktestJob, SharedMarketData, run_parallel
+from qbt.strategies.sma_cross import SmaCross
+from qbt.strategies.topn_momentum import TopNMomentum
+
+def _data_map(daily_bars):
+    return {"AAA": daily_bars(seed=1), "BBB": daily_bars(seed=2), "CCC": daily_bars(seed=3)}
+
+def test_shared_data_round_trip(daily_bars):
+    data_map = _data_map(daily_bars)
+    with SharedMarketData(data_map) as shared:
+        loaded = shared.load()
+        for sym, df in data_map.items():
+            pd.testing.assert_frame_equal(loaded[sym], df, check_freq=False, check_names=False)
+            assert not loaded[sym]["close"].to_numpy().flags.writeable
+
+def test_run_parallel_ordering_and_error_isolation(daily_bars):
+    data_map = _data_map(daily_bars)
+    jobs = [BacktestJob(SmaCross, {"short_window": s, "long_window": 30}, symbols=["AAA"], name=f"sma{s}")
+            for s in (5, 10, 20)]
+    jobs.insert(1, BacktestJob(SmaCross, {"short_window": 50, "long_window": 30}, symbols=["AAA"], name="bad"))
+    jobs.append(BacktestJob(TopNMomentum, {"lookback": 20, "top_n": 1}, symbols=["AAA", "BBB", "CCC"], name="topn"))
+    seen = []
+    results = run_parallel(jobs, data_map, max_workers=2, progress=lambda d, t, r: seen.append((d, t)))
+    assert [r.name for r in results] == [j.name for j in jobs]
+    assert [r.ok for r in results] == [True, False, True, True, True]
+    assert "short_window must be < long_window" in results[1].error
+    assert sorted(seen) == [(i, 5) for i in range(1, 6)]
+    data = data_map["AAA"].copy()
+    expected = BacktestEngine(data, "AAA", SmaCross(data.copy(), {"short_window": 5, "long_window": 30, "symbol": "AAA"})).run()
+    pd.testing.assert_series_equal(results[0].nav, expected)
+    inline = run_parallel(jobs, data_map, max_workers=0)
+    pd.testing.assert_series_equal(inline[4].nav, results[4].nav)
+
+class _Crash(SmaCross):
+    # Kills its worker process outright, like a segfault or the OOM killer would.
+    def __init__(self, data, params=None):
+        os._exit(1)
+
+def test_dead_worker_fails_only_its_own_job(daily_bars):
+    data_map = _data_map(daily_bars)
+    jobs = [BacktestJob(SmaCross, {"short_window": s, "long_window": 30}, symbols=["AAA"]) for s in (5, 10, 20)]
+    jobs.insert(1, BacktestJob(_Crash, symbols=["AAA"], name="crash"))
+    seen = []
+    results = run_parallel(jobs, data_map, max_workers=2, progress=lambda d, t, r: seen.append(d))
+    assert [r.ok for r in results] == [True, False, True, True]
+    assert "BrokenProcessPool" in results[1].error
+    assert seen == [1, 2, 3, 4]
+    inline = run_parallel(jobs[2:], data_map, max_workers=0)
+    pd.testing.assert_series_equal(results[3].nav, inline[1].nav)
@@ -0,0 +1,113 @@
+import json
+
+import pandas as pd
+import pytest
+
+from qbt.bench import FlipOnBar, synthetic_universe
+from qbt.core.broker import Broker
+from qbt.core.engine import BacktestEngine
+from qbt.core.engine_multi import BacktestEngineMulti
+from qbt.core.engine_stream import StreamingBacktestEngine
+from qbt.core.event_engine import BrokerED, EventDrivenEngine, OrderEvent
+from qbt.core.profiling import Profiler
+from qbt.core.universe import AlignedUniverse
+from qbt.strategies.sma_cross import SmaCross
+from qbt.strategies.topn_momentum import TopNMomentum
+
+PARAMS = {"short_window": 5, "long_window": 20, "symbol": "MOCK", "unit": 100}
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_profiled_engine_matches_plain_run(fast, daily_bars):
+    data, broker = daily_bars(), Broker(commission_bps=0.0005, slippage=0.01)
+    plain = BacktestEngine(data, "MOCK", SmaCross(data.copy(), PARAMS), broker=broker, fast=fast).run()
+    prof = Profiler()
+    engine = BacktestEngine(data, "MOCK", SmaCross(data.copy(), PARAMS), broker=broker, fast=fast, profiler=prof)
+    pd.testing.assert_series_equal(engine.run(), plain)
+    rep = prof.report()
+    assert rep["events"] == len(data) and rep["events_per_s"] > 0
+    for stage in ("data", "mark", "strategy"):
+        assert rep["stages"][stage]["calls"] == len(data)
+    assert rep["stages"]["execute"]["calls"] == len(engine.fills())
+    assert sum(s["share"] for s in rep["stages"].values()) <= 1.0
+
+def test_profiled_multi_and_event_engines():
+    uni = synthetic_universe(4, 300, freq="B", start="2020-01-01", vol=0.01)
+    strat = lambda: TopNMomentum(uni, {"lookback": 20, "top_n": 2})
+    plain = BacktestEngineMulti(uni, strat()).run()
+    prof = Profiler(memory="tracemalloc")
+    pd.testing.assert_series_equal(BacktestEngineMulti(uni, strat(), profiler=prof).run(), plain)
+    assert prof.report()["stages"]["context"]["calls"] == 300 and prof.report()["peak_bytes"] > 0
+
+    plain = EventDrivenEngine(uni, {s: FlipOnBar(s) for s in uni}, broker=BrokerED(0.0005, 0.01)).run()
+    prof = Profiler(trace=True)
+    nav = EventDrivenEngine(uni, {s: FlipOnBar(s) for s in uni}, broker=BrokerED(0.0005, 0.01), profiler=prof).run()
+    pd.testing.assert_series_equal(nav, plain)
+    rep = prof.report()
+    assert rep["stages"]["strategy"]["calls"] == 4 * 300
+    assert rep["stages"]["order"]["calls"] == rep["stages"]["fill"]["calls"] > 0
+    assert rep["events"] == rep["stages"]["queue"]["calls"]
+
+class _Resting:
+    # Market entries plus a day limit below and a gtc stop under every bar: exercises the order book.
+    def on_bar(self, ctx):
+        c, pos = ctx.data["close"], ctx.portfolio.position.qty
+        if pos == 0:
+            ctx.submit_order("MOCK", 10, "buy", order_type="limit", limit_price=c * 0.995, tif="day")
+        elif pos >= 30:
+            ctx.submit_order("MOCK", pos, "sell")
+        else:
+            self.stop = ctx.submit_order("MOCK", 10, "buy", order_type="stop", stop_price=c * 1.005)
+            if pos == 20:
+                ctx.cancel_order(self.stop)
+
+def _ragged(daily_bars):
+    # Staggered starts and missing bars, so outer calendars have invalid cells.
+    frames = {f"S{k}": daily_bars(200, seed=k) for k in range(4)}
+    return {s: df.iloc[k * 15:].drop(df.index[50 + k::9]) for k, (s, df) in enumerate(frames.items())}
+
+def _runs(daily_bars):
+    # name -> build(profiler) returning a finished engine; each covers a feature of the shared loops.
+    data, ragged = daily_bars(300), _ragged(daily_bars)
+    uni = AlignedUniverse(ragged, how="outer")
+
+    def event(align):
+        def build(profiler):
+            eng = EventDrivenEngine(ragged, {s: FlipOnBar(s) for s in ragged}, broker=BrokerED(0.0005, 0.01),
+                                    align=align, profiler=profiler)
+            eng.schedule(uni.index[40], lambda ctx: ctx.submit_order(OrderEvent(ctx.now, "S1", "buy", 5)))
+            eng.run()
+            return eng
+        return build
+    return {
+        "bar": lambda p: _run(BacktestEngine(data, "MOCK", _Resting(), broker=Broker(0.0005, 0.01), profiler=p)),
+        "bar_fast": lambda p: _run(BacktestEngine(data, "MOCK", _Resting(), broker=Broker(0.0005, 0.01), fast=True, profiler=p)),
+        "stream": lambda p: _run(StreamingBacktestEngine((data.iloc[i:i + 64] for i in range(0, len(data), 64)), "MOCK",
+                                                         _Resting(), broker=Broker(0.0005, 0.01), profiler=p)),
+        "multi_outer": lambda p: _run(BacktestEngineMulti(uni, TopNMomentum(uni, {"lookback": 10, "top_n": 2}), profiler=p)),
+        "event": event(False),
+        "event_aligned": event(True),
+    }
+
+def _run(engine):
+    engine.run()
+    return engine
+
+@pytest.mark.parametrize("name", ["bar", "bar_fast", "stream", "multi_outer", "event", "event_aligned"])
+def test_profiled_loops_match_plain_loops(name, daily_bars):
+    build = _runs(daily_bars)[name]
+    plain, prof = build(None), build(Profiler(memory=None))
+    pd.testing.assert_series_equal(prof.portfolio.equity_series(), plain.portfolio.equity_series())
+    fills = (lambda e: e.portfolio.fills_dataframe()) if name.startswith("event") else (lambda e: e.fills())
+    assert len(fills(plain)) > 0
+    pd.testing.assert_frame_equal(fills(prof), fills(plain))
+    assert prof.profiler.report()["events"] > 0
+
+def test_chrome_trace_and_user_spans(tmp_path):
+    prof = Profiler(trace=True, memory=None)
+    with prof.span("custom"):
+        pass
+    prof.write_chrome_trace(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert events[0]["name"] == "custom" and events[0]["ph"] == "X" and events[0]["dur"] >= 0
+    with pytest.raises(ValueError):
+        Profiler(memory="psutil")
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qbt.bench import synthetic_bars
+from qbt.data.resample import (BarAggregator, asof_positions, higher_timeframe, resample_chunks,
+                               resample_ohlcv, ticks_to_bars)
+
+AGG = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+def _ticks(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = pd.Timestamp("2024-01-02 09:30") + pd.to_timedelta(np.cumsum(rng.exponential(0.5, n)), unit="s")
+    return pd.DataFrame({"price": 100 + np.cumsum(rng.normal(0, 0.01, n)),
+                         "size": rng.integers(1, 500, n)}, index=pd.DatetimeIndex(ts))
+
+@pytest.mark.parametrize("freq", ["5min", "7min", "h", "D", "W", "ME"])
+def test_time_bars_match_pandas_resample(freq):
+    bars = synthetic_bars(20_000, seed=1, freq="min")
+    expected = bars[list(AGG)].resample(freq).agg(AGG).dropna()
+    got = resample_ohlcv(bars, freq)
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy())
+    if freq == "W":                        # pandas labels calendar bins at their end, we use the start
+        assert (got.index.weekday == 0).all()
+    elif freq == "ME":
+        assert (got.index.day == 1).all()
+    else:
+        assert got.index.equals(expected.index)
+
+def test_tz_aware_days_are_local_and_unsorted_input_is_ordered():
+    bars = synthetic_bars(5_000, seed=2, freq="15min").tz_localize("UTC").tz_convert("America/New_York")
+    expected = bars[list(AGG)].resample("D").agg(AGG).dropna()
+    shuffled = bars.sample(frac=1.0, random_state=0)
+    pd.testing.assert_frame_equal(resample_ohlcv(shuffled, "D"), expected, check_freq=False, check_dtype=False)
+
+def test_ticks_to_time_and_volume_bars():
+    ticks = _ticks()
+    bars = ticks_to_bars(ticks, "1min")
+    expected = ticks["price"].resample("1min").ohlc().assign(volume=ticks["size"].resample("1min").sum()).dropna()
+    np.testing.assert_allclose(bars.to_numpy(), expected.to_numpy())
+    vb = ticks_to_bars(ticks, volume=10_000)
+    closes, total, nxt = [], 0, 10_000
+    for i, size in enumerate(ticks["size"]):       # row taking the total to the next multiple closes a bar
+        total += size
+        if total >= nxt:
+            closes.append(i)
+            nxt = (total // 10_000 + 1) * 10_000
+    np.testing.assert_allclose(vb["close"].to_numpy()[:len(closes)], ticks["price"].to_numpy()[closes])
+    assert len(vb) == len(closes) + 1
+    assert vb["volume"].sum() == ticks["size"].sum()
+    assert vb.index[0] == ticks.index[0]
+    db = ticks_to_bars(ticks, dollars=5e5)
+    assert db["volume"].sum() == ticks["size"].sum() and len(db) > len(vb)
+    with pytest.raises(ValueError):
+        ticks_to_bars(ticks, "1min", volume=100)
+
+@pytest.mark.parametrize("kw", [{"freq": "1min"}, {"volume": 10_000}, {"dollars": 2e6}])
+def test_streaming_matches_batch(kw):
+    ticks = _ticks()
+    chunks = (ticks.iloc[i:i + 777] for i in range(0, len(ticks), 777))
+    streamed = pd.concat(list(resample_chunks(chunks, ticks=True, **kw)))
+    pd.testing.assert_frame_equal(streamed, ticks_to_bars(ticks, **kw))
+    agg = BarAggregator(**kw, ticks=True)
+    agg.update(ticks.iloc[100:200])
+    with pytest.raises(ValueError):
+        agg.update(ticks.iloc[:50])
+
+def test_higher_timeframe_positions_have_no_lookahead():
+    bars = synthetic_bars(3_000, seed=3, freq="min")
+    daily, pos = higher_timeframe(bars, "D")
+    day = bars.index.normalize()
+    for i in (0, 389, 390, 391, 1500, len(bars) - 1):
+        done = daily.index[daily.index + pd.Timedelta("1D") <= day[i]]        # days fully before row i
+        last_row_of_day = i + 1 == len(bars) or day[i + 1] != day[i]
+        expected = len(done) - 1 + (1 if last_row_of_day else 0)
+        assert pos[i] == expected
+    stamps = pd.DatetimeIndex(["1990-01-01", daily.index[1], daily.index[1] + pd.Timedelta("1h"), "2100-01-01"])
+    np.testing.assert_array_equal(asof_positions(stamps, daily.index), [-1, 1, 1, len(daily) - 1])
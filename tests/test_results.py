@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from qbt import cli
+from qbt.core.broker import Broker
+from qbt.core.engine import BacktestEngine
+from qbt.core.engine_vectorized import BacktestEngineVectorized
+from qbt.results import ResultStore, result_key
+from qbt.strategies.sma_cross import SmaCross
+
+PARAMS = {"short_window": 5, "long_window": 20, "symbol": "MOCK", "unit": 100}
+
+def test_engine_fills_match_vectorized(daily_bars):
+    data, broker = daily_bars(seed=3), Broker(commission_bps=0.0005, slippage=0.01)
+    loop = BacktestEngine(data, "MOCK", SmaCross(data.copy(), PARAMS), broker=broker)
+    loop.run()
+    vec = BacktestEngineVectorized(data, "MOCK", SmaCross(data.copy(), PARAMS), broker=broker)
+    vec.run()
+    fast = BacktestEngine(data, "MOCK", SmaCross(data.copy(), PARAMS), broker=broker)
+    fast.run_targets()
+    pd.testing.assert_frame_equal(loop.fills(), vec.fills())
+    pd.testing.assert_frame_equal(fast.fills(), vec.fills())
+
+def test_store_returns_stored_run(tmp_path, monkeypatch, daily_bars):
+    data, broker = daily_bars(seed=3), Broker(commission_bps=0.0005, slippage=0.01)
+    first = ResultStore(tmp_path).run(data, "MOCK", SmaCross, PARAMS, broker)
+    assert len(first.fills) > 0 and "sharpe" in first.metrics
+    monkeypatch.setattr(BacktestEngine, "run", lambda self: pytest.fail("engine re-run"))
+    store = ResultStore(tmp_path)    # fresh process: served from disk
+    again = store.run(data, "MOCK", SmaCross, PARAMS, broker)
+    pd.testing.assert_series_equal(first.nav, again.nav)
+    assert again.metrics["sharpe"] == first.metrics["sharpe"] and store.hits == 1
+
+def test_key_changes_with_inputs(daily_bars):
+    data, broker = daily_bars(seed=3), Broker(commission_bps=0.0005)
+    base = result_key(data, SmaCross, PARAMS, broker)
+    assert base == result_key(data.copy(), SmaCross, dict(PARAMS), Broker(commission_bps=0.0005))
+    edited = data.copy(); edited.iloc[100, edited.columns.get_loc("close")] *= 1.01
+    assert result_key(edited, SmaCross, PARAMS, broker) != base
+    assert result_key(data, SmaCross, {**PARAMS, "short_window": 6}, broker) != base
+    assert result_key(data, SmaCross, PARAMS, Broker(commission_bps=0.001)) != base
+    assert result_key(data, "sma", PARAMS, broker) != base
+
+def test_cli_repeat_skips_run_and_report(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    argv = ["--strategy", "sma", "--report_name", "memo", "--results_dir", "results"]
+    cli.main(argv)
+    assert (tmp_path / "reports" / "memo_equity.png").exists()
+    monkeypatch.setattr(BacktestEngine, "run", lambda self: pytest.fail("engine re-run"))
+    cli.main(argv)
+    assert "Report up to date" in capsys.readouterr().out
+    monkeypatch.undo(); monkeypatch.chdir(tmp_path)
+    cli.main(argv + ["--short", "5", "--long", "20"])  # overwrites the memo report
+    capsys.readouterr()
+    cli.main(argv)
+    assert "Report up to date" not in capsys.readouterr().out
+    metrics = pd.read_csv(tmp_path / "reports" / "memo_metrics.csv")
+    cli.main(argv)
+    assert "Report up to date" in capsys.readouterr().out
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "reports" / "memo_metrics.csv"), metrics)
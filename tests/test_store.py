@@ -0,0 +1,38 @@
+import os
+import numpy as np
+import pandas as pd
+
+from qbt.bench import write_csv
+from qbt.data.loader import load_csv
+from qbt.data.store import DataStore
+
+def test_ingest_and_load_matches_csv(tmp_path, daily_bars):
+    csv = tmp_path / "AAA.csv"
+    write_csv(daily_bars(n=120, seed=1), csv)
+    store = DataStore(tmp_path / "store")
+    assert store.ingest_csv(str(csv)) == "AAA"
+    assert store.symbols() == ["AAA"]
+    expected = load_csv(str(csv), symbol="AAA")
+    loaded = store.load("AAA", with_symbol=True)
+    pd.testing.assert_frame_equal(loaded, expected, check_freq=False)
+    # Mapped read-only columns: nothing is copied on load.
+    assert not loaded["close"].to_numpy().flags.writeable
+
+def test_projection_and_reingest(tmp_path, daily_bars):
+    csv = tmp_path / "AAA.csv"
+    write_csv(daily_bars(n=120, seed=1), csv)
+    store = DataStore(tmp_path / "store")
+    store.ingest_csv(str(csv), tz="America/New_York")
+    full = store.load("AAA")
+    part = store.load("AAA", columns=["close"], start="2018-02-01", end="2018-03-01")
+    assert list(part.columns) == ["close"]
+    pd.testing.assert_frame_equal(part, full.loc["2018-02-01":"2018-03-01", ["close"]])
+    before = store.meta("AAA")["source"]
+    store.ingest_csv(str(csv), tz="America/New_York")        # unchanged file: no-op
+    assert store.meta("AAA")["source"] == before
+    write_csv(daily_bars(n=120, seed=2), csv)                  # changed file: re-parsed
+    st = csv.stat(); os.utime(csv, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    store.ingest_csv(str(csv), tz="America/New_York")
+    assert not np.allclose(store.load("AAA")["close"], full["close"])
+    store.ingest_csv(str(csv), tz="Asia/Tokyo")                # another tz: re-parsed
+    assert str(store.load("AAA").index.tz) == "Asia/Tokyo"
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qbt.bench import write_csv
+from qbt.core.engine import BacktestEngine
+from qbt.core.engine_stream import StreamingBacktestEngine
+from qbt.core.broker import Broker
+from qbt.data.loader import load_csv, iter_csv_chunks
+from qbt.strategies.sma_cross import SmaCross
+from qbt.strategies.momentum import Momentum
+from qbt.strategies.ta_bbands import BollingerBands
+from qbt.strategies.ta_rsi import RSIStrategy
+from qbt.strategies.ta_macd import MACDStrategy
+
+def _csv(tmp_path, bars):
+    return str(write_csv(bars, tmp_path / "MOCK.csv"))
+
+def test_chunks_concatenate_to_load_csv(tmp_path, daily_bars):
+    path = _csv(tmp_path, daily_bars(500, seed=21))
+    chunks = list(iter_csv_chunks(path, chunksize=64, symbol="MOCK"))
+    assert max(len(c) for c in chunks) <= 64
+    pd.testing.assert_frame_equal(pd.concat(chunks), load_csv(path, symbol="MOCK"))
+
+def test_unsorted_stream_is_rejected(tmp_path, daily_bars):
+    df = daily_bars(n=50)
+    df.index.name = "datetime"
+    path = tmp_path / "bad.csv"
+    pd.concat([df.iloc[25:], df.iloc[:25]]).to_csv(path)
+    with pytest.raises(ValueError):
+        list(iter_csv_chunks(str(path), chunksize=10))
+
+def test_streaming_engine_has_the_batch_engine_state(daily_bars):
+    strat = SmaCross(None, {"short_window": 5, "long_window": 20, "symbol": "MOCK"})
+    batch = BacktestEngine(daily_bars(50), "MOCK", strat)
+    stream = StreamingBacktestEngine(iter([]), "MOCK", strat)
+    assert set(vars(batch)) <= set(vars(stream))
+
+@pytest.mark.parametrize("cls,params", [
+    (SmaCross, {"short_window": 5, "long_window": 40}),
+    (Momentum, {"lookback": 30}),
+    (BollingerBands, {"lookback": 20, "num_std": 1.0}),
+    (RSIStrategy, {"lookback": 10, "lower": 40, "upper": 60}),
+    (MACDStrategy, {"fast": 8, "slow": 21, "signal": 5}),
+])
+def test_streaming_engine_matches_batch(tmp_path, cls, params, daily_bars):
+    path = _csv(tmp_path, daily_bars(500, seed=21))
+    broker = Broker(commission_bps=0.0005, slippage=0.01)
+    params = {**params, "symbol": "MOCK", "unit": 100}
+    data = load_csv(path, symbol="MOCK")
+    nav = BacktestEngine(data, "MOCK", cls(data, params), broker=broker).run()
+    stream = StreamingBacktestEngine(iter_csv_chunks(path, chunksize=37, symbol="MOCK"), "MOCK", cls(None, params), broker=broker)
+    nav_stream = stream.run()
+    assert stream.bars_processed == len(data)
+    np.testing.assert_allclose(nav_stream.to_numpy(), nav.to_numpy(), rtol=1e-12)
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from qbt.core.engine import BacktestEngine
+from qbt.core.broker import Broker
+from qbt.core.metrics import performance_from_nav
+from qbt.core.sweep import param_grid, resolve_grid, sweep
+from qbt.strategies.sma_cross import SmaCross
+from qbt.strategies.momentum import Momentum
+from qbt.strategies.ta_bbands import BollingerBands
+from qbt.strategies.ta_rsi import RSIStrategy
+from qbt.strategies.ta_macd import MACDStrategy
+
+CASES = [
+    ("sma", SmaCross, {"short_window": [5, 10], "long_window": [10, 30]}),
+    ("momentum", Momentum, {"lookback": [10, 40], "threshold": [0.0, 0.02]}),
+    ("bbands", BollingerBands, {"lookback": [10, 20], "num_std": [0.5, 1.5]}),
+    ("rsi", RSIStrategy, {"lookback": [7, 14], "lower": [40], "upper": [60, 70]}),
+    ("macd", MACDStrategy, {"fast": [5, 12], "slow": [26], "signal": [5, 9]}),
+]
+
+@pytest.mark.parametrize("name,cls,grid", CASES)
+def test_sweep_rows_match_engine_runs(name, cls, grid, daily_bars):
+    data = daily_bars(seed=5)
+    broker = Broker(commission_bps=0.0005, slippage=0.01)
+    table = sweep(data, name, grid, unit=100, broker=broker)
+    assert len(table) > 0
+    for _, row in table.iterrows():
+        params = {k: row[k] for k in grid}
+        strat = cls(data.copy(), {**params, "symbol": "MOCK", "unit": 100})
+        nav = BacktestEngine(data, "MOCK", strat, broker=broker).run()
+        assert row["final_equity"] == nav.iloc[-1]
+        assert row["sharpe"] == pytest.approx(performance_from_nav(nav / nav.iloc[0])["sharpe"], nan_ok=True)
+
+def test_sweep_is_ranked_and_chunking_is_invisible(daily_bars):
+    data = daily_bars(seed=9)
+    grid = {"short_window": range(2, 30, 3), "long_window": range(10, 80, 7)}
+    full = sweep(data, "sma", grid)
+    chunked = sweep(data, "sma", grid, chunk_size=7)
+    pd.testing.assert_frame_equal(full, chunked)
+    assert full["sharpe"].dropna().is_monotonic_decreasing
+    assert (full["short_window"] < full["long_window"]).all()
+    assert len(full) < len(param_grid(**grid))
+
+def test_resolve_grid_fills_strategy_defaults():
+    cases = (("momentum", Momentum, "lookback", "lookback"), ("rsi", RSIStrategy, "lookback", "lookback"),
+             ("bbands", BollingerBands, "num_std", "num_std"), ("sma", SmaCross, "long_window", "long"))
+    for name, cls, param, attr in cases:
+        params = resolve_grid(name, {})
+        assert len(params) == 1 and params.loc[0, param] == getattr(cls(None, {"symbol": "X"}), attr)
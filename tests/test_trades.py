@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qbt.analytics.metrics_ext import trade_stats_from_fills
+from qbt.analytics.trades import round_trips
+from qbt.core.event_engine import EventDrivenEngine, MinuteSMA
+
+def _fills(sides, qtys, prices, symbol="A", fee=1.0):
+    idx = pd.date_range("2020-01-01", periods=len(sides), freq="D")
+    return pd.DataFrame({"timestamp": idx, "symbol": symbol, "side": sides, "qty": qtys, "price": prices, "fee": fee})
+
+def _loop_trades(fills, method):
+    # Reference lot matcher, one fill at a time.
+    state, pnls = {}, []
+    for f in fills.itertuples():
+        sign, q, unit_fee = (1 if f.side == "buy" else -1), f.qty, f.fee / f.qty
+        pos, lots, avg = state.get(f.symbol, (0, [], (0.0, 0.0)))
+        if pos * sign < 0:
+            closed = min(q, abs(pos))
+            if method == "fifo":
+                left, notional, entry_fee = closed, 0.0, 0.0
+                while left:
+                    lq, lp, lf = lots[0]
+                    take = min(left, lq)
+                    notional += take * lp; entry_fee += take * lf; left -= take
+                    lots[0] = (lq - take, lp, lf)
+                    if lots[0][0] == 0:
+                        lots.pop(0)
+                entry = notional / closed
+            else:
+                entry, entry_fee = avg[0], avg[1] * closed
+            pnls.append(np.sign(pos) * (f.price - entry) * closed - entry_fee - unit_fee * closed)
+            pos += sign * closed; q -= closed
+        if q:
+            lots.append((q, f.price, unit_fee))
+            held = abs(pos)
+            avg = ((avg[0] * held + f.price * q) / (held + q), (avg[1] * held + unit_fee * q) / (held + q))
+            pos += sign * q
+        state[f.symbol] = (pos, lots, avg)
+    return np.array(pnls)
+
+def test_fifo_and_average_cost_by_hand():
+    fills = _fills(["buy", "buy", "sell", "sell", "sell", "buy"], [10, 10, 5, 10, 10, 5], [100, 110, 120, 130, 90, 80])
+    fifo = round_trips(fills, "fifo")
+    assert list(fifo["side"]) == ["long", "long", "long", "short"]       # the 10 @ 90 sell flips to short
+    assert list(fifo["entry_price"]) == [100.0, 105.0, 110.0, 90.0]
+    assert fifo["pnl"].tolist() == pytest.approx([98.5, 248.0, -101.0, 48.5])
+    assert fifo["holding_period"].tolist() == [pd.Timedelta(days=d) for d in (2, 3, 3, 1)]
+    avg = round_trips(fills, "average")
+    assert avg["entry_price"].tolist() == [105.0, 105.0, 105.0, 90.0]
+    assert avg["pnl"].tolist() == pytest.approx([73.5, 248.0, -76.0, 48.5])
+    with pytest.raises(ValueError):
+        round_trips(fills, "lifo")
+
+@pytest.mark.parametrize("method", ["fifo", "average"])
+def test_random_log_matches_loop(method):
+    rng = np.random.default_rng(5)
+    n = 2000
+    fills = pd.DataFrame({"timestamp": pd.date_range("2021-01-01", periods=n, freq="min"),
+                          "symbol": rng.choice(["A", "B", "C"], n), "side": rng.choice(["buy", "sell"], n),
+                          "qty": rng.integers(1, 10, n), "price": 100 + rng.normal(0, 1, n), "fee": rng.uniform(0, 1, n)})
+    trades = round_trips(fills, method)
+    np.testing.assert_allclose(trades["pnl"].to_numpy(), _loop_trades(fills, method), rtol=1e-9, atol=1e-9)
+    assert (trades["holding_period"] >= pd.Timedelta(0)).all()
+
+def test_excursions_and_stats_from_event_engine_fills(minute_bars):
+    df = minute_bars(seed=4)
+    engine = EventDrivenEngine({"MOCK": df}, {"MOCK": MinuteSMA(df, short=5, long=15, symbol="MOCK", unit=10)})
+    engine.run()
+    fills = engine.portfolio.fills_dataframe()
+    trades = round_trips(fills, "average", bars={"MOCK": df})
+    np.testing.assert_allclose(trades["pnl"].to_numpy(), _loop_trades(fills, "average"), rtol=1e-9)
+    for t in trades.itertuples():
+        window = df.loc[t.entry_time:t.exit_time]
+        assert t.mae == pytest.approx(min((window["low"].min() - t.entry_price) * t.qty, 0.0))
+        assert t.mfe == pytest.approx(max((window["high"].max() - t.entry_price) * t.qty, 0.0))
+    assert trade_stats_from_fills(fills, method="average") == trade_stats_from_fills(trades)
+    assert trade_stats_from_fills(fills)["num_trades"] == len(trades)
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qbt.bench import synthetic_universe
+from qbt.core.broker import Broker
+from qbt.core.engine_multi import BacktestEngineMulti
+from qbt.core.event_engine import DataHandler
+from qbt.core.universe import AlignedUniverse
+from qbt.strategies.topn_momentum import TopNMomentum, momentum_frame
+
+def _ragged(k=5, n=200):
+    uni = synthetic_universe(k, n, seed=4, freq="B", start="2020-01-01")
+    rng = np.random.default_rng(0)
+    # drop random bars and give symbols different start dates
+    return {s: df.iloc[j * 7:][rng.random(len(df) - j * 7) > 0.1] for j, (s, df) in enumerate(uni.items())}
+
+def test_inner_and_outer_calendars():
+    data = _ragged()
+    common = None
+    for df in data.values():
+        common = df.index if common is None else common.intersection(df.index)
+    union = pd.DatetimeIndex(sorted(set().union(*(df.index for df in data.values()))))
+    inner, outer = AlignedUniverse(data), AlignedUniverse(data, how="outer")
+    assert inner.index.equals(common) and inner.dense
+    assert outer.index.equals(union) and not outer.dense
+    for j, (sym, df) in enumerate(data.items()):
+        np.testing.assert_array_equal(inner.field("close")[:, j], df["close"].loc[common].to_numpy())
+        np.testing.assert_array_equal(outer.valid[:, j], union.isin(df.index))
+        expected = df[outer.fields].reindex(union).ffill().astype(float)
+        pd.testing.assert_frame_equal(outer.frame(sym), expected, check_freq=False)
+        pd.testing.assert_frame_equal(outer[sym], df[outer.fields].astype(float), check_freq=False)
+    with pytest.raises(ValueError):
+        AlignedUniverse(data, how="left")
+
+def test_unsorted_duplicate_input_and_missing_columns():
+    data = synthetic_universe(3, 50, seed=1, freq="B", start="2021-01-01")
+    messy = dict(data)
+    messy["S0001"] = pd.concat([data["S0001"].iloc[::-1], data["S0001"].iloc[:5]])
+    uni = AlignedUniverse(messy)
+    assert uni.dense and uni.index.equals(data["S0000"].index)
+    np.testing.assert_array_equal(uni.field("open")[:, 1], data["S0001"]["open"].to_numpy())
+    with pytest.raises(ValueError, match="missing column"):
+        AlignedUniverse({"A": data["S0000"].drop(columns="volume")})
+
+def test_engine_reuses_universe_and_matches_dict_input():
+    data = _ragged()
+    broker = Broker(0.0005, 0.01)
+    params = {"lookback": 10, "top_n": 2}
+    nav_dict = BacktestEngineMulti(data, TopNMomentum(data, params), broker=broker).run()
+    uni = AlignedUniverse(data)
+    runs = [BacktestEngineMulti(uni, TopNMomentum(uni, params), broker=broker) for _ in range(2)]
+    navs = [engine.run() for engine in runs]
+    assert runs[0].universe is runs[1].universe and runs[0].index is uni.index
+    pd.testing.assert_series_equal(navs[0], navs[1])
+    assert navs[0].index.equals(nav_dict.index)
+    # a dense universe computes momentum on the common calendar in one array pass
+    pd.testing.assert_frame_equal(momentum_frame(uni, 10), momentum_frame(dict(uni.items()), 10))
+
+class _BuyEverything:
+    def on_bar(self, ctx):
+        if ctx.i == 0:
+            ctx.submit_orders(np.full(len(ctx.symbols), 5))
+
+def test_outer_calendar_orders_wait_for_real_bars():
+    data = _ragged()
+    uni = AlignedUniverse(data, how="outer")
+    engine = BacktestEngineMulti(uni, _BuyEverything())
+    nav = engine.run()
+    assert np.isfinite(nav.to_numpy()).all() and len(nav) == len(uni.index)
+    fills = engine.fills().set_index("symbol")
+    for sym, df in data.items():
+        assert fills.loc[sym, "timestamp"] == df.index[0]
+        assert fills.loc[sym, "price"] == df["open"].iloc[0]
+    nav = BacktestEngineMulti(data, TopNMomentum(uni, {"lookback": 10, "top_n": 2}), how="outer").run()
+    assert np.isfinite(nav.to_numpy()).all() and nav.iloc[-1] != nav.iloc[0]
+
+def test_event_data_handler_takes_a_universe():
+    data = _ragged(3, 60)
+    uni = AlignedUniverse(data, how="outer")
+    dh = DataHandler(uni, align=True)
+    np.testing.assert_array_equal(dh.field("close"), uni.field("close"))
+    assert len(list(dh)) == len(uni.index) * 3
+    assert len(list(DataHandler(uni))) == sum(len(df) for df in data.values())
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qbt.bench import synthetic_bars, synthetic_universe
+from qbt.core.broker import Broker
+from qbt.core.engine import BacktestEngine
+from qbt.core.engine_vectorized import simulate_targets
+from qbt.core.metrics import performance_from_nav
+from qbt.core.sweep import resolve_grid, sweep_targets
+from qbt.core.walkforward import walk_forward, walk_forward_windows
+from qbt.strategies.sma_cross import SmaCross
+from qbt.strategies.topn_momentum import TopNMomentum
+
+def test_windows_layout():
+    idx = pd.bdate_range("2000-01-03", periods=252 * 10)
+    w = walk_forward_windows(idx, "3Y", "1Y")
+    assert len(w) == 7 and w["test_start"].iloc[0] == pd.Timestamp("2003-01-03")
+    assert (w["train_end"] < w["test_start"]).all() and (w["test_end"].iloc[:-1].to_numpy() < w["test_start"].iloc[1:].to_numpy()).all()
+    bars = walk_forward_windows(idx, 500, 100)
+    assert bars["test_start"].iloc[0] == idx[500] and bars["train_start"].iloc[1] == idx[100]
+    assert (walk_forward_windows(idx, 500, 100, anchored=True)["train_start"] == idx[0]).all()
+    with pytest.raises(ValueError):
+        walk_forward_windows(idx, 500, 100, step=50)
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_sweep_path_picks_in_sample_best_and_stitches(workers):
+    df = synthetic_bars(1500, freq="B", start="2010-01-01", vol=0.01, seed=3)
+    grid = {"short_window": [5, 10, 20], "long_window": [30, 60]}
+    broker = Broker(commission_bps=0.0005, slippage=0.01)
+    res = walk_forward(df, "sma", grid, train=500, test=250, objective="sortino", broker=broker, max_workers=workers)
+    params = resolve_grid("sma", grid)
+    targets = sweep_targets(df["close"], "sma", params, 100)
+    o, c = df["open"].to_numpy(), df["close"].to_numpy()
+    level = 1.0
+    for w, row in res.windows.iterrows():
+        a, b = df.index.get_loc(row["train_start"]), df.index.get_loc(row["train_end"]) + 1
+        scores = [performance_from_nav(pd.Series(simulate_targets(o[a:b], c[a:b], t[a:b], 100_000.0, 0.0005, 0.01).equity))["sortino"]
+                  for t in targets]
+        j = int(np.nanargmax(scores))
+        assert (row["short_window"], row["long_window"]) == tuple(params.iloc[j]) and row["score"] == pytest.approx(scores[j])
+        seg = res.nav.loc[row["test_start"]:row["test_end"]] / 100_000.0
+        assert seg.iloc[0] == pytest.approx(level)
+        level = seg.iloc[-1]
+    assert len(res.nav) == 1500 - 500 and res.metrics["total_return"] == pytest.approx(level - 1)
+
+def test_engine_path_for_strategy_classes():
+    df = synthetic_bars(600, freq="B", start="2015-01-01", vol=0.01, seed=5)
+    grid = {"short_window": [5, 10], "long_window": [20, 40], "unit": [100]}
+    res = walk_forward(df, SmaCross, grid, train=300, test=150, objective="max_drawdown", max_workers=0)
+    row = res.windows.iloc[0]
+    dds = {}
+    for p in ({"short_window": s, "long_window": l, "unit": 100} for s in (5, 10) for l in (20, 40)):
+        data = df.loc[row["train_start"]:row["train_end"]].copy()
+        nav = BacktestEngine(data, "ASSET", SmaCross(data, {**p, "symbol": "ASSET"}), broker=Broker()).run()
+        dds[(p["short_window"], p["long_window"])] = performance_from_nav(nav / nav.iloc[0])["max_drawdown"]
+    assert row["score"] == max(dds.values()) == dds[(row["short_window"], row["long_window"])]
+
+    uni = synthetic_universe(4, 500, freq="B", start="2016-01-01", vol=0.01)
+    res = walk_forward(uni, TopNMomentum, {"lookback": [10, 20], "top_n": [1, 2]}, train=250, test=125,
+                       objective=lambda m: m["sharpe"] - m["annual_vol"], max_workers=0)
+    assert len(res.windows) == 2 and res.nav.index[0] == uni["S0000"].index[250]
+    assert res.windows["lookback"].dtype.kind == "i"
+    with pytest.raises(ValueError):
+        walk_forward(uni, TopNMomentum, {"lookback": [10]}, train=250, test=125, objective="profit")